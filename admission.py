@@ -0,0 +1,98 @@
+import threading
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted without exceeding the queue bound"""
+
+
+class AdmissionLimiter:
+    """Caps concurrent inference and the number of requests queued behind it
+
+    At most `concurrency` requests run inside the limiter at once and at most
+    `max_pending` more may wait for a slot; beyond that, or after waiting
+    `timeout` seconds, the request is rejected with Overloaded so the server
+    can answer 503 instead of piling up threads. A request hands its slot
+    back while it waits on shared work (suspend), so requests queued on the
+    batched model call don't keep others from decoding and joining the batch.
+    """
+
+    def __init__(self, concurrency=2, max_pending=16, timeout=10.0):
+        self.concurrency = max(1, int(concurrency))
+        self.max_pending = max(0, int(max_pending))
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(self.concurrency)
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.active = 0
+        self.suspended = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.local = threading.local()
+
+    def acquire(self):
+        with self.lock:
+            if self.waiting >= self.max_pending and self.active >= self.concurrency:
+                self.rejected += 1
+                raise Overloaded("Too many requests queued for inference")
+            self.waiting += 1
+        acquired = self.slots.acquire(timeout=self.timeout)
+        with self.lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+                raise Overloaded("Timed out waiting for an inference slot")
+            self.active += 1
+            self.admitted += 1
+        self.local.held = True
+
+    def release(self):
+        self.local.held = False
+        with self.lock:
+            self.active -= 1
+        self.slots.release()
+
+    @contextmanager
+    def suspend(self):
+        """Lend this thread's slot to others for the duration of the block
+
+        The slot is taken back afterwards without the queue bound or timeout,
+        the request having been admitted already. Threads holding no slot
+        (warm-up, keep-warm) pass straight through.
+        """
+        if not getattr(self.local, 'held', False):
+            yield
+            return
+        with self.lock:
+            self.active -= 1
+            self.suspended += 1
+        self.local.held = False
+        self.slots.release()
+        try:
+            yield
+        finally:
+            self.slots.acquire()
+            with self.lock:
+                self.suspended -= 1
+                self.active += 1
+            self.local.held = True
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    def stats(self):
+        with self.lock:
+            return {
+                "concurrency": self.concurrency,
+                "max_pending": self.max_pending,
+                "active": self.active,
+                "waiting": self.waiting,
+                "suspended": self.suspended,
+                "admitted": self.admitted,
+                "rejected": self.rejected
+            }
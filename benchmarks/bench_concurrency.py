@@ -0,0 +1,124 @@
+"""Throughput/latency of /api/detect under concurrent clients
+
+Start the server first (e.g. `python serve.py --workers 2 --threads 8`), then:
+    python benchmarks/bench_concurrency.py --url http://127.0.0.1:5000 --json results.json
+
+Each level runs `--requests` binary JPEG posts spread over N client threads
+with keep-alive connections, and reports req/s, latency percentiles and
+how many requests were shed with 503.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def demo_frame(width, height):
+    """JPEG bytes of a simple restaurant-like scene"""
+    image = np.full((height, width, 3), 240, dtype=np.uint8)
+    for i in range(6):
+        x = 100 + (i % 3) * width // 3
+        y = 100 + (i // 3) * height // 2
+        cv2.rectangle(image, (x, y), (x + 150, y + 100), (139, 69, 19), -1)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_level(url, body, clients, total_requests, query):
+    """Fire total_requests split across `clients` keep-alive connections"""
+    parsed = urlparse(url)
+    per_client = max(1, total_requests // clients)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client():
+        connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+        local_latencies = []
+        local_statuses = {}
+        for _ in range(per_client):
+            started = time.perf_counter()
+            try:
+                connection.request('POST', '/api/detect' + query, body=body,
+                                   headers={'Content-Type': 'image/jpeg'})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+                status = 'error'
+            local_latencies.append((time.perf_counter() - started) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    return {
+        "clients": clients,
+        "requests": per_client * clients,
+        "ok": ok,
+        "shed_503": statuses.get(503, 0),
+        "errors": sum(count for status, count in statuses.items() if status not in (200, 503)),
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load benchmark for /api/detect")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--clients', default='1,2,4,8,16', help="comma-separated concurrency levels")
+    parser.add_argument('--requests', type=int, default=200, help="requests per level")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--model', help="model name to request")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    body = demo_frame(args.width, args.height)
+    query = f'?model={args.model}' if args.model else ''
+
+    # Warm the server so model loading does not count against the first level
+    run_level(args.url, body, 1, 2, query)
+
+    results = []
+    print(f"{'clients':>7} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'503':>5} {'err':>5}")
+    for clients in [int(c) for c in args.clients.split(',')]:
+        row = run_level(args.url, body, clients, args.requests, query)
+        results.append(row)
+        print(f"{row['clients']:>7} {row['throughput_rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['shed_503']:>5} {row['errors']:>5}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"url": args.url, "frame": [args.width, args.height], "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""Per-stage timings of the /api/detect hot path on synthetic restaurant scenes
+
+    python benchmarks/bench_hot_path.py --json hot_path.json
+    python benchmarks/bench_hot_path.py --tables 6,50,500 --repeat 50 --json after.json --compare before.json
+
+Scenes come from YOLOTableDetector.generate_demo_image(num_tables), 6 to 500
+tables with two people at every other table. Stages are timed separately:
+
+  base64            data URL -> encoded bytes
+  image_decode      encoded JPEG -> BGR ndarray
+  inference_mock    mock_detection()
+  inference_model   one model call (only when a model is loaded)
+  box_extraction    results -> Detections -> predictions, for the scene's boxes
+  occupancy         calculate_occupancy_stats()
+  json              jsonify() of the response, as detect_tables() returns it
+  end_to_end        process_image() on the data URL, result cache off
+  end_to_end_cached process_image() answered from the result cache (when enabled)
+
+Box extraction, occupancy and JSON use the scene's ground-truth boxes so they
+scale with the scene whether or not a model is installed. --compare prints
+the p50 ratio per stage against an earlier run and exits non-zero when a
+stage got slower than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+from flask import jsonify
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from yolo_app import app, detector
+from detections import Detections
+from bench_utils import FakeResult, time_call
+
+NAMES = {0: 'person', 56: 'chair', 60: 'dining table'}
+
+
+def scene_result(num_tables):
+    """Ultralytics-shaped result holding the ground-truth boxes of a demo scene"""
+    _, _, tables = detector.demo_layout(num_tables)
+    boxes, classes = [], []
+    for x, y, occupied in tables:
+        boxes.append((x - 75, y - 50, x + 75, y + 50))
+        classes.append(60)
+        if occupied:
+            boxes.extend([(x - 45, y - 85, x - 15, y - 55), (x + 15, y - 85, x + 45, y - 55)])
+            classes.extend([0, 0])
+    xyxy = np.array(boxes, dtype=np.float32)
+    conf = np.linspace(0.95, 0.55, len(boxes), dtype=np.float32)
+    return FakeResult(xyxy, conf, np.array(classes, dtype=np.float32))
+
+
+def bench_scene(num_tables, repeat):
+    data_url = 'data:image/jpeg;base64,' + detector.generate_demo_image(num_tables, '.jpg')
+    encoded = detector.image_bytes(data_url)
+    image_np = detector.decode_image(encoded)
+    result = scene_result(num_tables)
+    detections = Detections.from_results([result], NAMES)
+
+    stages = {
+        "base64": time_call(lambda: detector.image_bytes(data_url), repeat),
+        "image_decode": time_call(lambda: detector.decode_image(encoded), repeat),
+        "inference_mock": time_call(lambda: detector.mock_detection(image_np, 0.5), repeat)
+    }
+    if detector.model_loaded:
+        model = detector.models.get()
+        stages["inference_model"] = time_call(
+            lambda: model([image_np], conf=0.5, iou=0.5, verbose=False), repeat
+        )
+    stages["box_extraction"] = time_call(
+        lambda: Detections.from_results([result], NAMES).to_predictions(), repeat
+    )
+    stages["occupancy"] = time_call(lambda: detector.calculate_occupancy_stats(detections), repeat)
+
+    stats = detector.calculate_occupancy_stats(detections)
+    response = {
+        "success": True,
+        "predictions": detections.to_predictions(),
+        "stats": stats,
+        "detection_info": {
+            "inference_time": 0,
+            "total_detections": len(detections),
+            "class_distribution": detections.class_distribution(),
+            "model_name": "benchmark"
+        }
+    }
+    with app.test_request_context():
+        stages["json"] = time_call(lambda: jsonify(response).get_data(), repeat)
+
+    # Every call sends the same bytes, so with the cache on only the first would be inferred
+    result_cache, detector.result_cache = detector.result_cache, None
+    try:
+        stages["end_to_end"] = time_call(lambda: detector.process_image(data_url), repeat)
+    finally:
+        detector.result_cache = result_cache
+    if result_cache:
+        stages["end_to_end_cached"] = time_call(lambda: detector.process_image(data_url), repeat)
+
+    return {
+        "image_shape": list(image_np.shape),
+        "jpeg_bytes": len(encoded),
+        "tables": num_tables,
+        "people": stats["total_people"],
+        "boxes": len(detections),
+        "stages": stages
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__), text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print p50 ratios against a baseline run; returns the regressed stages"""
+    regressions = []
+    print(f"\n{'scene':>6} {'stage':17} {'before':>10} {'after':>10} {'ratio':>7}")
+    for scene, result in current["scenes"].items():
+        before = baseline["scenes"].get(scene)
+        if before is None:
+            continue
+        for stage, timing in result["stages"].items():
+            if stage not in before["stages"]:
+                continue
+            old = before["stages"][stage]["p50_ms"]
+            new = timing["p50_ms"]
+            ratio = new / old if old else float('inf')
+            flag = ' <-- slower' if ratio > threshold else ''
+            if flag:
+                regressions.append((scene, stage, ratio))
+            print(f"{scene:>6} {stage:17} {old:>10.3f} {new:>10.3f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', default='6,25,100,250,500', help='comma-separated scene sizes')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--json', default=None, help='write results to this file')
+    parser.add_argument('--compare', default=None, help='earlier --json output to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='p50 ratio counted as a regression')
+    args = parser.parse_args()
+    # The model loads in the background after import
+    detector.wait_ready()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "cpu_count": os.cpu_count(),
+        "model_loaded": detector.model_loaded,
+        "repeat": args.repeat,
+        "scenes": {}
+    }
+
+    for num_tables in [int(n) for n in args.tables.split(',')]:
+        result = bench_scene(num_tables, args.repeat)
+        report["scenes"][str(num_tables)] = result
+        print(f"\n{num_tables} tables, {result['people']} people, image {result['image_shape'][1]}x{result['image_shape'][0]}")
+        for stage, timing in result["stages"].items():
+            print(f"  {stage:17} p50 {timing['p50_ms']:>9.3f} ms   p95 {timing['p95_ms']:>9.3f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than {args.threshold}x the baseline")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark dense vs grid-bucket table/person association in occupancy.py
+
+Prints a timing table and the scene size where the grid path starts to win.
+Usage: python benchmarks/bench_occupancy.py [--repeat 20] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from occupancy import box_centers, table_radii, occupied_dense, occupied_grid
+
+# (tables, people) scene sizes from a small cafe to a large food court
+SCENES = [(6, 10), (20, 40), (30, 80), (40, 120), (60, 200), (120, 400), (250, 800), (500, 1500), (1000, 4000)]
+
+
+def random_scene(num_tables, num_people, rng, width=3840, height=2160):
+    """Random x, y, width, height boxes for tables and people"""
+    tables = np.column_stack([
+        rng.integers(0, width - 200, num_tables), rng.integers(0, height - 150, num_tables),
+        rng.integers(80, 200, num_tables), rng.integers(60, 150, num_tables),
+    ])
+    people = np.column_stack([
+        rng.integers(0, width - 60, num_people), rng.integers(0, height - 120, num_people),
+        rng.integers(30, 60, num_people), rng.integers(60, 120, num_people),
+    ])
+    return tables, people
+
+
+def time_call(fn, args, repeat):
+    """Best-of-repeat wall time in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rows = []
+    crossover = None
+    print(f"{'tables':>7} {'people':>7} {'pairs':>9} {'dense_us':>10} {'grid_us':>10}")
+    for num_tables, num_people in SCENES:
+        tables, people = random_scene(num_tables, num_people, rng)
+        inputs = (box_centers(tables), table_radii(tables), box_centers(people))
+
+        dense = occupied_dense(*inputs)
+        grid = occupied_grid(*inputs)
+        if not np.array_equal(dense, grid):
+            raise AssertionError(f"dense and grid disagree for {num_tables}x{num_people}")
+
+        dense_us = time_call(occupied_dense, inputs, args.repeat)
+        grid_us = time_call(occupied_grid, inputs, args.repeat)
+        pairs = num_tables * num_people
+        if crossover is None and grid_us < dense_us:
+            crossover = pairs
+        rows.append({"tables": num_tables, "people": num_people, "pairs": pairs,
+                     "dense_us": round(dense_us, 1), "grid_us": round(grid_us, 1)})
+        print(f"{num_tables:>7} {num_people:>7} {pairs:>9} {dense_us:>10.1f} {grid_us:>10.1f}")
+
+    print(f"Grid path faster from ~{crossover} pairs" if crossover else "Dense path faster at all sizes")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"results": rows, "crossover_pairs": crossover}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
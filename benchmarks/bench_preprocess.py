@@ -0,0 +1,95 @@
+"""Decode + resize cost of a high-resolution JPEG before inference
+
+    python benchmarks/bench_preprocess.py
+    python benchmarks/bench_preprocess.py --resolution 3840x2160 --imgsz 640 --json preprocess.json
+
+Encodes one synthetic restaurant scene at --resolution and times getting it
+to model input size two ways:
+
+  full_decode_resize   cv2.imdecode at full resolution, then cv2.resize to fit
+                       --imgsz into a newly allocated letterbox image
+  reduced_decode_box   decode_for_model() (libjpeg 1/2, 1/4 or 1/8 scale decode),
+                       then letterbox into a reused LetterboxBuffers buffer
+
+Peak memory is the tracemalloc peak over one call: numpy arrays, including
+the images OpenCV returns, but not libjpeg's internal scratch buffers.
+"""
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from preprocess import letterbox, letterbox_shape, decode_for_model, LetterboxBuffers
+from synthetic_scenes import SceneGenerator, parse_resolution
+from bench_utils import time_call
+
+
+def peak_memory(fn):
+    """Peak traced bytes allocated during one call"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resolution', type=parse_resolution, default=(3840, 2160))
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--quality', type=int, default=90, help='JPEG quality of the encoded frame')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--json', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    frame = SceneGenerator(tables=12, resolution=args.resolution).render()
+    ok, encoded = cv2.imencode('.jpg', frame.image, [cv2.IMWRITE_JPEG_QUALITY, args.quality])
+    data = encoded.tobytes()
+    buffers = LetterboxBuffers()
+
+    def full_decode_resize():
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return letterbox(image, args.imgsz, stride=32)
+
+    def reduced_decode_box():
+        image, _ = decode_for_model(data, args.imgsz)
+        shape = letterbox_shape(image.shape[0], image.shape[1], args.imgsz, stride=32)
+        return letterbox(image, args.imgsz, buffers.get(shape))
+
+    decoded, scale = decode_for_model(data, args.imgsz)
+    results = {}
+    for name, fn in (("full_decode_resize", full_decode_resize), ("reduced_decode_box", reduced_decode_box)):
+        results[name] = time_call(fn, args.repeat, warmup=3, digits=3)
+        results[name]["peak_mb"] = round(peak_memory(fn) / 1e6, 2)
+
+    report = {
+        "resolution": list(args.resolution),
+        "jpeg_kb": round(len(data) / 1024, 1),
+        "imgsz": args.imgsz,
+        "reduced_decode": {"shape": list(decoded.shape[:2]), "scale": list(scale)},
+        "model_input": list(full_decode_resize()[0].shape[:2]),
+        "stages": results
+    }
+
+    print(f"{args.resolution[0]}x{args.resolution[1]} JPEG ({report['jpeg_kb']} KB) -> "
+          f"{report['model_input'][1]}x{report['model_input'][0]} model input, "
+          f"reduced decode {decoded.shape[1]}x{decoded.shape[0]}")
+    for stage, timing in results.items():
+        print(f"  {stage:20} p50 {timing['p50_ms']:>8.2f} ms   p95 {timing['p95_ms']:>8.2f} ms   "
+              f"peak {timing['peak_mb']:>7.2f} MB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Time from process start to first response, model readiness and first detection
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --json startup.json
+    YOLO_MODELS=yolov8n=yolov8n.pt python benchmarks/bench_startup.py --server gunicorn
+
+Starts serve.py (one worker) on a free port --runs times and polls it:
+
+  listening_s       the port accepts TCP connections
+  first_response_s  /api/model-status answers
+  ready_s           model-status leaves the loading/warming states
+  first_detect_s    /api/detect returns a successful result for the demo image
+
+plus the load_ms / warmup_ms the server reports itself. Medians over the
+runs are printed; the environment (YOLO_MODELS etc.) is passed through.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url, data=None, timeout=5):
+    headers = {'Content-Type': 'application/json'} if data is not None else {}
+    request = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+def measure(server, timeout):
+    """Milestone times of one server start, in seconds since launch"""
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, 'serve.py', '--server', server, '--workers', '1', '--port', str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    milestones = {}
+    status = {}
+    try:
+        deadline = started + timeout
+        while 'listening_s' not in milestones and time.perf_counter() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                milestones['listening_s'] = time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+
+        payload = None
+        while 'first_detect_s' not in milestones and time.perf_counter() < deadline:
+            try:
+                status = get_json(f'{base}/api/model-status')
+                milestones.setdefault('first_response_s', time.perf_counter() - started)
+                if status.get('state') in ('loading', 'warming'):
+                    time.sleep(0.005)
+                    continue
+                milestones.setdefault('ready_s', time.perf_counter() - started)
+                if payload is None:
+                    payload = json.dumps({"image": get_json(f'{base}/api/demo-image')["image"]}).encode()
+                if get_json(f'{base}/api/detect', payload, timeout=60).get('success'):
+                    milestones['first_detect_s'] = time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    result = {name: round(value, 3) for name, value in milestones.items()}
+    result["state"] = status.get("state")
+    result.update({f"server_{name}": value for name, value in (status.get("startup") or {}).items()
+                   if name in ('load_ms', 'warmup_ms')})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--server', choices=['waitress', 'gunicorn'], default='waitress')
+    parser.add_argument('--timeout', type=float, default=300, help='give up on a run after this many seconds')
+    parser.add_argument('--json', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    runs = [measure(args.server, args.timeout) for _ in range(args.runs)]
+    fields = ('listening_s', 'first_response_s', 'ready_s', 'first_detect_s', 'server_load_ms', 'server_warmup_ms')
+    medians = {}
+    for field in fields:
+        values = [run[field] for run in runs if run.get(field) is not None]
+        medians[field] = round(float(np.median(values)), 3) if values else None
+
+    report = {"server": args.server, "models": os.environ.get('YOLO_MODELS'), "state": runs[-1]["state"],
+              "median": medians, "runs": runs}
+    print(f"{args.server}, {args.runs} runs, model state {report['state']}")
+    for field, value in medians.items():
+        print(f"  {field:18} {value if value is not None else '-':>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Latency vs person recall of tiled inference on wide high-resolution frames
+
+    python benchmarks/bench_tiling.py
+    python benchmarks/bench_tiling.py --weights yolov8n.pt --resolution 3840x2160 --tables 150
+    python benchmarks/bench_tiling.py --tile-sizes 640,960,1280 --overlap 0.2 --json tiling.json
+
+Renders synthetic venues (exact person boxes) and runs every frame untiled
+(the whole frame letterboxed to --imgsz) and tiled at each --tile-sizes,
+always with the full-frame pass, reporting per configuration:
+
+  model_inputs   images per frame sent to the model (1 untiled)
+  p50_ms/p95_ms  wall time per frame: letterbox, model, tile merge
+  recall         ground-truth people matched by a detection at IoU >= 0.5
+  precision      person detections that matched a ground-truth person
+
+With --weights the real model runs (ultralytics .pt or .onnx). Without it a
+stand-in detector reports every ground-truth object at least --min-pixels
+tall and wide in the model input (the part inside the tile, if at least
+--min-visible of it is), so recall shows what each configuration can resolve
+and latency covers only preprocessing and merging.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from detections import Detections
+from synthetic_scenes import SceneGenerator, parse_resolution, NAMES
+from bench_utils import latency_summary
+from tiling import tile_grid, tile_batch, merge_tiles
+
+
+class SizeLimitedDetector:
+    """Ground truth an idealized model could resolve at its input size"""
+
+    def __init__(self, min_pixels=12, min_visible=0.5):
+        self.min_pixels = min_pixels
+        self.min_visible = min_visible
+
+    def detect(self, batch, transforms, regions, frame):
+        truth = frame.detections()
+        results = []
+        for (scale, pad, _), (x1, y1, x2, y2) in zip(transforms, regions):
+            boxes = truth.xyxy.astype(np.float64)
+            clipped = np.stack([np.maximum(boxes[:, 0], x1), np.maximum(boxes[:, 1], y1),
+                                np.minimum(boxes[:, 2], x2), np.minimum(boxes[:, 3], y2)], axis=1)
+            size = clipped[:, 2:] - clipped[:, :2]
+            visible = np.clip(size, 0, None).prod(axis=1) / (boxes[:, 2:] - boxes[:, :2]).prod(axis=1)
+            keep = (visible >= self.min_visible) & (size.min(axis=1) * scale >= self.min_pixels)
+            shift = np.array([x1, y1, x1, y1]) - np.array([pad[0], pad[1], pad[0], pad[1]]) / scale
+            results.append(Detections((clipped[keep] - shift) * scale, truth.conf[keep], truth.cls[keep], NAMES))
+        return results
+
+
+def box_iou_matrix(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+
+def match_count(predicted, truth, threshold=0.5):
+    """Greedy one-to-one matches at IoU >= threshold"""
+    if len(predicted) == 0 or len(truth) == 0:
+        return 0
+    iou = box_iou_matrix(predicted, truth)
+    pairs = np.argwhere(iou >= threshold)
+    pairs = pairs[np.argsort(-iou[pairs[:, 0], pairs[:, 1]], kind='stable')]
+    used_predicted, used_truth = set(), set()
+    for p, t in pairs.tolist():
+        if p not in used_predicted and t not in used_truth:
+            used_predicted.add(p)
+            used_truth.add(t)
+    return len(used_truth)
+
+
+def run(frames, detect, imgsz, tile_size, overlap, confidence, iou):
+    """Per-frame latency and summed person matches of one configuration"""
+    samples, matched, predicted, truth, inputs = [], 0, 0, 0, 0
+    for frame in frames:
+        image = frame.image
+        height, width = image.shape[:2]
+        started = time.perf_counter()
+        tiles = tile_grid(height, width, tile_size, overlap) if tile_size else np.zeros((0, 4), dtype=np.int64)
+        batch, transforms = tile_batch(image, tiles, imgsz)
+        regions = [(0, 0, width, height)] + tiles.tolist()
+        detections = merge_tiles(detect(batch, transforms, regions, frame), transforms, tiles, image.shape, iou)
+        samples.append((time.perf_counter() - started) * 1000)
+
+        people = detections.xyxy[detections.mask(('person',))]
+        truth_people = frame.person_boxes
+        matched += match_count(people, truth_people)
+        predicted += len(people)
+        truth += len(truth_people)
+        inputs = len(batch)
+
+    return {
+        "model_inputs": inputs,
+        **latency_summary(samples, digits=2),
+        "recall": round(matched / truth, 4) if truth else 0.0,
+        "precision": round(matched / predicted, 4) if predicted else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--weights', default=None, help='model weights; omitted: size-limited stand-in detector')
+    parser.add_argument('--resolution', type=parse_resolution, default=(3840, 2160))
+    parser.add_argument('--tables', type=int, default=150)
+    parser.add_argument('--frames', type=int, default=10)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--tile-sizes', default='640,960,1280')
+    parser.add_argument('--overlap', type=float, default=0.2)
+    parser.add_argument('--confidence', type=float, default=0.25)
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--min-pixels', type=int, default=12, help='stand-in detector: smallest resolvable side')
+    parser.add_argument('--min-visible', type=float, default=0.5, help='stand-in detector: visible share of a cut object')
+    parser.add_argument('--json', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    if args.weights:
+        from inference_backends import load_weights, detect_batch
+        model = load_weights(args.weights)
+
+        def detect(batch, transforms, regions, frame):
+            return detect_batch(model, list(batch), args.confidence, args.iou, args.imgsz)
+    else:
+        detect = SizeLimitedDetector(args.min_pixels, args.min_visible).detect
+
+    frames = list(SceneGenerator(tables=args.tables, resolution=args.resolution).frames(args.frames))
+    configurations = [("untiled", None)] + [(f"tiles_{size}", size) for size in
+                                           (int(value) for value in args.tile_sizes.split(','))]
+    results = {
+        name: run(frames, detect, args.imgsz, tile_size, args.overlap, args.confidence, args.iou)
+        for name, tile_size in configurations
+    }
+
+    report = {
+        "resolution": list(args.resolution),
+        "tables": args.tables,
+        "people_per_frame": round(sum(len(frame.person_boxes) for frame in frames) / len(frames), 1),
+        "detector": args.weights or f"size-limited stand-in (min {args.min_pixels}px)",
+        "imgsz": args.imgsz,
+        "overlap": args.overlap,
+        "configurations": results
+    }
+
+    print(f"{args.resolution[0]}x{args.resolution[1]}, {report['people_per_frame']} people per frame, "
+          f"detector: {report['detector']}")
+    for name, result in results.items():
+        print(f"  {name:12} inputs {result['model_inputs']:>3}   p50 {result['p50_ms']:>8.2f} ms   "
+              f"p95 {result['p95_ms']:>8.2f} ms   recall {result['recall']:.3f}   precision {result['precision']:.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Append and range-query timings of the per-table occupancy time-series store
+
+    python benchmarks/bench_timeseries.py
+    python benchmarks/bench_timeseries.py --days 7 --tables 50 --json timeseries.json
+
+Fills a temporary store with one row per second for --days days and --tables
+tables (random occupancy runs and people counts), then times:
+
+  append_row        one TimeSeriesStore.append() call, as process_image makes per frame
+  week_all_tables   the whole range, every table
+  week_one_table    the whole range, one table
+  day_one_table     a one-day window, one table
+  hour_all_tables   a one-hour window, every table
+  summarize_week    summarize() over the whole range, every table
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from timeseries_store import TimeSeriesStore, summarize
+from bench_utils import time_call
+
+
+def fill(store, camera, table_ids, start, rows, chunk=86400, seed=0):
+    """Per-second rows of occupancy that flips every few minutes per table"""
+    rng = np.random.default_rng(seed)
+    occupied = rng.random(len(table_ids)) < 0.5
+    for offset in range(0, rows, chunk):
+        count = min(chunk, rows - offset)
+        flips = rng.random((count, len(table_ids))) < 1 / 300
+        chunk_occupied = occupied ^ (np.cumsum(flips, axis=0) % 2).astype(bool)
+        occupied = chunk_occupied[-1]
+        people = np.where(chunk_occupied, rng.integers(1, 5, (count, len(table_ids))), 0)
+        store.append_many(camera, start + offset + np.arange(count), table_ids,
+                          chunk_occupied.astype(np.uint8), people.astype(np.uint16))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--tables', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='timeseries-bench-')
+    try:
+        store = TimeSeriesStore(root)
+        table_ids = [f"T{i + 1}" for i in range(args.tables)]
+        rows = int(args.days * 86400)
+        start = 1_700_000_000
+
+        started = time.perf_counter()
+        fill(store, 'bench', table_ids, start, rows)
+        fill_seconds = time.perf_counter() - started
+
+        end = start + rows
+        occupied_row = np.zeros(args.tables, dtype=np.uint8)
+        people_row = np.zeros(args.tables, dtype=np.uint16)
+        clock = [end]
+
+        def append_row():
+            clock[0] += 1
+            store.append('append', clock[0], table_ids, occupied_row, people_row)
+
+        middle = start + rows // 2
+        results = {
+            "append_row": time_call(append_row, args.repeat * 50),
+            "week_all_tables": time_call(lambda: store.query('bench', start, end), args.repeat),
+            "week_one_table": time_call(lambda: store.query('bench', start, end, ['T1']), args.repeat),
+            "day_one_table": time_call(lambda: store.query('bench', middle, middle + 86400, ['T1']), args.repeat),
+            "hour_all_tables": time_call(lambda: store.query('bench', middle, middle + 3600), args.repeat)
+        }
+        _, _, occupied, people = store.query('bench', start, end)
+        results["summarize_week"] = time_call(lambda: summarize(occupied, people), args.repeat)
+
+        disk_bytes = sum(
+            os.stat(os.path.join(directory, name)).st_blocks * 512
+            for directory, _, names in os.walk(root) for name in names
+        )
+        report = {
+            "days": args.days,
+            "tables": args.tables,
+            "rows": rows,
+            "fill_seconds": round(fill_seconds, 3),
+            "disk_mb": round(disk_bytes / 1e6, 1),
+            "store": store.stats()["bench"],
+            "stages": results
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{rows} rows x {args.tables} tables, filled in {report['fill_seconds']}s, "
+          f"{report['disk_mb']} MB on disk in {report['store']['segments']} segments")
+    for stage, timing in results.items():
+        print(f"  {stage:16} p50 {timing['p50_ms']:>9.3f} ms   p95 {timing['p95_ms']:>9.3f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
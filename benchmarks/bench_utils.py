@@ -0,0 +1,56 @@
+"""Shared helpers of the benchmarks: latency summaries and fake ultralytics results"""
+import time
+
+import numpy as np
+
+
+def latency_summary(samples, percentiles=(50, 95), digits=4):
+    """pNN_ms per percentile plus mean, min and max of millisecond samples"""
+    samples = np.asarray(samples, dtype=np.float64)
+    summary = {f"p{q}_ms": round(float(np.percentile(samples, q)), digits) for q in percentiles}
+    summary.update({
+        "mean_ms": round(float(samples.mean()), digits),
+        "min_ms": round(float(samples.min()), digits),
+        "max_ms": round(float(samples.max()), digits)
+    })
+    return summary
+
+
+def time_call(fn, repeat, warmup=2, digits=4):
+    """Summary of wall-clock milliseconds over `repeat` calls"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_summary(samples, digits=digits)
+
+
+class ArrayField:
+    """Stand-in for a torch tensor field of ultralytics boxes"""
+
+    def __init__(self, array):
+        self.array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class FakeBoxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy, self.conf, self.cls = ArrayField(xyxy), ArrayField(conf), ArrayField(cls)
+
+    def __len__(self):
+        return len(self.conf.array)
+
+
+class FakeResult:
+    """Ultralytics-shaped result of one frame, for Detections.from_results"""
+
+    def __init__(self, xyxy, conf, cls):
+        self.boxes = FakeBoxes(xyxy, conf, cls)
@@ -0,0 +1,134 @@
+"""Cold vs warm request latency: does any request pay for model warm-up?
+
+    python benchmarks/bench_warmup.py
+    python benchmarks/bench_warmup.py --requests 100 --idle 90 --json warmup.json
+    YOLO_MODELS=yolov8n=yolov8n.pt python benchmarks/bench_warmup.py --compile onnx
+
+Starts serve.py once per configuration, waits until /api/model-status
+reports the model ready and sends --requests sequential /api/detect
+requests of distinct synthetic frames (result cache off):
+
+  cold            YOLO_WARMUP_RUNS=0 and no keep-warm
+  warm            the configured warm-up (YOLO_WARMUP_RUNS, YOLO_WARMUP_SIZES)
+  warm+<mode>     warm, with YOLO_COMPILE=<mode> (--compile)
+
+and reports the first request, p50, p99 and max latency. With --idle the
+server is left without requests for that many seconds and a second series
+is sent, to show the cost of going cold again (keep-warm is YOLO_KEEP_WARM_S).
+The environment (YOLO_MODELS etc.) is passed through.
+"""
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_startup import ROOT, free_port, get_json
+from bench_utils import latency_summary
+from synthetic_scenes import SceneGenerator, parse_resolution
+
+
+def latency_stats(samples):
+    return {"first_ms": round(float(samples[0]), 1), **latency_summary(samples, (50, 99), digits=1)}
+
+
+def send_series(base, payloads):
+    samples = []
+    for payload in payloads:
+        started = time.perf_counter()
+        result = get_json(f'{base}/api/detect', payload, timeout=120)
+        if not result.get('success'):
+            raise RuntimeError(f"Detection failed: {result.get('error')}")
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(env, payloads, idle, server, timeout):
+    """Latency of a fresh server's requests after it reports ready, and after idle seconds"""
+    port = free_port()
+    base = f'http://127.0.0.1:{port}'
+    process = subprocess.Popen(
+        [sys.executable, 'serve.py', '--server', server, '--workers', '1', '--port', str(port)],
+        cwd=ROOT, env=dict(os.environ, **env), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.perf_counter() + timeout
+        status = {}
+        while status.get('state') in (None, 'loading', 'warming'):
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Server not ready after {timeout}s")
+            try:
+                status = get_json(f'{base}/api/model-status')
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.05)
+
+        result = {"state": status["state"], "startup": status.get("startup")}
+        result.update(latency_stats(send_series(base, payloads)))
+        if idle:
+            time.sleep(idle)
+            result["after_idle"] = latency_stats(send_series(base, payloads[:max(2, len(payloads) // 5)]))
+        return result
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--resolution', type=parse_resolution, default=(1920, 1080))
+    parser.add_argument('--tables', type=int, default=40)
+    parser.add_argument('--idle', type=float, default=0, help='seconds without requests before a second series')
+    parser.add_argument('--compile', default=None, help='also run warm with YOLO_COMPILE set to this mode')
+    parser.add_argument('--server', choices=['waitress', 'gunicorn'], default='waitress')
+    parser.add_argument('--timeout', type=float, default=600, help='give up waiting for readiness after this many seconds')
+    parser.add_argument('--json', default=None, help='write results to this file')
+    args = parser.parse_args()
+
+    payloads = []
+    for frame in SceneGenerator(tables=args.tables, resolution=args.resolution).frames(args.requests):
+        encoded = base64.b64encode(cv2.imencode('.jpg', frame.image)[1].tobytes()).decode()
+        payloads.append(json.dumps({"image": f"data:image/jpeg;base64,{encoded}"}).encode())
+
+    base_env = {'YOLO_RESULT_CACHE_ENTRIES': '0'}
+    configurations = {
+        "cold": dict(base_env, YOLO_WARMUP_RUNS='0', YOLO_KEEP_WARM_S='0'),
+        "warm": dict(base_env)
+    }
+    if args.compile:
+        configurations[f"warm+{args.compile}"] = dict(base_env, YOLO_COMPILE=args.compile)
+    results = {name: run(env, payloads, args.idle, args.server, args.timeout) for name, env in configurations.items()}
+
+    report = {
+        "models": os.environ.get('YOLO_MODELS'),
+        "resolution": list(args.resolution),
+        "requests": args.requests,
+        "idle_s": args.idle,
+        "configurations": results
+    }
+    print(f"{args.resolution[0]}x{args.resolution[1]}, {args.requests} requests, models {report['models']}")
+    for name, result in results.items():
+        series = [("", result)] + ([("  after idle", result["after_idle"])] if "after_idle" in result else [])
+        for label, stats in series:
+            print(f"  {name + label:22} first {stats['first_ms']:>8.1f} ms   p50 {stats['p50_ms']:>8.1f} ms   "
+                  f"p99 {stats['p99_ms']:>8.1f} ms   max {stats['max_ms']:>8.1f} ms")
+        warmup_ms = (result["startup"] or {}).get("warmup_ms")
+        if warmup_ms:
+            print(f"  {'':22} warm-up {warmup_ms} ms before ready")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
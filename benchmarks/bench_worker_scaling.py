@@ -0,0 +1,113 @@
+"""Scaling of the multi-process inference pool from 1 to N workers
+
+    python benchmarks/bench_worker_scaling.py --model yolov8n.pt --frames 200
+    python benchmarks/bench_worker_scaling.py --synthetic   # no ultralytics needed
+
+For each worker count, frames are submitted from 2 x workers client threads
+and throughput is compared with the single-worker run:
+efficiency = fps(N) / (N * fps(1)). --synthetic replaces the network with a
+fixed amount of numpy work plus real box extraction and occupancy, which
+isolates the hand-off and post-processing costs the pool parallelizes.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from worker_pool import InferenceWorkerPool, load_yolo
+from bench_utils import FakeResult
+
+
+class SyntheticModel:
+    """CPU-bound stand-in for a detector: resize, some filtering, 150 boxes"""
+
+    names = {0: 'person', 56: 'chair', 60: 'dining table'}
+
+    def __init__(self):
+        self.rng = np.random.default_rng(os.getpid())
+
+    def __call__(self, frames, conf=0.5, iou=0.5, verbose=False):
+        return [self.detect(frame, conf) for frame in frames]
+
+    def detect(self, frame, conf):
+        small = cv2.resize(frame, (640, 360), interpolation=cv2.INTER_AREA).astype(np.float32)
+        for _ in range(4):
+            small = cv2.GaussianBlur(small, (7, 7), 0)
+        height, width = frame.shape[:2]
+        count = 150
+        xy = self.rng.uniform(0, [width - 200, height - 200], (count, 2))
+        wh = self.rng.uniform(30, 200, (count, 2))
+        xyxy = np.hstack([xy, xy + wh]).astype(np.float32)
+        scores = self.rng.uniform(conf, 1, count).astype(np.float32)
+        classes = self.rng.choice([0, 0, 0, 56, 60], count).astype(np.float32)
+        return FakeResult(xyxy, scores, classes)
+
+
+def load_synthetic(path):
+    return SyntheticModel()
+
+
+def measure(pool, frame, total_frames, clients):
+    """Frames per second with `clients` threads feeding the pool"""
+    per_client = max(1, total_frames // clients)
+
+    def client():
+        for _ in range(per_client):
+            pool.infer(frame, (0.5, 0.5))
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return per_client * clients / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process-pool inference scaling benchmark")
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--synthetic', action='store_true', help="use the synthetic CPU-bound model")
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    load_fn = load_synthetic if args.synthetic else load_yolo
+    frame = np.random.default_rng(0).integers(0, 255, (args.height, args.width, 3), dtype=np.uint8)
+
+    counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n <= args.max_workers], args.max_workers})
+    rows = []
+    base_fps = None
+    print(f"{'workers':>7} {'fps':>9} {'speedup':>8} {'efficiency':>10}")
+    for workers in counts:
+        pool = InferenceWorkerPool(args.model, workers, load_fn=load_fn)
+        try:
+            measure(pool, frame, workers * 2, workers)  # warm-up
+            fps = measure(pool, frame, args.frames, workers * 2)
+        finally:
+            pool.close()
+        base_fps = base_fps or fps
+        speedup = fps / base_fps
+        rows.append({"workers": workers, "fps": round(fps, 2), "speedup": round(speedup, 3),
+                     "efficiency": round(speedup / workers, 3)})
+        print(f"{workers:>7} {fps:>9.2f} {speedup:>8.2f} {speedup / workers:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"model": 'synthetic' if args.synthetic else args.model,
+                       "frame": [args.width, args.height], "results": rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Latency and table-occupancy agreement of an INT8 model against FP32
+
+    python benchmarks/report_int8.py --fp32 yolov8n.pt --int8 yolov8n-int8.onnx --frames sample_frames/
+    python benchmarks/report_int8.py --fp32 yolov8n.onnx --int8 yolov8n-int8.onnx --frames clip.mp4 --json report.json
+
+Both models see the same frames at the same thresholds. Latency covers the
+full detect call (preprocess, inference, box decoding) per frame after a few
+warm-up runs. Agreement is measured on what the API reports: per-frame table
+and people counts, the occupied-table count, and per-table occupied/vacant
+labels for tables matched between the two runs by IoU.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from detections import TABLE_CLASSES, PERSON_CLASSES, box_iou
+from inference_backends import load_weights, detect_batch, read_calibration_frames
+from occupancy import occupancy_stats
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 2)
+
+
+def run_model(path, frames, confidence, iou, warmup):
+    """Detections, occupancy and per-frame latency for one model"""
+    model = load_weights(path)
+    for frame in frames[:warmup]:
+        detect_batch(model, [frame], confidence, iou)
+
+    latencies, outputs = [], []
+    for frame in frames:
+        started = time.perf_counter()
+        detections = detect_batch(model, [frame], confidence, iou)[0]
+        latencies.append(time.perf_counter() - started)
+        stats, occupied = occupancy_stats(detections)
+        outputs.append((detections, stats, occupied))
+    return latencies, outputs
+
+
+def matched_table_agreement(reference, candidate, match_iou=0.5):
+    """(tables matched, tables with the same occupied label) between two runs"""
+    ref_detections, _, ref_occupied = reference
+    cand_detections, _, cand_occupied = candidate
+    ref_tables = ref_detections.xyxy[ref_detections.mask(TABLE_CLASSES)]
+    cand_tables = cand_detections.xyxy[cand_detections.mask(TABLE_CLASSES)]
+    if len(ref_tables) == 0 or len(cand_tables) == 0:
+        return 0, 0
+
+    matched = agreed = 0
+    available = np.ones(len(cand_tables), dtype=bool)
+    for i, box in enumerate(ref_tables):
+        overlaps = np.where(available, box_iou(box, cand_tables), 0.0)
+        j = int(overlaps.argmax())
+        if overlaps[j] < match_iou:
+            continue
+        available[j] = False
+        matched += 1
+        agreed += int(ref_occupied[i] == cand_occupied[j])
+    return matched, agreed
+
+
+def build_report(fp32_run, int8_run):
+    fp32_latency, fp32_outputs = fp32_run
+    int8_latency, int8_outputs = int8_run
+
+    same_tables = same_occupied = same_people = 0
+    occupied_error = []
+    matched = agreed = 0
+    reference_tables = 0
+    for fp32, int8 in zip(fp32_outputs, int8_outputs):
+        fp32_stats, int8_stats = fp32[1], int8[1]
+        same_tables += fp32_stats["total_tables"] == int8_stats["total_tables"]
+        same_occupied += fp32_stats["occupied_tables"] == int8_stats["occupied_tables"]
+        same_people += fp32_stats["total_people"] == int8_stats["total_people"]
+        occupied_error.append(abs(fp32_stats["occupied_tables"] - int8_stats["occupied_tables"]))
+        reference_tables += fp32_stats["total_tables"]
+        frame_matched, frame_agreed = matched_table_agreement(fp32, int8)
+        matched += frame_matched
+        agreed += frame_agreed
+
+    frames = len(fp32_outputs)
+    fp32_p50 = np.percentile(fp32_latency, 50)
+    int8_p50 = np.percentile(int8_latency, 50)
+    return {
+        "frames": frames,
+        "latency_ms": {
+            name: {
+                "p50": percentile_ms(samples, 50),
+                "p95": percentile_ms(samples, 95),
+                "mean": round(float(np.mean(samples)) * 1000, 2)
+            }
+            for name, samples in (("fp32", fp32_latency), ("int8", int8_latency))
+        },
+        "speedup_p50": round(float(fp32_p50 / int8_p50), 2) if int8_p50 else None,
+        "agreement": {
+            "same_table_count": round(same_tables / frames, 4),
+            "same_occupied_count": round(same_occupied / frames, 4),
+            "same_people_count": round(same_people / frames, 4),
+            "mean_abs_occupied_error": round(float(np.mean(occupied_error)), 4),
+            "tables_matched": round(matched / reference_tables, 4) if reference_tables else None,
+            "matched_table_label_agreement": round(agreed / matched, 4) if matched else None
+        },
+        "detections": {
+            "fp32_people": sum(int(out[0].mask(PERSON_CLASSES).sum()) for out in fp32_outputs),
+            "int8_people": sum(int(out[0].mask(PERSON_CLASSES).sum()) for out in int8_outputs)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fp32', default='yolov8n.pt', help='reference model (.pt or FP32 .onnx)')
+    parser.add_argument('--int8', default='yolov8n-int8.onnx', help='quantized .onnx model')
+    parser.add_argument('--frames', required=True, help='directory of images or a video file')
+    parser.add_argument('--limit', type=int, default=200)
+    parser.add_argument('--confidence', type=float, default=0.5)
+    parser.add_argument('--iou', type=float, default=0.5)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--json', default=None, help='also write the report to this file')
+    args = parser.parse_args()
+
+    frames = read_calibration_frames(args.frames, args.limit)
+    if not frames:
+        sys.exit(f"No frames found in {args.frames}")
+    print(f"Comparing {args.fp32} and {args.int8} on {len(frames)} frames")
+
+    report = build_report(
+        run_model(args.fp32, frames, args.confidence, args.iou, args.warmup),
+        run_model(args.int8, frames, args.confidence, args.iou, args.warmup)
+    )
+    report["models"] = {"fp32": args.fp32, "int8": args.int8}
+
+    latency = report["latency_ms"]
+    agreement = report["agreement"]
+    print(f"{'':6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for name in ("fp32", "int8"):
+        print(f"{name:6} {latency[name]['p50']:>8} {latency[name]['p95']:>8} {latency[name]['mean']:>8}")
+    print(f"speedup (p50): {report['speedup_p50']}x")
+    print(f"frames with the same occupied-table count: {agreement['same_occupied_count']:.1%}")
+    print(f"frames with the same table count:          {agreement['same_table_count']:.1%}")
+    print(f"mean abs occupied-table error:             {agreement['mean_abs_occupied_error']}")
+    if agreement["matched_table_label_agreement"] is not None:
+        print(f"matched tables with the same label:        {agreement['matched_table_label_agreement']:.1%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
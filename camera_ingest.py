@@ -0,0 +1,264 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from video_analysis import DEFAULT_FPS
+
+# Seconds between reconnect attempts of a stream that stopped delivering frames
+RECONNECT_SECONDS = 2.0
+
+# Completed frames kept per camera for the achieved FPS and lag figures
+WINDOW = 30
+
+
+def is_stream_url(source):
+    return '://' in str(source)
+
+
+class CameraSource:
+    """One camera: a decode thread that keeps only the newest frame ready
+
+    Every frame is grabbed and retrieved (converted to BGR) so the source
+    never falls behind, and replaces the ready frame if no worker took it
+    yet: a worker always picks up the newest frame, at most one frame
+    interval old. Files are paced at their own frame rate so they behave
+    like a live camera; loop=True restarts them at the end.
+    """
+
+    def __init__(self, camera_id, source, weight=1.0, loop=False, options=None, on_ready=None):
+        self.camera_id = camera_id
+        self.source = source
+        self.weight = max(float(weight), 0.01)
+        self.loop = loop
+        self.options = options or {}
+        self.on_ready = on_ready
+        self.running = True
+        self.state = "starting"
+        self.last_error = None
+
+        # Guarded by the ingest manager's condition
+        self.pending = None
+        self.virtual_time = 0.0
+        self.in_flight = 0
+
+        self.grabbed = 0
+        self.retrieved = 0
+        self.replaced = 0
+        self.processed = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self.completed = deque(maxlen=WINDOW)
+        self.lags = deque(maxlen=WINDOW)
+        self.waits = deque(maxlen=WINDOW)
+        self.latest = None
+
+        self.thread = threading.Thread(target=self._decode_loop, name=f'ingest-{camera_id}', daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        capture = cv2.VideoCapture(self.source)
+        if is_stream_url(self.source):
+            # Don't let the backend queue stale frames ahead of us
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return capture
+
+    def _decode_loop(self):
+        while self.running:
+            capture = self._open()
+            if not capture.isOpened():
+                capture.release()
+                self.last_error = f"Could not open {self.source}"
+                if not is_stream_url(self.source):
+                    self.state = "error"
+                    return
+                self.state = "reconnecting"
+                if not self._wait_reconnect():
+                    return
+                continue
+
+            self.state = "running"
+            paced = not is_stream_url(self.source)
+            interval = 1.0 / (capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS)
+            next_due = time.perf_counter()
+            try:
+                while self.running and capture.grab():
+                    self.grabbed += 1
+                    if paced:
+                        next_due += interval
+                        delay = next_due - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    ok, frame = capture.retrieve()
+                    if ok:
+                        self.retrieved += 1
+                        self.on_ready(self, frame, time.time())
+            finally:
+                capture.release()
+
+            if not self.running:
+                return
+            if paced and not self.loop:
+                self.state = "ended"
+                return
+            # Streams drop; files with loop=True start over
+            if not paced:
+                self.state, self.last_error = "reconnecting", "Stream stopped delivering frames"
+                if not self._wait_reconnect():
+                    return
+
+    def _wait_reconnect(self):
+        deadline = time.time() + RECONNECT_SECONDS
+        while self.running and time.time() < deadline:
+            time.sleep(0.1)
+        return self.running
+
+    def record(self, result, captured_at, picked_at):
+        now = time.time()
+        self.processed += 1
+        if not result.get("success", False):
+            self.failed += 1
+        self.completed.append(now)
+        self.lags.append(now - captured_at)
+        self.waits.append(picked_at - captured_at)
+        self.latest = result
+
+    def stop(self):
+        self.running = False
+
+    def stats(self, total_processed):
+        completed = list(self.completed)
+        span = completed[-1] - completed[0] if len(completed) > 1 else 0.0
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        lags = sorted(self.lags)
+        return {
+            "source": self.source,
+            "weight": self.weight,
+            "state": self.state,
+            "last_error": self.last_error,
+            "grabbed_frames": self.grabbed,
+            "decoded_frames": self.retrieved,
+            "processed_frames": self.processed,
+            "failed_frames": self.failed,
+            # Frames replaced by a newer one before a worker took them
+            "skipped_frames": self.replaced,
+            "source_fps": round(self.grabbed / elapsed, 2),
+            "fps": round((len(completed) - 1) / span, 2) if span else 0.0,
+            # Capture to result, over the last WINDOW frames
+            "lag_ms": round(lags[len(lags) // 2] * 1000, 1) if lags else None,
+            "lag_max_ms": round(lags[-1] * 1000, 1) if lags else None,
+            "wait_ms": round(sum(self.waits) / len(self.waits) * 1000, 1) if self.waits else None,
+            "share": round(self.processed / total_processed, 4) if total_processed else 0.0
+        }
+
+
+class CameraIngest:
+    """Server-side cameras sharing a fixed number of inference workers
+
+    Workers always serve, among cameras with a frame ready, the one with the
+    lowest virtual time; each processed frame advances a camera's virtual
+    time by 1 / weight. Busy cameras therefore get inference in proportion
+    to their weights, and a camera that was idle rejoins at the current
+    virtual time instead of cashing in credit, so no camera can starve the
+    others (stride scheduling).
+    """
+
+    def __init__(self, process, workers=2):
+        self.process = process
+        self.workers = max(1, int(workers))
+        self.cameras = {}
+        self.condition = threading.Condition()
+        self.virtual_time = 0.0
+        self.closed = False
+        self.threads = []
+
+    def add(self, camera_id, source, weight=1.0, loop=False, **options):
+        """Start ingesting a video file or stream URL as camera_id"""
+        with self.condition:
+            if camera_id in self.cameras:
+                raise ValueError(f"Camera '{camera_id}' is already being ingested")
+            if not self.threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._work, name=f'ingest-worker-{i}', daemon=True)
+                    thread.start()
+                    self.threads.append(thread)
+            camera = CameraSource(camera_id, source, weight, loop, options, self._frame_ready)
+            camera.virtual_time = self.virtual_time
+            self.cameras[camera_id] = camera
+        return camera
+
+    def remove(self, camera_id):
+        with self.condition:
+            camera = self.cameras.pop(camera_id, None)
+        if camera:
+            camera.stop()
+        return camera is not None
+
+    def _frame_ready(self, camera, frame, captured_at):
+        with self.condition:
+            if camera.pending is None and not camera.in_flight:
+                # Rejoining after idling: no credit for the time without frames
+                camera.virtual_time = max(camera.virtual_time, self.virtual_time)
+            elif camera.pending is not None:
+                camera.replaced += 1
+            camera.pending = (frame, captured_at)
+            self.condition.notify()
+
+    def _next(self):
+        """Block until some camera has a frame; take the fairest one"""
+        with self.condition:
+            while True:
+                if self.closed:
+                    return None
+                # One frame per camera at a time keeps its results (and tracks) in order
+                ready = [camera for camera in self.cameras.values()
+                         if camera.pending is not None and not camera.in_flight]
+                if ready:
+                    camera = min(ready, key=lambda c: c.virtual_time)
+                    frame, captured_at = camera.pending
+                    camera.pending = None
+                    camera.in_flight += 1
+                    self.virtual_time = max(self.virtual_time, camera.virtual_time)
+                    camera.virtual_time += 1.0 / camera.weight
+                    return camera, frame, captured_at
+                self.condition.wait()
+
+    def _work(self):
+        while True:
+            picked = self._next()
+            if picked is None:
+                return
+            camera, frame, captured_at = picked
+            picked_at = time.time()
+            try:
+                result = self.process(camera.camera_id, frame, camera.options)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            with self.condition:
+                camera.in_flight -= 1
+                camera.record(result, captured_at, picked_at)
+                # Its next frame may already be waiting
+                self.condition.notify()
+
+    def latest(self, camera_id):
+        camera = self.cameras.get(camera_id)
+        return camera.latest if camera else None
+
+    def stats(self):
+        with self.condition:
+            cameras = dict(self.cameras)
+        total = sum(camera.processed for camera in cameras.values())
+        return {
+            "workers": self.workers,
+            "cameras": {camera_id: camera.stats(total) for camera_id, camera in cameras.items()}
+        }
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            cameras = list(self.cameras.values())
+            self.cameras.clear()
+            self.condition.notify_all()
+        for camera in cameras:
+            camera.stop()
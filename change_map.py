@@ -0,0 +1,161 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class ChangeMap:
+    """Background model of one static camera, run on a downscaled frame
+
+    MOG2 learns what each pixel of the empty-or-settled scene looks like;
+    pixels that no longer fit it form the change mask. A region has changed
+    when at least min_fraction of its pixels are in the mask, which is read
+    off an integral image so any number of regions costs the same.
+    """
+
+    def __init__(self, width=320, min_fraction=0.02, history=500, var_threshold=16):
+        self.width = width
+        self.min_fraction = min_fraction
+        self.history = history
+        self.var_threshold = var_threshold
+        self.kernel = np.ones((3, 3), dtype=np.uint8)
+        self.subtractor = None
+        self.shape = None
+        self.lock = threading.Lock()
+
+    def mask(self, frame):
+        """Change mask of frame at working resolution, and the scale it was taken at"""
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.width / width)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+        with self.lock:
+            if self.shape != frame.shape:
+                # New camera or resolution: start learning the background again
+                self.subtractor = cv2.createBackgroundSubtractorMOG2(self.history, self.var_threshold,
+                                                                     detectShadows=False)
+                # One mode per pixel: with several, a seat emptying again matches the
+                # empty-seat mode still in the mixture and never shows up as change
+                self.subtractor.setNMixtures(1)
+                self.shape = frame.shape
+            mask = self.subtractor.apply(frame)
+        # Isolated pixels are sensor noise and JPEG artefacts, not people
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel), scale
+
+    def changed_fractions(self, frame, regions):
+        """Fraction of changed pixels inside each x1, y1, x2, y2 region (frame pixels)"""
+        mask, scale = self.mask(frame)
+        height, width = mask.shape
+        integral = cv2.integral((mask > 0).astype(np.uint8))
+
+        regions = np.asarray(regions, dtype=np.float64).reshape(-1, 4) * scale
+        x1 = np.clip(np.floor(regions[:, 0]).astype(np.int64), 0, width)
+        y1 = np.clip(np.floor(regions[:, 1]).astype(np.int64), 0, height)
+        x2 = np.clip(np.ceil(regions[:, 2]).astype(np.int64), 0, width)
+        y2 = np.clip(np.ceil(regions[:, 3]).astype(np.int64), 0, height)
+        counts = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        area = np.maximum((x2 - x1) * (y2 - y1), 1)
+        return counts / area
+
+    def changed(self, frame, regions):
+        return self.changed_fractions(frame, regions) >= self.min_fraction
+
+
+class CameraTables:
+    """Change map and the last inferred objects of every table of one camera"""
+
+    def __init__(self, change_map):
+        self.change_map = change_map
+        self.key = None
+        # Per table: (xyxy, conf, class_ids) in frame pixels from its last inference
+        self.objects = None
+        self.names = None
+        self.inferred_at = None
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.inferred = 0
+        self.reused = 0
+
+
+class FloorPlanChanges:
+    """Re-infer only the floor-plan tables whose region changed
+
+    Each frame of a floor-plan camera updates that camera's ChangeMap; tables
+    whose padded crop region changed are inferred again, and every other
+    table keeps the objects (and so the occupied/vacant state and people
+    count) from its last inference. A table is still re-inferred after
+    refresh_seconds without one, so a slow drift into the background model
+    can't freeze its state.
+    """
+
+    def __init__(self, width=320, min_fraction=0.02, refresh_seconds=10.0):
+        self.width = width
+        self.min_fraction = min_fraction
+        self.refresh_seconds = refresh_seconds
+        self.cameras = {}
+        self.lock = threading.Lock()
+
+    def _camera(self, camera):
+        with self.lock:
+            state = self.cameras.get(camera)
+            if state is None:
+                state = self.cameras[camera] = CameraTables(ChangeMap(self.width, self.min_fraction))
+            return state
+
+    def tables_to_infer(self, camera, frame, regions, key):
+        """Boolean mask of the tables (crop regions) that need inference for this frame"""
+        state = self._camera(camera)
+        changed = state.change_map.changed(frame, regions)
+        now = time.time()
+        with state.lock:
+            state.frames += 1
+            if state.key != key or state.objects is None or len(state.objects) != len(regions):
+                return np.ones(len(regions), dtype=bool)
+            return changed | (now - state.inferred_at >= self.refresh_seconds)
+
+    def merge(self, camera, key, infer, objects, names):
+        """Fill the tables that weren't inferred from the camera's last objects and remember the new ones
+
+        objects holds (xyxy, conf, class_ids) for inferred tables and None for
+        the rest; returns the completed list and the class names to use.
+        """
+        state = self._camera(camera)
+        now = time.time()
+        with state.lock:
+            if state.key != key or state.objects is None or len(state.objects) != len(objects):
+                state.key = key
+                state.objects = [None] * len(objects)
+                state.inferred_at = np.zeros(len(objects))
+            merged = []
+            for i, table_objects in enumerate(objects):
+                if infer[i] or state.objects[i] is None:
+                    state.objects[i] = table_objects
+                    state.inferred_at[i] = now
+                merged.append(state.objects[i])
+            if names is not None:
+                state.names = names
+            state.inferred += int(infer.sum())
+            state.reused += len(objects) - int(infer.sum())
+            return merged, state.names
+
+    def stats(self):
+        with self.lock:
+            cameras = dict(self.cameras)
+        result = {}
+        for camera, state in cameras.items():
+            with state.lock:
+                checked = state.inferred + state.reused
+                result[camera] = {
+                    "frames": state.frames,
+                    "inferred_tables": state.inferred,
+                    "reused_tables": state.reused,
+                    "reuse_rate": round(state.reused / checked, 4) if checked else 0.0
+                }
+        return {
+            "width": self.width,
+            "min_changed_fraction": self.min_fraction,
+            "refresh_seconds": self.refresh_seconds,
+            "cameras": result
+        }
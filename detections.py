@@ -0,0 +1,119 @@
+import numpy as np
+
+TABLE_CLASSES = ('dining table', 'table')
+PERSON_CLASSES = ('person',)
+CHAIR_CLASSES = ('chair',)
+
+
+class Detections:
+    """Columnar detections for one frame: boxes, scores and class ids as arrays"""
+
+    def __init__(self, xyxy, conf, cls, names):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.int64).reshape(-1)
+        self.names = names
+        # Per-stage seconds of the model call that produced these, if known
+        self.timings = {}
+
+        # Label lookup table so class names are resolved with one fancy-index
+        size = max(names) + 1 if names else 0
+        self.name_table = np.array([names.get(i, str(i)) for i in range(size)], dtype=object)
+        self.labels = self.name_table[self.cls] if len(self.cls) else np.empty(0, dtype=object)
+
+    @classmethod
+    def from_results(cls, results, names):
+        """Convert ultralytics results to arrays with one device sync per field"""
+        xyxy, conf, class_ids = [], [], []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                continue
+            xyxy.append(boxes.xyxy.cpu().numpy())
+            conf.append(boxes.conf.cpu().numpy())
+            class_ids.append(boxes.cls.cpu().numpy())
+
+        if not xyxy:
+            return cls.empty(names)
+        return cls(np.concatenate(xyxy), np.concatenate(conf), np.concatenate(class_ids), names)
+
+    @classmethod
+    def empty(cls, names):
+        return cls(np.empty((0, 4)), np.empty(0), np.empty(0), names)
+
+    def __len__(self):
+        return len(self.cls)
+
+    def mask(self, class_names):
+        """Boolean mask of detections whose class name is in class_names"""
+        return np.isin(self.labels, class_names)
+
+    def boxes_int(self):
+        """Integer x, y, width, height columns as serialized in predictions"""
+        x1y1 = self.xyxy[:, :2]
+        wh = self.xyxy[:, 2:] - x1y1
+        # astype truncates toward zero, same as int() on each scalar
+        return np.concatenate([x1y1.astype(np.int64), wh.astype(np.int64)], axis=1)
+
+    def class_distribution(self):
+        """Count of detections per class name"""
+        counts = np.bincount(self.cls, minlength=len(self.name_table))
+        present = np.flatnonzero(counts)
+        return {self.name_table[i]: int(counts[i]) for i in present}
+
+    def to_predictions(self, labels=None, track_ids=None):
+        """Serialize to the list-of-dicts format returned by the API"""
+        labels = self.labels if labels is None else labels
+        boxes = self.boxes_int().tolist()
+        conf = self.conf.tolist()
+        class_ids = self.cls.tolist()
+        predictions = [
+            {
+                "x": box[0],
+                "y": box[1],
+                "width": box[2],
+                "height": box[3],
+                "confidence": score,
+                "class": label,
+                "class_id": class_id
+            }
+            for box, score, label, class_id in zip(boxes, conf, labels.tolist(), class_ids)
+        ]
+        if track_ids is not None:
+            # 0 marks classes that are not tracked
+            for prediction, track_id in zip(predictions, track_ids.tolist()):
+                prediction["track_id"] = track_id or None
+        return predictions
+
+
+def box_iou(box, boxes):
+    """IoU of one xyxy box against an (N, 4) array of boxes"""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+
+def nms(xyxy, scores, class_ids, iou_threshold=0.5):
+    """Class-aware greedy non-maximum suppression, returns kept indices
+
+    Boxes of different classes are shifted apart so one pass handles all
+    classes without ever overlapping across them.
+    """
+    if len(xyxy) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    offset = (np.ptp(xyxy) + 1) * class_ids.astype(xyxy.dtype)
+    boxes = xyxy + offset[:, None]
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while len(order):
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        order = rest[box_iou(boxes[best], boxes[rest]) <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
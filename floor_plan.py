@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+
+
+class FloorPlan:
+    """Fixed table regions for one camera
+
+    Each table is an x, y, width, height box in frame pixels. In floor-plan
+    mode the detector crops every table with padding (a fraction of the
+    table's longer side on each edge) and runs all crops as one batch at
+    crop_size instead of searching the whole frame.
+    """
+
+    def __init__(self, camera, tables, padding=1.0, crop_size=320):
+        self.camera = camera
+        self.table_ids = [table["id"] for table in tables]
+        self.boxes = np.array(
+            [[table["x"], table["y"], table["width"], table["height"]] for table in tables],
+            dtype=np.int64
+        ).reshape(-1, 4)
+        self.padding = float(padding)
+        self.crop_size = int(crop_size)
+
+    def __len__(self):
+        return len(self.table_ids)
+
+    def crop_regions(self, frame_shape):
+        """Padded x1, y1, x2, y2 crop of every table, clipped to the frame"""
+        height, width = frame_shape[:2]
+        pad = (self.boxes[:, 2:4].max(axis=1) * self.padding).astype(np.int64)
+        x1 = np.clip(self.boxes[:, 0] - pad, 0, width)
+        y1 = np.clip(self.boxes[:, 1] - pad, 0, height)
+        x2 = np.clip(self.boxes[:, 0] + self.boxes[:, 2] + pad, 0, width)
+        y2 = np.clip(self.boxes[:, 1] + self.boxes[:, 3] + pad, 0, height)
+        return np.stack([x1, y1, x2, y2], axis=1)
+
+
+def load_floor_plans(path):
+    """Read a floor-plan file into {camera: FloorPlan}"""
+    with open(path) as f:
+        config = json.load(f)
+
+    plans = {}
+    for camera, plan in config.get("cameras", {}).items():
+        plans[camera] = FloorPlan(
+            camera,
+            plan["tables"],
+            padding=plan.get("padding", 1.0),
+            crop_size=plan.get("crop_size", 320)
+        )
+    return plans
@@ -0,0 +1,215 @@
+import ast
+import importlib.util
+import os
+import time
+
+import cv2
+import numpy as np
+
+from detections import Detections, nms
+from preprocess import letterbox, unletterbox_boxes
+
+# Checked without importing: onnxruntime is only imported when an .onnx model loads
+ORT_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+
+
+# Ahead-of-time options for ultralytics weights (YOLO_COMPILE)
+EXPORT_FORMATS = {'onnx': '.onnx', 'torchscript': '.torchscript'}
+COMPILE_MODES = ('',) + tuple(EXPORT_FORMATS) + ('compile',)
+
+
+def load_weights(path, compile_mode='', imgsz=640):
+    """Load a model for the registry: .onnx through ONNX Runtime, anything else through ultralytics
+
+    compile_mode fixes the input shape of ultralytics weights ahead of the
+    first request: 'onnx' and 'torchscript' export them at imgsz, 'compile'
+    wraps the network in torch.compile after its first (eager) call.
+    """
+    if path.endswith('.onnx'):
+        return OnnxDetector(path)
+    if compile_mode not in COMPILE_MODES:
+        raise ValueError(f"Unknown compile mode: {compile_mode}")
+    if compile_mode == 'onnx':
+        return OnnxDetector(export_fixed_shape(path, 'onnx', imgsz))
+
+    from ultralytics import YOLO
+    if compile_mode == 'torchscript':
+        model = YOLO(export_fixed_shape(path, 'torchscript', imgsz), task='detect')
+        model.fixed_imgsz = imgsz
+        return model
+    model = YOLO(path)
+    model.compile_pending = compile_mode == 'compile'
+    return model
+
+
+def export_fixed_shape(weights, fmt, imgsz):
+    """Export ultralytics weights with a static imgsz input, reusing an export newer than the weights"""
+    target = f"{os.path.splitext(weights)[0]}-{imgsz}{EXPORT_FORMATS[fmt]}"
+    if os.path.exists(target) and (not os.path.exists(weights) or
+                                   os.path.getmtime(target) >= os.path.getmtime(weights)):
+        return target
+
+    from ultralytics import YOLO
+    options = {'simplify': True} if fmt == 'onnx' else {}
+    exported = YOLO(weights).export(format=fmt, imgsz=imgsz, dynamic=False, **options)
+    os.replace(exported, target)
+    print(f"Exported {weights} to {target} at {imgsz}x{imgsz}")
+    return target
+
+
+def compile_network(model):
+    """torch.compile the network an ultralytics predictor runs (the predictor exists after the first call)"""
+    import torch
+    backend = model.predictor.model
+    # Default dynamic=None: a second batch size recompiles once with a dynamic batch dimension
+    backend.model = torch.compile(backend.model)
+    model.compile_pending = False
+
+
+def detect_batch(model, frames, confidence, iou, imgsz=None):
+    """Run frames through either backend and return one Detections per frame"""
+    if isinstance(model, OnnxDetector):
+        return model.detect(frames, confidence, iou)
+    fixed_imgsz = getattr(model, 'fixed_imgsz', None)
+    if fixed_imgsz and len(frames) > 1:
+        # Exported graphs have a static batch of one
+        return [item for frame in frames for item in detect_batch(model, [frame], confidence, iou)]
+    imgsz = fixed_imgsz or imgsz
+    kwargs = {'imgsz': imgsz} if imgsz else {}
+    started = time.perf_counter()
+    results = model(frames, conf=confidence, iou=iou, verbose=False, **kwargs)
+    called = time.perf_counter()
+    if getattr(model, 'compile_pending', False):
+        compile_network(model)
+    # Process results as arrays, one conversion per field per frame
+    detections = [Detections.from_results([result], model.names) for result in results]
+    extracted = time.perf_counter()
+
+    # ultralytics reports per-image preprocess/inference/postprocess in ms;
+    # scale back up to what the whole batch (and so each request in it) waited
+    speed = (getattr(results[0], 'speed', None) or {}) if results else {}
+    if speed.get('inference') is not None:
+        timings = {
+            "preprocess": speed.get('preprocess', 0.0) * len(frames) / 1000,
+            "forward": speed['inference'] * len(frames) / 1000,
+            "box_extraction": speed.get('postprocess', 0.0) * len(frames) / 1000 + extracted - called
+        }
+    else:
+        timings = {"forward": called - started, "box_extraction": extracted - called}
+    for item in detections:
+        item.timings = timings
+    return detections
+
+
+class OnnxDetector:
+    """YOLOv8 ONNX model (FP32 or INT8-quantized) on the ONNX Runtime CPU provider
+
+    Produces the same Detections as the ultralytics path: letterbox to the
+    model's fixed input size, decode the (4 + classes, anchors) output,
+    confidence filter, class-aware NMS, map boxes back to the frame.
+    """
+
+    def __init__(self, path, threads=None):
+        if not ORT_AVAILABLE:
+            raise ImportError("onnxruntime not available. Install with: pip install onnxruntime")
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.environ.get('YOLO_ORT_THREADS', 0))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.path = path
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.imgsz = int(model_input.shape[2]) if isinstance(model_input.shape[2], int) else 640
+        # A fixed batch dimension means frames have to go one at a time
+        self.max_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+
+        # ultralytics stores class names in the export metadata as a dict literal
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+
+    def preprocess(self, frames):
+        """Letterbox BGR frames into one NCHW float batch"""
+        batch = np.empty((len(frames), self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        transforms = []
+        for i, frame in enumerate(frames):
+            _, scale, pad = letterbox(frame, self.imgsz, out=batch[i])
+            transforms.append((scale, pad))
+        blob = batch[..., ::-1].transpose(0, 3, 1, 2).astype(np.float32) / 255.0
+        return np.ascontiguousarray(blob), transforms
+
+    def postprocess(self, output, confidence, iou, scale, pad):
+        """(4 + classes, anchors) raw output for one image into Detections"""
+        predictions = output.T
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+        keep = scores >= confidence
+        boxes, scores, class_ids = predictions[keep, :4], scores[keep], class_ids[keep]
+
+        xyxy = np.empty_like(boxes)
+        xyxy[:, :2] = boxes[:, :2] - boxes[:, 2:4] / 2
+        xyxy[:, 2:] = boxes[:, :2] + boxes[:, 2:4] / 2
+        kept = nms(xyxy, scores, class_ids, iou)
+        xyxy = unletterbox_boxes(xyxy[kept], scale, pad)
+        return Detections(xyxy, scores[kept], class_ids[kept], self.names)
+
+    def detect(self, frames, confidence=0.5, iou=0.5):
+        """One Detections per BGR frame"""
+        if isinstance(frames, np.ndarray) and frames.ndim == 3:
+            frames = [frames]
+        started = time.perf_counter()
+        blob, transforms = self.preprocess(frames)
+        preprocessed = time.perf_counter()
+
+        step = self.max_batch or len(frames)
+        outputs = []
+        for start in range(0, len(frames), step):
+            outputs.extend(self.session.run(None, {self.input_name: blob[start:start + step]})[0])
+        forwarded = time.perf_counter()
+
+        detections = [
+            self.postprocess(output, confidence, iou, scale, pad)
+            for output, (scale, pad) in zip(outputs, transforms)
+        ]
+        timings = {
+            "preprocess": preprocessed - started,
+            "forward": forwarded - preprocessed,
+            "box_extraction": time.perf_counter() - forwarded
+        }
+        for item in detections:
+            item.timings = timings
+        return detections
+
+    def __call__(self, frames, conf=0.5, iou=0.5, **kwargs):
+        return self.detect(frames, conf, iou)
+
+
+def read_calibration_frames(source, limit=200):
+    """BGR frames from an image directory or a video file, for calibration and reports"""
+    frames = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if len(frames) >= limit:
+                break
+            frame = cv2.imread(os.path.join(source, name), cv2.IMREAD_COLOR)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    capture = cv2.VideoCapture(source)
+    total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or limit
+    stride = max(1, total // limit)
+    index = 0
+    while len(frames) < limit and capture.grab():
+        if index % stride == 0:
+            ok, frame = capture.retrieve()
+            if ok:
+                frames.append(frame)
+        index += 1
+    capture.release()
+    return frames
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class SchedulerClosed(RuntimeError):
+    """Raised when submitting to a scheduler that has been shut down"""
+
+
+class PendingFrame:
+    """A frame waiting in the scheduler queue"""
+
+    __slots__ = ('frame', 'key', 'future', 'enqueued_at')
+
+    def __init__(self, frame, key):
+        self.frame = frame
+        self.key = key
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingScheduler:
+    """Collects concurrently submitted frames into batches for one model call
+
+    run_batch(frames, key) must return one result per frame. Frames are only
+    batched together when they share the same key (e.g. thresholds), since a
+    single model call takes one set of parameters. A batch is dispatched as
+    soon as max_batch_size frames are waiting or the oldest frame has waited
+    max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=5.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+
+        # Metrics
+        self.batches = 0
+        self.frames = 0
+        self.errors = 0
+        self.batch_size_counts = {}
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+        self.total_run = 0.0
+
+        self.thread = threading.Thread(target=self._loop, name='inference-scheduler', daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, key=()):
+        """Queue a frame and return a Future resolving to its result"""
+        pending = PendingFrame(frame, key)
+        with self.condition:
+            if self.closed:
+                raise SchedulerClosed("Inference scheduler is closed")
+            self.queue.append(pending)
+            self.condition.notify()
+        return pending.future
+
+    def infer(self, frame, key=()):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(frame, key).result()
+
+    def close(self):
+        """Stop accepting frames; queued frames are still run, then the thread exits"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def _ready_count(self, key):
+        return sum(1 for pending in self.queue if pending.key == key)
+
+    def _take_batch(self):
+        """Wait for a full batch or the head frame's deadline, then pop it"""
+        with self.condition:
+            while not self.queue:
+                if self.closed:
+                    return None
+                self.condition.wait()
+
+            head = self.queue[0]
+            deadline = head.enqueued_at + self.max_wait
+            while self._ready_count(head.key) < self.max_batch_size and not self.closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            batch = []
+            kept = deque()
+            while self.queue:
+                pending = self.queue.popleft()
+                if pending.key == head.key and len(batch) < self.max_batch_size:
+                    batch.append(pending)
+                else:
+                    kept.append(pending)
+            self.queue = kept
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            try:
+                results = self.run_batch([pending.frame for pending in batch], batch[0].key)
+                for pending, result in zip(batch, results):
+                    pending.future.set_result(result)
+            except Exception as e:
+                self.errors += 1
+                for pending in batch:
+                    pending.future.set_exception(e)
+            finished = time.perf_counter()
+
+            with self.condition:
+                size = len(batch)
+                self.batches += 1
+                self.frames += size
+                self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+                for pending in batch:
+                    waited = started - pending.enqueued_at
+                    self.total_wait += waited
+                    self.max_wait_seen = max(self.max_wait_seen, waited)
+                self.total_run += finished - started
+
+    def stats(self):
+        """Queue depth, achieved batch sizes and wait times"""
+        with self.condition:
+            batches = max(self.batches, 1)
+            frames = max(self.frames, 1)
+            return {
+                "queue_depth": len(self.queue),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "frames": self.frames,
+                "errors": self.errors,
+                "avg_batch_size": round(self.frames / batches, 2),
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "avg_wait_ms": round(self.total_wait / frames * 1000, 3),
+                "max_wait_ms_seen": round(self.max_wait_seen * 1000, 3),
+                "avg_batch_run_ms": round(self.total_run / batches * 1000, 3)
+            }
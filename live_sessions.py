@@ -0,0 +1,150 @@
+import queue
+import threading
+import time
+
+from admission import Overloaded
+
+
+class LiveSession:
+    """One client's live channel: a latest-frame slot in, result events out
+
+    Uploads only ever replace the pending frame, so a client sending faster
+    than inference completes never builds a queue; the session's thread
+    always works on the newest frame and pushes each result as an event.
+    """
+
+    def __init__(self, session_id, process, max_events=4):
+        self.session_id = session_id
+        self.process = process
+        self.events = queue.Queue(maxsize=max_events)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.closed = False
+        self.listeners = 0
+        self.last_active = time.time()
+
+        # Metrics
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+
+        self.thread = threading.Thread(target=self._loop, name=f'live-{session_id}', daemon=True)
+        self.thread.start()
+
+    def submit(self, seq, image_data, options):
+        """Make this frame the next to process, replacing any frame still waiting"""
+        with self.condition:
+            if self.pending is not None:
+                self.dropped += 1
+            self.pending = (seq, image_data, options, time.time())
+            self.received += 1
+            self.last_active = time.time()
+            self.condition.notify()
+
+    def _loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                seq, image_data, options, received_at = self.pending
+                self.pending = None
+
+            try:
+                result = self.process(image_data, options)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+            result = dict(result, seq=seq, server_ms=int((time.time() - received_at) * 1000))
+            self.processed += 1
+            self.push(result)
+
+    def push(self, event):
+        """Queue an event for the listener, dropping the oldest one if it lags behind"""
+        while True:
+            try:
+                self.events.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.events.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def next_event(self, timeout):
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self):
+        return {
+            "listeners": self.listeners,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "idle_seconds": round(time.time() - self.last_active, 1)
+        }
+
+
+class LiveSessionManager:
+    """Creates live sessions on demand and reaps ones nobody listens to anymore"""
+
+    def __init__(self, process, max_sessions=32, idle_timeout=30.0):
+        self.process = process
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def open(self, session_id):
+        """Session for a connecting event listener, created if needed"""
+        with self.lock:
+            self._reap()
+            session = self.sessions.get(session_id)
+            if session is None:
+                if len(self.sessions) >= self.max_sessions:
+                    raise Overloaded("Too many live sessions")
+                session = self.sessions[session_id] = LiveSession(session_id, self.process)
+            session.listeners += 1
+            session.last_active = time.time()
+            return session
+
+    def release(self, session):
+        """Listener disconnected; the session is reaped once idle"""
+        with self.lock:
+            session.listeners -= 1
+            session.last_active = time.time()
+
+    def get(self, session_id):
+        with self.lock:
+            return self.sessions.get(session_id)
+
+    def close(self, session_id):
+        with self.lock:
+            session = self.sessions.pop(session_id, None)
+        if session:
+            session.close()
+        return session is not None
+
+    def _reap(self):
+        now = time.time()
+        for session_id, session in list(self.sessions.items()):
+            if session.listeners <= 0 and now - session.last_active > self.idle_timeout:
+                del self.sessions[session_id]
+                session.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "received": sum(session.received for session in self.sessions.values()),
+                "processed": sum(session.processed for session in self.sessions.values()),
+                "dropped": sum(session.dropped for session in self.sessions.values())
+            }
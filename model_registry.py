@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from inference_scheduler import BatchingScheduler, SchedulerClosed
+
+
+def parse_model_specs(value):
+    """Parse 'name=path,name=path' into an ordered {name: path} dict"""
+    specs = OrderedDict()
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, path = item.partition('=')
+        specs[name.strip()] = (path or name).strip()
+    return specs
+
+
+def estimate_model_bytes(model, path):
+    """Resident size of a model's weights, falling back to the file size"""
+    try:
+        module = model.model
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    except Exception:
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class ModelEntry:
+    """One registered model and, while resident, its loaded weights and scheduler"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.model = None
+        self.scheduler = None
+        self.memory_bytes = 0
+        self.load_ms = None
+        self.first_inference_ms = None
+        self.loads = 0
+        self.inferences = 0
+        self.last_used = None
+
+    @property
+    def resident(self):
+        return self.model is not None
+
+    def status(self):
+        return {
+            "path": self.path,
+            "resident": self.resident,
+            "memory_mb": round(self.memory_bytes / 2**20, 2),
+            "load_ms": self.load_ms,
+            "first_inference_ms": self.first_inference_ms,
+            "loads": self.loads,
+            "inferences": self.inferences,
+            "idle_seconds": round(time.time() - self.last_used, 1) if self.last_used else None,
+            "scheduler": self.scheduler.stats() if self.scheduler else None
+        }
+
+
+class ModelRegistry:
+    """Loads models on first use and keeps a memory-bounded LRU set resident
+
+    load_fn(path) returns a model object; batch_fn(model, frames, key) runs
+    one batched inference. Every resident model gets its own
+    BatchingScheduler, so requests for different models never share a batch.
+    """
+
+    def __init__(self, specs, load_fn, batch_fn, memory_budget_mb=1024,
+                 max_batch_size=8, max_wait_ms=5.0):
+        self.entries = OrderedDict((name, ModelEntry(name, path)) for name, path in specs.items())
+        self.default_name = next(iter(self.entries))
+        self.load_fn = load_fn
+        self.batch_fn = batch_fn
+        self.memory_budget = memory_budget_mb * 2**20
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        # LRU order of resident models, least recently used first
+        self.resident = OrderedDict()
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, name=None):
+        """Resident entry for a model, loading (and evicting) as needed"""
+        name = name or self.default_name
+        if name not in self.entries:
+            raise ValueError(f"Unknown model: {name}")
+
+        with self.lock:
+            if name in self.resident:
+                self.resident.move_to_end(name)
+                return self.entries[name]
+
+        # Loads are serialized so a burst of requests loads a model only once
+        with self.load_lock:
+            with self.lock:
+                if name in self.resident:
+                    self.resident.move_to_end(name)
+                    return self.entries[name]
+            entry = self.entries[name]
+            self._load(entry)
+            with self.lock:
+                self.resident[name] = entry
+                self._evict_over_budget(keep=name)
+            return entry
+
+    def _load(self, entry):
+        started = time.perf_counter()
+        model = self.load_fn(entry.path)
+        entry.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        entry.memory_bytes = estimate_model_bytes(model, entry.path)
+        entry.first_inference_ms = None
+        entry.loads += 1
+        entry.model = model
+        # The scheduler keeps its own reference so frames queued before an
+        # eviction can still finish on this model
+        entry.scheduler = BatchingScheduler(
+            lambda frames, key: self._run_batch(entry, model, frames, key),
+            self.max_batch_size, self.max_wait_ms
+        )
+        print(f"Loaded model '{entry.name}' from {entry.path} in {entry.load_ms}ms")
+
+    def _run_batch(self, entry, model, frames, key):
+        started = time.perf_counter()
+        results = self.batch_fn(model, frames, key)
+        if entry.first_inference_ms is None:
+            entry.first_inference_ms = round((time.perf_counter() - started) * 1000, 1)
+        entry.inferences += len(frames)
+        entry.last_used = time.time()
+        return results
+
+    def _evict_over_budget(self, keep):
+        """Drop least recently used models until resident memory fits the budget"""
+        while len(self.resident) > 1 and self.resident_bytes() > self.memory_budget:
+            name = next(n for n in self.resident if n != keep)
+            entry = self.resident.pop(name)
+            # Queued frames still run; the scheduler thread then lets the model go
+            entry.scheduler.close()
+            entry.scheduler = None
+            entry.model = None
+            entry.memory_bytes = 0
+            self.evictions += 1
+            print(f"Evicted model '{name}' to stay within the memory budget")
+
+    def resident_bytes(self):
+        return sum(entry.memory_bytes for entry in self.resident.values())
+
+    def infer(self, name, frame, key, attempts=3):
+        """Run one frame through a model's scheduler, reloading if it was just evicted"""
+        for _ in range(attempts):
+            # An eviction can clear entry.scheduler between get() and reading it
+            scheduler = self.get(name).scheduler
+            if scheduler is None:
+                continue
+            try:
+                return scheduler.infer(frame, key)
+            except SchedulerClosed:
+                pass
+        raise SchedulerClosed(f"Model '{name}' was evicted {attempts} times while in use")
+
+    def status(self):
+        with self.lock:
+            return {
+                "default": self.default_name,
+                "memory_budget_mb": round(self.memory_budget / 2**20, 2),
+                "resident_mb": round(self.resident_bytes() / 2**20, 2),
+                "evictions": self.evictions,
+                "models": {name: entry.status() for name, entry in self.entries.items()}
+            }
@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Reuses the last result of a stream while its frames stay unchanged
+
+    Each stream keeps a small grayscale thumbnail of the last frame that went
+    through inference. A new frame is compared against it by the fraction of
+    thumbnail pixels whose brightness moved by more than pixel_threshold; below
+    min_changed_fraction (and within refresh_seconds of the last inference)
+    the cached result is returned instead of running the model.
+    """
+
+    def __init__(self, min_changed_fraction=0.005, pixel_threshold=20,
+                 refresh_seconds=5.0, thumb_size=(96, 54), max_streams=64):
+        self.min_changed_fraction = min_changed_fraction
+        self.pixel_threshold = pixel_threshold
+        self.refresh_seconds = refresh_seconds
+        self.thumb_size = thumb_size
+        self.max_streams = max_streams
+
+        # stream -> (thumbnail, params key, result, inferred_at)
+        self.streams = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def thumbnail(self, image_bytes):
+        """Cheap grayscale thumbnail straight from the encoded frame
+
+        IMREAD_REDUCED_GRAYSCALE_8 lets libjpeg decode at 1/8 scale in the DCT
+        domain, so a static frame never pays for a full-resolution decode.
+        """
+        small = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if small is None:
+            return None
+        thumb = cv2.resize(small, self.thumb_size, interpolation=cv2.INTER_AREA)
+        # Light blur so sensor noise and JPEG artefacts don't count as motion
+        return cv2.GaussianBlur(thumb, (3, 3), 0)
+
+    def changed_fraction(self, previous, current):
+        """Fraction of thumbnail pixels that changed noticeably"""
+        diff = cv2.absdiff(previous, current)
+        return np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+    def lookup(self, stream, thumb, key):
+        """Cached result for a static frame, or None if inference is needed"""
+        if thumb is None:
+            return None
+        with self.lock:
+            entry = self.streams.get(stream)
+            if entry is None:
+                self.misses += 1
+                return None
+            previous, previous_key, result, inferred_at = entry
+            self.streams.move_to_end(stream)
+
+        if previous_key != key or previous.shape != thumb.shape:
+            change = 1.0
+        else:
+            change = self.changed_fraction(previous, thumb)
+        age = time.time() - inferred_at
+
+        if change >= self.min_changed_fraction or age >= self.refresh_seconds:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        reused = dict(result)
+        reused["reused"] = True
+        reused["motion"] = {"changed_fraction": round(change, 5), "result_age": round(age, 3)}
+        return reused
+
+    def update(self, stream, thumb, key, result):
+        """Remember the freshly inferred result for this stream"""
+        if thumb is None or not result.get("success"):
+            return
+        with self.lock:
+            self.streams[stream] = (thumb, key, result, time.time())
+            self.streams.move_to_end(stream)
+            while len(self.streams) > self.max_streams:
+                self.streams.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            checks = self.hits + self.misses
+            return {
+                "streams": len(self.streams),
+                "reused_frames": self.hits,
+                "inferred_frames": self.misses,
+                "reuse_rate": round(self.hits / checks, 4) if checks else 0.0,
+                "min_changed_fraction": self.min_changed_fraction,
+                "refresh_seconds": self.refresh_seconds
+            }
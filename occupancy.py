@@ -0,0 +1,148 @@
+import numpy as np
+
+from detections import TABLE_CLASSES, PERSON_CLASSES, CHAIR_CLASSES
+
+# A person within RADIUS_SCALE * max(table width, height) of a table center occupies it
+RADIUS_SCALE = 1.5
+
+# Above this many table/person pairs the grid-bucket path beats the dense matrix
+# (see benchmarks/bench_occupancy.py for the measured crossover)
+GRID_MIN_PAIRS = 8000
+
+
+def box_centers(boxes):
+    """Centers of integer x, y, width, height boxes"""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    return boxes[:, :2] + boxes[:, 2:4] / 2
+
+
+def table_radii(tables, radius_scale=RADIUS_SCALE):
+    """Occupancy radius of each table"""
+    tables = np.asarray(tables, dtype=np.float64)
+    return tables[:, 2:4].max(axis=1) * radius_scale
+
+
+def occupied_dense(table_centers, radii, person_centers):
+    """Pairwise distance matrix with a per-table radius mask, O(T*P) memory"""
+    diff = table_centers[:, None, :] - person_centers[None, :, :]
+    dist_sq = np.einsum('tpk,tpk->tp', diff, diff)
+    return (dist_sq < (radii ** 2)[:, None]).any(axis=1)
+
+
+def occupied_grid(table_centers, radii, person_centers):
+    """Uniform grid buckets of people; only neighbouring cells are compared"""
+    occupied = np.zeros(len(table_centers), dtype=bool)
+
+    # With cell size >= largest radius a table only needs its 3x3 cell neighbourhood
+    cell = max(float(radii.max()), 1.0)
+    person_cells = np.floor(person_centers / cell).astype(np.int64)
+    table_cells = np.floor(table_centers / cell).astype(np.int64)
+
+    # Sort people by a flat cell key so each cell is one contiguous run
+    origin = np.minimum(person_cells.min(axis=0), table_cells.min(axis=0)) - 1
+    span = np.maximum(person_cells.max(axis=0), table_cells.max(axis=0)) - origin + 2
+    person_keys = (person_cells[:, 0] - origin[0]) * span[1] + (person_cells[:, 1] - origin[1])
+    order = np.argsort(person_keys, kind='stable')
+    sorted_keys = person_keys[order]
+
+    offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+    neighbour_cells = table_cells[:, None, :] + offsets[None, :, :]
+    neighbour_keys = ((neighbour_cells[..., 0] - origin[0]) * span[1]
+                      + (neighbour_cells[..., 1] - origin[1])).ravel()
+    starts = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+    counts = np.searchsorted(sorted_keys, neighbour_keys, side='right') - starts
+
+    total = int(counts.sum())
+    if total == 0:
+        return occupied
+
+    # Expand every (table, cell) run into explicit candidate pairs without a Python loop
+    table_idx = np.repeat(np.repeat(np.arange(len(table_centers)), len(offsets)), counts)
+    run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    person_idx = order[np.repeat(starts, counts) + run_offsets]
+
+    diff = table_centers[table_idx] - person_centers[person_idx]
+    hits = np.einsum('nk,nk->n', diff, diff) < radii[table_idx] ** 2
+    occupied[table_idx[hits]] = True
+    return occupied
+
+
+def occupied_tables_mask(tables, people, radius_scale=RADIUS_SCALE, method='auto'):
+    """Boolean mask of tables with at least one person within their radius
+
+    tables and people are (N, 4) integer x, y, width, height boxes.
+    method is 'dense', 'grid' or 'auto' (grid once T*P exceeds GRID_MIN_PAIRS).
+    """
+    if len(tables) == 0 or len(people) == 0:
+        return np.zeros(len(tables), dtype=bool)
+
+    table_centers = box_centers(tables)
+    person_centers = box_centers(people)
+    radii = table_radii(tables, radius_scale)
+
+    if method == 'auto':
+        method = 'grid' if len(tables) * len(people) > GRID_MIN_PAIRS else 'dense'
+    if method == 'grid':
+        return occupied_grid(table_centers, radii, person_centers)
+    if method == 'dense':
+        return occupied_dense(table_centers, radii, person_centers)
+    raise ValueError(f"Unknown occupancy method: {method}")
+
+
+def assigned_people_counts(tables, people, table_index, radius_scale=RADIUS_SCALE):
+    """Per-table count of people within radius, each person tested only against
+    the table it was detected for (table_index), as in floor-plan crops"""
+    counts = np.zeros(len(tables), dtype=np.int64)
+    if len(tables) == 0 or len(people) == 0:
+        return counts
+
+    table_index = np.asarray(table_index, dtype=np.int64)
+    diff = box_centers(tables)[table_index] - box_centers(people)
+    radii = table_radii(tables, radius_scale)[table_index]
+    hits = np.einsum('nk,nk->n', diff, diff) < radii ** 2
+    return np.bincount(table_index[hits], minlength=len(tables))
+
+
+def nearest_table_counts(tables, people, radius_scale=RADIUS_SCALE):
+    """Per-table count of people, each person counted once at the nearest table
+    whose radius it is within (distance measured in units of that radius)"""
+    counts = np.zeros(len(tables), dtype=np.int64)
+    if len(tables) == 0 or len(people) == 0:
+        return counts
+
+    diff = box_centers(tables)[:, None, :] - box_centers(people)[None, :, :]
+    relative = np.einsum('tpk,tpk->tp', diff, diff) / (table_radii(tables, radius_scale) ** 2)[:, None]
+    nearest = relative.argmin(axis=0)
+    hits = relative[nearest, np.arange(len(people))] < 1
+    return np.bincount(nearest[hits], minlength=len(tables))
+
+
+def label_tables(detections, occupied):
+    """Relabel table detections as occupied_table/vacant_table in place"""
+    table_mask = detections.mask(TABLE_CLASSES)
+    detections.labels[table_mask] = np.where(occupied, 'occupied_table', 'vacant_table')
+
+
+def occupancy_stats(detections):
+    """Table occupancy statistics for one frame's Detections
+
+    Tables are relabeled in place; returns the stats dict and the per-table
+    occupied mask (in detection order) so it can be shipped without labels.
+    """
+    boxes = detections.boxes_int()
+    tables = boxes[detections.mask(TABLE_CLASSES)]
+    people = boxes[detections.mask(PERSON_CLASSES)]
+
+    # Simple occupancy logic: table is occupied if people are detected near it
+    occupied = occupied_tables_mask(tables, people)
+    label_tables(detections, occupied)
+    occupied_tables = int(occupied.sum())
+
+    stats = {
+        "total_tables": len(tables),
+        "occupied_tables": occupied_tables,
+        "vacant_tables": len(tables) - occupied_tables,
+        "total_people": len(people),
+        "total_chairs": int(detections.mask(CHAIR_CLASSES).sum())
+    }
+    return stats, occupied
@@ -0,0 +1,125 @@
+import threading
+
+import cv2
+import numpy as np
+
+PAD_VALUE = 114  # same gray ultralytics pads with
+
+# libjpeg can decode straight to 1/2, 1/4 or 1/8 scale in the DCT domain
+REDUCED_COLOR_FLAGS = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def letterbox_shape(height, width, size, stride=None):
+    """Output (height, width) of letterbox(): size x size, or with a stride the
+    resized image padded only up to the next multiple of it (ultralytics' rect mode)"""
+    if stride is None:
+        return size, size
+    scale = min(size / width, size / height)
+    new_width = max(1, int(round(width * scale)))
+    new_height = max(1, int(round(height * scale)))
+    return -(-new_height // stride) * stride, -(-new_width // stride) * stride
+
+
+def letterbox(image, size, out=None, stride=None):
+    """Resize image to fit a size x size square, keeping aspect ratio
+
+    The result is written into out (a uint8 array of letterbox_shape() x 3)
+    when given, so callers can fill slices of a preallocated batch or reuse a
+    buffer. Returns the letterboxed image, the scale factor and the (x, y)
+    padding needed to map boxes back.
+    """
+    height, width = image.shape[:2]
+    if out is None:
+        out = np.empty(letterbox_shape(height, width, size, stride) + (3,), dtype=np.uint8)
+
+    scale = min(size / width, size / height)
+    new_width = max(1, int(round(width * scale)))
+    new_height = max(1, int(round(height * scale)))
+    pad_x = (out.shape[1] - new_width) // 2
+    pad_y = (out.shape[0] - new_height) // 2
+
+    out[...] = PAD_VALUE
+    target = out[pad_y:pad_y + new_height, pad_x:pad_x + new_width]
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    cv2.resize(image, (new_width, new_height), dst=target, interpolation=interpolation)
+    return out, scale, (pad_x, pad_y)
+
+
+def unletterbox_boxes(xyxy, scale, pad, offset=(0, 0)):
+    """Map xyxy boxes from letterboxed coordinates back to the source image"""
+    xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+    shift = np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+    origin = np.array([offset[0], offset[1], offset[0], offset[1]], dtype=np.float32)
+    return (xyxy - shift) / scale + origin
+
+
+class LetterboxBuffers:
+    """Letterbox output buffers reused per thread, one per output shape
+
+    A request thread blocks until its frame has been inferred, so its buffer
+    is free again by the time the thread letterboxes its next frame.
+    """
+
+    def __init__(self, max_shapes=4):
+        self.max_shapes = max_shapes
+        self.local = threading.local()
+
+    def get(self, shape):
+        buffers = getattr(self.local, 'buffers', None)
+        if buffers is None:
+            buffers = self.local.buffers = {}
+        buffer = buffers.get(shape)
+        if buffer is None:
+            if len(buffers) >= self.max_shapes:
+                buffers.clear()
+            buffer = buffers[shape] = np.empty(shape + (3,), dtype=np.uint8)
+        return buffer
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG's frame header, or None for other formats"""
+    if data[:2] != b'\xff\xd8':
+        return None
+    i, end = 2, len(data) - 9
+    while i < end:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Fill byte or a marker without a length
+            i += 1 if marker == 0xFF else 2
+            continue
+        # SOF0-SOF15 except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return int.from_bytes(data[i + 7:i + 9], 'big'), int.from_bytes(data[i + 5:i + 7], 'big')
+        if marker == 0xDA:
+            return None
+        i += 2 + int.from_bytes(data[i + 2:i + 4], 'big')
+    return None
+
+
+def decode_for_model(data, size):
+    """Decode encoded image bytes at the smallest scale that still covers a size-input model
+
+    JPEGs larger than needed are decoded at 1/2, 1/4 or 1/8 scale, never
+    below what letterboxing to size keeps, so a 4K frame for a 640 model
+    is decoded at 960x540 instead of being decoded in full and resized.
+    Returns the image and the (x, y) factors mapping its coordinates back
+    to the full-resolution frame.
+    """
+    dimensions = jpeg_size(data)
+    factor = 1
+    if dimensions:
+        factor = next((f for f in (8, 4, 2) if max(dimensions) / f >= size), 1)
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), REDUCED_COLOR_FLAGS.get(factor, cv2.IMREAD_COLOR))
+    if image is None:
+        raise ValueError("Could not decode image data")
+    if factor == 1:
+        return image, (1.0, 1.0)
+
+    width, height = dimensions
+    if (image.shape[0] > image.shape[1]) != (height > width):
+        # EXIF orientation rotated the decoded image
+        width, height = height, width
+    return image, (width / image.shape[1], height / image.shape[0])
@@ -0,0 +1,107 @@
+"""Build an INT8 ONNX model for CPU-only deployments
+
+    python quantize.py --weights yolov8n.pt --calibration sample_frames/ --output yolov8n-int8.onnx
+    python quantize.py --weights yolov8n.pt --dynamic --output yolov8n-int8-dynamic.onnx
+
+The FP32 model is exported to ONNX with ultralytics, then quantized with
+ONNX Runtime. Static quantization (the default) calibrates activation ranges
+on real frames from the cameras, a directory of images or a video file,
+preprocessed exactly as at inference time. --dynamic quantizes weights only
+and needs no calibration data.
+
+Deploy by pointing the registry at the result, e.g.
+YOLO_MODELS=yolov8n=yolov8n-int8.onnx
+"""
+import argparse
+import os
+
+from inference_backends import OnnxDetector, read_calibration_frames
+
+try:
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    QUANTIZATION_AVAILABLE = True
+except ImportError:
+    CalibrationDataReader = object
+    QUANTIZATION_AVAILABLE = False
+
+
+def export_onnx(weights, imgsz=640):
+    """Export ultralytics weights to an FP32 ONNX file next to them"""
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    return model.export(format='onnx', imgsz=imgsz, dynamic=False, simplify=True)
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """Feeds letterboxed calibration frames one at a time"""
+
+    def __init__(self, fp32_path, frames):
+        detector = OnnxDetector(fp32_path)
+        self.input_name = detector.input_name
+        self.blobs = iter([detector.preprocess([frame])[0] for frame in frames])
+
+    def get_next(self):
+        blob = next(self.blobs, None)
+        return None if blob is None else {self.input_name: blob}
+
+
+def quantize(fp32_path, output, calibration=None, limit=200, dynamic=False):
+    """Quantize an FP32 ONNX model to INT8 weights (and activations when static)"""
+    if not QUANTIZATION_AVAILABLE:
+        raise ImportError("onnxruntime not available. Install with: pip install onnxruntime")
+
+    # Shape inference and graph cleanup give the quantizer a complete graph;
+    # the export has static shapes, so the symbolic pass is not needed
+    prepared = output.replace('.onnx', '-prep.onnx')
+    quant_pre_process(fp32_path, prepared, skip_symbolic_shape=True)
+    try:
+        if dynamic:
+            quantize_dynamic(prepared, output, weight_type=QuantType.QUInt8)
+            return output
+
+        frames = read_calibration_frames(calibration, limit)
+        if not frames:
+            raise ValueError(f"No calibration frames found in {calibration}")
+        print(f"Calibrating on {len(frames)} frames from {calibration}")
+        quantize_static(
+            prepared, output, FrameCalibrationReader(fp32_path, frames),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CalibrationMethod.MinMax
+        )
+        return output
+    finally:
+        if os.path.exists(prepared):
+            os.remove(prepared)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--weights', default='yolov8n.pt', help='.pt weights to export, or an FP32 .onnx file')
+    parser.add_argument('--output', default=None, help='INT8 model path (default: <weights>-int8.onnx)')
+    parser.add_argument('--calibration', default=None, help='directory of images or a video file')
+    parser.add_argument('--calibration-frames', type=int, default=200)
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--dynamic', action='store_true', help='weight-only quantization, no calibration set')
+    args = parser.parse_args()
+
+    if not args.dynamic and not args.calibration:
+        parser.error('static quantization needs --calibration (or pass --dynamic)')
+
+    fp32_path = args.weights if args.weights.endswith('.onnx') else export_onnx(args.weights, args.imgsz)
+    output = args.output or os.path.splitext(fp32_path)[0] + '-int8.onnx'
+    quantize(fp32_path, output, args.calibration, args.calibration_frames, args.dynamic)
+
+    size_fp32 = os.path.getsize(fp32_path) / 2**20
+    size_int8 = os.path.getsize(output) / 2**20
+    print(f"FP32 model: {fp32_path} ({size_fp32:.1f} MB)")
+    print(f"INT8 model: {output} ({size_int8:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
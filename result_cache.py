@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+def payload_digest(payload):
+    """Content hash of an uploaded frame (raw bytes or a base64 string)"""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_digest(payload)
+    # SHA-256 is hardware accelerated on most CPUs, faster here than md5 or blake2
+    return hashlib.sha256(payload).digest()
+
+
+class ResultCache:
+    """Detection results of recently seen frames, keyed on a hash of their bytes
+
+    Bounded by entry count and by the approximate JSON size of the stored
+    results; the least recently used entries go first, and entries older
+    than ttl_seconds are never returned.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024, ttl_seconds=30.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (result, size, stored_at)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, payload, params):
+        return payload_digest(payload), params
+
+    def lookup(self, key):
+        """Copy of the cached result for key, or None"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[2] >= self.ttl_seconds:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        result, _, stored_at = entry
+        cached = dict(result)
+        cached["cached"] = True
+        cached["cache_age"] = round(now - stored_at, 3)
+        return cached
+
+    def store(self, key, result):
+        # Roughly what the result costs to hold, measured as its JSON response
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (dict(result), size, time.time())
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hash": "xxh3_128" if XXHASH_AVAILABLE else "sha256"
+            }
@@ -0,0 +1,277 @@
+import threading
+import time
+
+import numpy as np
+
+# Bucket width in seconds and how many buckets each resolution keeps
+RESOLUTIONS = {
+    "minute": (60, 2 * 1440),
+    "hour": (3600, 60 * 24),
+    "day": (86400, 2 * 366)
+}
+
+# Summed per bucket; peaks are kept separately
+SUM_FIELDS = ('frames', 'occupancy', 'occupied', 'tables', 'people', 'arrivals')
+
+
+class RollupRing:
+    """Fixed-width time buckets of one resolution in a ring of arrays
+
+    Bucket b lives at position b % capacity; a position holding an older
+    bucket is cleared when a newer one claims it, so memory is fixed and
+    reading n buckets is O(n) whatever the frame rate was.
+    """
+
+    def __init__(self, width, capacity, offset=0):
+        self.width = width
+        self.capacity = capacity
+        # Seconds added before bucketing, so hours and days follow local time
+        self.offset = offset
+        self.index = np.full(capacity, -1, dtype=np.int64)
+        self.newest = -1
+        self.sums = {field: np.zeros(capacity) for field in SUM_FIELDS}
+        self.peak = np.zeros(capacity)
+        self.peak_time = np.zeros(capacity)
+
+    def bucket(self, timestamp):
+        return int((timestamp + self.offset) // self.width)
+
+    def bucket_start(self, bucket):
+        return bucket * self.width - self.offset
+
+    def _claim(self, bucket):
+        """Ring position of bucket, or None if it already fell out of the window"""
+        position = bucket % self.capacity
+        stored = self.index[position]
+        if stored == bucket:
+            return position
+        if stored > bucket or bucket <= self.newest - self.capacity:
+            return None
+        self.index[position] = bucket
+        self.newest = max(self.newest, bucket)
+        for values in self.sums.values():
+            values[position] = 0.0
+        self.peak[position] = 0.0
+        self.peak_time[position] = 0.0
+        return position
+
+    def add(self, timestamp, occupancy, occupied, tables, people, arrivals):
+        """Fold one frame into its bucket"""
+        position = self._claim(self.bucket(timestamp))
+        if position is None:
+            return
+        sums = self.sums
+        sums['frames'][position] += 1
+        sums['occupancy'][position] += occupancy
+        sums['occupied'][position] += occupied
+        sums['tables'][position] += tables
+        sums['people'][position] += people
+        sums['arrivals'][position] += arrivals
+        if occupancy > self.peak[position] or sums['frames'][position] == 1:
+            self.peak[position] = occupancy
+            self.peak_time[position] = timestamp
+
+    def add_many(self, timestamps, occupancy, occupied, tables, people, arrivals):
+        """Fold many frames at once (backfill); arrays share one length"""
+        buckets = np.floor((timestamps + self.offset) / self.width).astype(np.int64)
+        # Only the newest `capacity` buckets can be held
+        keep = buckets > buckets.max() - self.capacity
+        buckets, timestamps, occupancy = buckets[keep], timestamps[keep], occupancy[keep]
+        columns = {'frames': np.ones(len(buckets)), 'occupancy': occupancy, 'occupied': occupied[keep],
+                   'tables': tables[keep], 'people': people[keep], 'arrivals': arrivals[keep]}
+        unique, inverse = np.unique(buckets, return_inverse=True)
+        batch = {field: np.bincount(inverse, weights=values, minlength=len(unique)) for field, values in columns.items()}
+
+        # Earliest frame at each bucket's highest occupancy
+        order = np.lexsort((timestamps, -occupancy, inverse))
+        first = np.searchsorted(inverse[order], np.arange(len(unique)))
+        batch_peak, batch_peak_time = occupancy[order][first], timestamps[order][first]
+
+        for i, bucket in enumerate(unique.tolist()):
+            position = self._claim(bucket)
+            if position is None:
+                continue
+            fresh = self.sums['frames'][position] == 0
+            for field, values in batch.items():
+                self.sums[field][position] += values[i]
+            if fresh or batch_peak[i] > self.peak[position]:
+                self.peak[position] = batch_peak[i]
+                self.peak_time[position] = batch_peak_time[i]
+
+    def read(self, start, end):
+        """(bucket starts, sums, peak, peak_time) of held buckets overlapping [start, end]"""
+        first, last = self.bucket(start), self.bucket(end)
+        # Positions not reclaimed yet may still hold buckets older than the window
+        first = max(first, last - self.capacity + 1, self.newest - self.capacity + 1)
+        buckets = np.arange(first, last + 1, dtype=np.int64)
+        positions = buckets % self.capacity
+        held = (self.index[positions] == buckets) & (self.sums['frames'][positions] > 0)
+        positions = positions[held]
+        return (
+            self.bucket_start(buckets[held]),
+            {field: values[positions] for field, values in self.sums.items()},
+            self.peak[positions],
+            self.peak_time[positions]
+        )
+
+
+class CameraRollups:
+    """Minute, hour and day rings of one camera, fed one frame's stats at a time"""
+
+    def __init__(self, resolutions=RESOLUTIONS, offset=0):
+        self.rings = {name: RollupRing(width, capacity, offset) for name, (width, capacity) in resolutions.items()}
+        self.last_occupied = None
+        self.last_timestamp = None
+        self.lock = threading.Lock()
+        # Set once the rings hold the camera's recorded history (or there is none)
+        self.seeded = threading.Event()
+
+    def update(self, timestamp, stats):
+        total = stats.get("total_tables", 0)
+        occupied = stats.get("occupied_tables", 0)
+        occupancy = occupied / total if total else 0.0
+        with self.lock:
+            # Tables becoming occupied since the previous frame count as new parties
+            arrivals = max(0, occupied - self.last_occupied) if self.last_occupied is not None else 0
+            self.last_occupied = occupied
+            self.last_timestamp = timestamp
+            for ring in self.rings.values():
+                ring.add(timestamp, occupancy, occupied, total, stats.get("total_people", 0), arrivals)
+
+    def backfill(self, timestamps, occupied, tables, people):
+        """Seed the rings from recorded history: per-frame occupied/total table and people counts"""
+        if not len(timestamps):
+            return
+        occupied = occupied.astype(np.float64)
+        tables = tables.astype(np.float64)
+        occupancy = np.divide(occupied, tables, out=np.zeros(len(tables)), where=tables > 0)
+        arrivals = np.concatenate([[0.0], np.clip(np.diff(occupied), 0, None)])
+        with self.lock:
+            for ring in self.rings.values():
+                ring.add_many(np.asarray(timestamps, dtype=np.float64), occupancy, occupied,
+                              tables, people.astype(np.float64), arrivals)
+            self.last_occupied = int(occupied[-1])
+            self.last_timestamp = float(timestamps[-1])
+
+    def query(self, resolution, start, end):
+        """Dashboard aggregates over [start, end], read from one ring"""
+        ring = self.rings[resolution]
+        with self.lock:
+            bucket_starts, sums, peak, peak_time = ring.read(start, end)
+
+        frames = sums['frames'].sum()
+        divisor = max(frames, 1)
+        average_tables = sums['tables'].sum() / divisor
+        top = int(np.argmax(peak)) if len(peak) else None
+        bucket_frames = np.maximum(sums['frames'], 1)
+        return {
+            "resolution": resolution,
+            "bucket_seconds": ring.width,
+            "processed_frames": int(frames),
+            "average_occupancy": round(float(sums['occupancy'].sum() / divisor), 4),
+            "average_people": round(float(sums['people'].sum() / divisor), 3),
+            "peak_occupancy": round(float(peak[top]), 4) if top is not None else 0.0,
+            "peak_time": format_time(peak_time[top]) if top is not None else None,
+            # New parties seated per table over the window
+            "table_turnover_rate": round(float(sums['arrivals'].sum() / average_tables), 3) if average_tables else 0.0,
+            "occupancy_timeline": [
+                {
+                    "time": format_time(bucket_start),
+                    "timestamp": int(bucket_start),
+                    "occupancy": round(occupancy, 4),
+                    "peak_occupancy": round(bucket_peak, 4),
+                    "people": round(people, 3),
+                    "arrivals": int(arrivals),
+                    "frames": int(bucket_count)
+                }
+                for bucket_start, occupancy, bucket_peak, people, arrivals, bucket_count in zip(
+                    bucket_starts.tolist(), (sums['occupancy'] / bucket_frames).tolist(), peak.tolist(),
+                    (sums['people'] / bucket_frames).tolist(), sums['arrivals'].tolist(), sums['frames'].tolist()
+                )
+            ]
+        }
+
+
+def format_time(timestamp):
+    """Local wall-clock time of a bucket or peak"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+class OccupancyRollups:
+    """CameraRollups per camera, created on the first frame or query
+
+    history(camera, since) may return recorded (timestamps, occupied, tables,
+    people) per-frame counts; a camera's rings are seeded from it when
+    created, so aggregates survive restarts when frames are also kept in the
+    time-series store. has_history(camera) says whether there is anything
+    recorded, so queries for unknown cameras never read the store.
+    """
+
+    def __init__(self, history=None, resolutions=RESOLUTIONS, has_history=None):
+        self.history = history
+        self.has_history = has_history
+        self.resolutions = resolutions
+        # Local UTC offset at startup, so hour and day buckets start on local boundaries
+        self.offset = time.localtime().tm_gmtoff
+        self.cameras = {}
+        self.lock = threading.Lock()
+
+    def camera(self, camera, create=True):
+        """Rollups of a camera; with create=False one without frames or history isn't kept"""
+        with self.lock:
+            rollups = self.cameras.get(camera)
+            created = rollups is None
+            if created:
+                rollups = CameraRollups(self.resolutions, self.offset)
+                if not create and not (self.has_history and self.has_history(camera)):
+                    rollups.seeded.set()
+                    return rollups
+                self.cameras[camera] = rollups
+
+        if not created:
+            # Frames of a camera being seeded wait for its history, other cameras don't
+            rollups.seeded.wait()
+            return rollups
+
+        # Seeded outside the registry lock: reading the history can take a while
+        try:
+            self.seed(camera, rollups)
+        finally:
+            rollups.seeded.set()
+        if not create and rollups.last_timestamp is None:
+            with self.lock:
+                if self.cameras.get(camera) is rollups:
+                    del self.cameras[camera]
+        return rollups
+
+    def seed(self, camera, rollups):
+        if not self.history:
+            return
+        try:
+            # Only as far back as the longest ring reaches
+            span = max(width * capacity for width, capacity in self.resolutions.values())
+            history = self.history(camera, time.time() - span)
+            if history is not None:
+                rollups.backfill(*history)
+        except Exception as e:
+            print(f"Could not seed rollups for {camera}: {e}")
+
+    def update(self, camera, timestamp, stats):
+        self.camera(camera).update(timestamp, stats)
+
+    def query(self, camera, resolution='hour', start=None, end=None):
+        if resolution not in self.resolutions:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {', '.join(self.resolutions)}")
+        end = time.time() if end is None else end
+        start = end - 86400 if start is None else start
+        result = self.camera(camera, create=False).query(resolution, start, end)
+        result.update({"camera": camera, "start": start, "end": end})
+        return result
+
+    def stats(self):
+        with self.lock:
+            cameras = dict(self.cameras)
+        return {
+            camera: {"last_frame": format_time(rollups.last_timestamp) if rollups.last_timestamp else None}
+            for camera, rollups in cameras.items()
+        }
@@ -0,0 +1,104 @@
+"""Headless production serving of the detection app (no webview window)
+
+Runs the Flask app under gunicorn (multi-process, threaded workers) when it
+is installed, otherwise under waitress (single process, thread pool; the
+option on Windows). Each worker process loads its own model; inference
+concurrency and the request queue inside a worker are bounded by
+YOLO_INFERENCE_CONCURRENCY / YOLO_MAX_PENDING (see README).
+
+    pip install gunicorn          # or: pip install waitress
+    python serve.py --workers 2 --threads 8 --port 5000
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+
+
+def load_app(target):
+    """Import 'module:attribute' and return the WSGI app"""
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+
+def serve_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Imported inside each worker so every process owns its model
+            return load_app(args.app)
+
+    StandaloneApplication({
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'keepalive': args.keepalive,
+        'backlog': args.backlog,
+        'timeout': args.timeout,
+        'preload_app': False,
+    }).run()
+
+
+def serve_waitress(args):
+    from waitress import serve
+
+    if args.workers > 1:
+        print("waitress runs a single process; ignoring --workers (install gunicorn for multi-process)")
+    serve(
+        load_app(args.app),
+        host=args.host,
+        port=args.port,
+        threads=args.threads,
+        backlog=args.backlog,
+        channel_timeout=args.keepalive,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the table occupancy API headless")
+    parser.add_argument('--app', default=os.environ.get('YOLO_SERVE_APP', 'yolo_app:app'),
+                        help="WSGI app as module:attribute (default yolo_app:app)")
+    parser.add_argument('--host', default=os.environ.get('YOLO_SERVE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('YOLO_SERVE_PORT', 5000)))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('YOLO_SERVE_WORKERS', min(2, multiprocessing.cpu_count()))),
+                        help="worker processes, each with its own model")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('YOLO_SERVE_THREADS', 8)),
+                        help="request threads per worker")
+    parser.add_argument('--keepalive', type=int, default=int(os.environ.get('YOLO_SERVE_KEEPALIVE', 5)),
+                        help="seconds an idle keep-alive connection stays open")
+    parser.add_argument('--backlog', type=int, default=int(os.environ.get('YOLO_SERVE_BACKLOG', 64)),
+                        help="pending connections accepted before the OS refuses new ones")
+    parser.add_argument('--timeout', type=int, default=120,
+                        help="gunicorn worker timeout in seconds (video analysis can be long)")
+    parser.add_argument('--server', choices=['auto', 'gunicorn', 'waitress'], default='auto')
+    args = parser.parse_args()
+
+    server = args.server
+    if server == 'auto':
+        try:
+            import gunicorn  # noqa: F401
+            server = 'gunicorn'
+        except ImportError:
+            server = 'waitress'
+
+    print(f"Serving {args.app} with {server} on http://{args.host}:{args.port}")
+    if server == 'gunicorn':
+        serve_gunicorn(args)
+    else:
+        serve_waitress(args)
+
+
+if __name__ == '__main__':
+    main()
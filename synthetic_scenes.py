@@ -0,0 +1,290 @@
+"""Synthetic restaurant scenes with exact ground-truth occupancy
+
+    python synthetic_scenes.py --tables 75 --resolution 1920x1080 --frames 300 --video venue.mp4
+    python synthetic_scenes.py --tables 300 --benchmark 2000
+
+The static part of a scene (floor, tables, occluders such as plants and
+chair backs) is drawn once. Every seat's visible person pixels are
+precomputed as flat indices into the frame, so rendering a frame is one copy
+of the background plus one fancy-indexed write of all filled seats, with no
+per-object drawing calls.
+"""
+import argparse
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from detections import Detections
+
+NAMES = {0: 'person', 56: 'chair', 60: 'dining table'}
+PERSON_CLASS = 0
+TABLE_CLASS = 60
+FLOOR_COLOR = (240, 240, 240)
+GRID_COLOR = (220, 220, 220)
+OCCLUDER_COLOR = (60, 110, 60)
+
+
+class SceneFrame:
+    """One rendered frame and its ground truth"""
+
+    def __init__(self, image, table_boxes, occupied, people_counts, person_boxes, person_table, person_visible):
+        self.image = image
+        self.table_boxes = table_boxes
+        self.occupied = occupied
+        self.people_counts = people_counts
+        self.person_boxes = person_boxes
+        self.person_table = person_table
+        self.person_visible = person_visible
+
+    def detections(self):
+        """Ground truth as Detections, e.g. to check occupancy logic without a model"""
+        xyxy = np.concatenate([self.table_boxes, self.person_boxes])
+        cls = np.concatenate([
+            np.full(len(self.table_boxes), TABLE_CLASS), np.full(len(self.person_boxes), PERSON_CLASS)
+        ])
+        return Detections(xyxy, np.ones(len(cls)), cls, NAMES)
+
+    def labels(self):
+        """JSON-serializable ground truth"""
+        return {
+            "tables": [
+                {"id": i, "box": box, "occupied": occupied, "people": people}
+                for i, (box, occupied, people) in enumerate(zip(
+                    self.table_boxes.tolist(), self.occupied.tolist(), self.people_counts.tolist()
+                ))
+            ],
+            "people": [
+                {"box": box, "table": table, "visible": round(visible, 3)}
+                for box, table, visible in zip(
+                    self.person_boxes.tolist(), self.person_table.tolist(), self.person_visible.tolist()
+                )
+            ],
+            "occupied_tables": int(self.occupied.sum()),
+            "total_people": len(self.person_boxes)
+        }
+
+
+class SceneGenerator:
+    """Renders frames of a venue with `tables` tables at a given resolution
+
+    occupancy_rate is the chance a table is occupied, people_density the
+    chance each of its seats is filled once it is (at least one always is),
+    occlusion the fraction of seats partly hidden behind a static occluder.
+    change_rate is the per-frame chance a table changes state, which keeps
+    consecutive frames coherent for video.
+    """
+
+    def __init__(self, tables=6, resolution=(800, 600), occupancy_rate=0.5, people_density=0.6,
+                 occlusion=0.0, seats_per_table=4, change_rate=0.02, seed=0):
+        self.width, self.height = resolution
+        self.num_tables = tables
+        self.seats_per_table = seats_per_table
+        self.occupancy_rate = occupancy_rate
+        self.people_density = people_density
+        self.change_rate = change_rate
+        self.rng = np.random.default_rng(seed)
+
+        self.table_boxes, self.seat_boxes = self._layout()
+        self.background = self._draw_background()
+        self.seat_visible = self._add_occluders(occlusion)
+        self._index_seat_pixels()
+
+        self.seat_filled = np.zeros((tables, seats_per_table), dtype=bool)
+        self._resample(np.ones(tables, dtype=bool))
+
+    def _layout(self):
+        """Tables on a jittered grid, seats above and below each table"""
+        columns = max(1, int(np.ceil(np.sqrt(self.num_tables * self.width / self.height))))
+        rows = int(np.ceil(self.num_tables / columns))
+        cell_w, cell_h = self.width / columns, self.height / rows
+
+        index = np.arange(self.num_tables)
+        jitter = self.rng.uniform(-0.08, 0.08, (self.num_tables, 2)) * [cell_w, cell_h]
+        centers = np.stack([(index % columns + 0.5) * cell_w, (index // columns + 0.5) * cell_h], axis=1) + jitter
+        half = np.array([cell_w * 0.25, cell_h * 0.15])
+        table_boxes = np.concatenate([centers - half, centers + half], axis=1)
+
+        # Seats spread along the long sides: half above, half below the table
+        radius = min(cell_w, cell_h) * 0.1
+        per_side = int(np.ceil(self.seats_per_table / 2))
+        seat = np.arange(self.seats_per_table)
+        side = np.where(seat < per_side, -1, 1)
+        slot = seat % per_side
+        along = (slot + 0.5) / per_side * 2 - 1
+        seat_x = centers[:, :1] + along * half[0] * 0.8
+        seat_y = centers[:, 1:] + side * (half[1] + radius * 1.1)
+        seat_boxes = np.stack([seat_x - radius, seat_y - radius, seat_x + radius, seat_y + radius], axis=2)
+        return table_boxes.astype(np.float32), seat_boxes.astype(np.float32)
+
+    def _draw_background(self):
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        image[:] = FLOOR_COLOR
+        image[:, ::50] = GRID_COLOR
+        image[::50, :] = GRID_COLOR
+        for i, (x1, y1, x2, y2) in enumerate(self.table_boxes.astype(int).tolist()):
+            cv2.rectangle(image, (x1, y1), (x2, y2), (139, 69, 19), -1)
+            inset = max(1, (x2 - x1) // 15)
+            cv2.rectangle(image, (x1 + inset, y1 + inset), (x2 - inset, y2 - inset), (160, 82, 45), -1)
+            cv2.putText(image, f"T{i + 1}", (x1 + inset, y2 - inset), cv2.FONT_HERSHEY_SIMPLEX,
+                        max(0.3, (y2 - y1) / 120), (255, 255, 255), 1)
+        return image
+
+    def _add_occluders(self, occlusion):
+        """Paint occluders over the lower part of a random subset of seats"""
+        self.occluded = self.rng.random(self.seat_boxes.shape[:2]) < occlusion
+        self.occluder_cover = np.where(self.occluded, self.rng.uniform(0.3, 0.7, self.occluded.shape), 0.0)
+        for (t, s) in np.argwhere(self.occluded):
+            x1, y1, x2, y2 = self.seat_boxes[t, s]
+            top = y2 - (y2 - y1) * self.occluder_cover[t, s]
+            cv2.rectangle(self.background, (int(x1) - 2, int(top)), (int(x2) + 2, int(y2) + 2), OCCLUDER_COLOR, -1)
+        return 1.0 - self.occluder_cover
+
+    def _index_seat_pixels(self):
+        """Flat pixel indices and colors of every seat's visible person disk"""
+        pixels, colors, counts = [], [], []
+        seat_colors = self.rng.integers(40, 230, (self.seat_boxes.shape[0] * self.seat_boxes.shape[1], 3))
+        for seat, (x1, y1, x2, y2) in enumerate(self.seat_boxes.reshape(-1, 4)):
+            cx, cy, r = (x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2
+            ys, xs = np.mgrid[max(0, int(y1)):min(self.height, int(np.ceil(y2))),
+                              max(0, int(x1)):min(self.width, int(np.ceil(x2)))]
+            inside = (xs - cx) ** 2 + (ys - cy) ** 2 <= r * r
+            # Occluded rows stay as drawn in the background
+            cover = self.occluder_cover.reshape(-1)[seat]
+            if cover:
+                inside &= ys < y2 - (y2 - y1) * cover - 2
+            flat = (ys[inside] * self.width + xs[inside]).astype(np.int64)
+            pixels.append(flat)
+            colors.append(np.repeat(seat_colors[seat][None].astype(np.uint8), len(flat), axis=0))
+            counts.append(len(flat))
+        self.seat_pixels = np.concatenate(pixels)
+        self.seat_pixel_colors = np.concatenate(colors)
+        self.seat_pixel_counts = np.array(counts)
+
+    def _resample(self, tables):
+        """Draw new occupancy and seating for the selected tables"""
+        count = int(tables.sum())
+        occupied = self.rng.random(count) < self.occupancy_rate
+        seats = self.rng.random((count, self.seats_per_table)) < self.people_density
+        # An occupied table always has someone in one seat
+        seats[np.arange(count), self.rng.integers(0, self.seats_per_table, count)] = True
+        self.seat_filled[tables] = seats & occupied[:, None]
+
+    def step(self):
+        """Advance occupancy by one frame"""
+        if self.change_rate > 0:
+            changed = self.rng.random(self.num_tables) < self.change_rate
+            if changed.any():
+                self._resample(changed)
+
+    def render(self, out=None):
+        """Current state as a SceneFrame; out may be a preallocated (H, W, 3) buffer"""
+        image = out if out is not None else np.empty_like(self.background)
+        np.copyto(image, self.background)
+        filled = self.seat_filled.reshape(-1)
+        selected = np.repeat(filled, self.seat_pixel_counts)
+        image.reshape(-1, 3)[self.seat_pixels[selected]] = self.seat_pixel_colors[selected]
+
+        table_of_seat, seat_index = np.nonzero(self.seat_filled)
+        return SceneFrame(
+            image,
+            self.table_boxes,
+            self.seat_filled.any(axis=1),
+            self.seat_filled.sum(axis=1),
+            self.seat_boxes[table_of_seat, seat_index],
+            table_of_seat,
+            self.seat_visible[table_of_seat, seat_index]
+        )
+
+    def frames(self, count):
+        """Generator of `count` consecutive frames"""
+        for _ in range(count):
+            yield self.render()
+            self.step()
+
+    def write_video(self, path, count, fps=15.0, labels_path=None):
+        """Write `count` frames as an mp4 plus per-frame ground truth as JSON"""
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (self.width, self.height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for {path}")
+        labels = []
+        buffer = np.empty_like(self.background)
+        try:
+            for index in range(count):
+                frame = self.render(out=buffer)
+                writer.write(frame.image)
+                labels.append({
+                    "frame": index,
+                    "timestamp": round(index / fps, 3),
+                    "occupied": frame.occupied.tolist(),
+                    "people": frame.people_counts.tolist()
+                })
+                self.step()
+        finally:
+            writer.release()
+
+        labels_path = labels_path or path.rsplit('.', 1)[0] + '.labels.json'
+        with open(labels_path, 'w') as f:
+            json.dump({
+                "fps": fps,
+                "resolution": [self.width, self.height],
+                "table_boxes": self.table_boxes.tolist(),
+                "frames": labels
+            }, f)
+        return labels_path
+
+
+def parse_resolution(value):
+    width, _, height = value.lower().partition('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tables', type=int, default=75)
+    parser.add_argument('--resolution', type=parse_resolution, default=(1280, 720))
+    parser.add_argument('--occupancy', type=float, default=0.5, help='chance a table is occupied')
+    parser.add_argument('--density', type=float, default=0.6, help='chance a seat at an occupied table is filled')
+    parser.add_argument('--occlusion', type=float, default=0.2, help='fraction of seats partly occluded')
+    parser.add_argument('--seats', type=int, default=4)
+    parser.add_argument('--change-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=150)
+    parser.add_argument('--fps', type=float, default=15.0)
+    parser.add_argument('--video', default=None, help='write an mp4 (+ .labels.json)')
+    parser.add_argument('--images', default=None, help='write JPEG frames and labels to this directory')
+    parser.add_argument('--benchmark', type=int, default=0, help='render this many frames and report fps')
+    args = parser.parse_args()
+
+    generator = SceneGenerator(
+        args.tables, args.resolution, args.occupancy, args.density, args.occlusion,
+        args.seats, args.change_rate, args.seed
+    )
+    print(f"{args.tables} tables, {args.tables * args.seats} seats at {args.resolution[0]}x{args.resolution[1]}")
+
+    if args.benchmark:
+        buffer = np.empty_like(generator.background)
+        started = time.perf_counter()
+        for _ in range(args.benchmark):
+            generator.render(out=buffer)
+            generator.step()
+        elapsed = time.perf_counter() - started
+        print(f"Rendered {args.benchmark} frames in {elapsed:.2f}s ({args.benchmark / elapsed:.0f} fps)")
+
+    if args.video:
+        labels_path = generator.write_video(args.video, args.frames, args.fps)
+        print(f"Wrote {args.frames} frames to {args.video}, ground truth in {labels_path}")
+
+    if args.images:
+        os.makedirs(args.images, exist_ok=True)
+        for index, frame in enumerate(generator.frames(args.frames)):
+            cv2.imwrite(os.path.join(args.images, f"frame_{index:05d}.jpg"), frame.image)
+            with open(os.path.join(args.images, f"frame_{index:05d}.json"), 'w') as f:
+                json.dump(frame.labels(), f)
+        print(f"Wrote {args.frames} frames and labels to {args.images}")
+
+
+if __name__ == '__main__':
+    main()
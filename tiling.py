@@ -0,0 +1,112 @@
+import numpy as np
+
+from detections import Detections
+from preprocess import letterbox, unletterbox_boxes, PAD_VALUE
+
+# Boxes within this many frame pixels of a tile edge inside the frame are cut
+# off by the tile; the neighbouring tile (or the full-frame pass) sees them whole
+EDGE_MARGIN = 2
+
+
+def tile_grid(height, width, tile_size, overlap=0.2):
+    """x1, y1, x2, y2 of overlapping tile_size squares covering a frame
+
+    Tiles are spread evenly so neighbours overlap by at least overlap * tile_size
+    and the last row and column end on the frame edge.
+    """
+    def starts(length):
+        if length <= tile_size:
+            return np.zeros(1, dtype=np.int64)
+        stride = max(1, int(tile_size * (1 - overlap)))
+        count = int(np.ceil((length - tile_size) / stride)) + 1
+        return np.round(np.linspace(0, length - tile_size, count)).astype(np.int64)
+
+    ys, xs = np.meshgrid(starts(height), starts(width), indexing='ij')
+    x1, y1 = xs.ravel(), ys.ravel()
+    return np.stack([x1, y1, np.minimum(x1 + tile_size, width), np.minimum(y1 + tile_size, height)], axis=1)
+
+
+def tile_batch(image, tiles, size, full_frame=True):
+    """Letterbox the whole frame (optional) and every tile into one size x size batch
+
+    Returns the batch and one (scale, pad, offset) per batch entry for mapping
+    boxes back to frame pixels.
+    """
+    count = len(tiles) + int(full_frame)
+    batch = np.full((count, size, size, 3), PAD_VALUE, dtype=np.uint8)
+    transforms = []
+    if full_frame:
+        _, scale, pad = letterbox(image, size, out=batch[0])
+        transforms.append((scale, pad, (0, 0)))
+    for i, (x1, y1, x2, y2) in enumerate(tiles, start=int(full_frame)):
+        _, scale, pad = letterbox(image[y1:y2, x1:x2], size, out=batch[i])
+        transforms.append((scale, pad, (x1, y1)))
+    return batch, transforms
+
+
+def cut_by_tile(xyxy, tile, frame_shape, margin=EDGE_MARGIN):
+    """Mask of boxes touching an edge of tile that lies inside the frame"""
+    height, width = frame_shape[:2]
+    x1, y1, x2, y2 = tile
+    cut = np.zeros(len(xyxy), dtype=bool)
+    if x1 > 0:
+        cut |= xyxy[:, 0] <= x1 + margin
+    if y1 > 0:
+        cut |= xyxy[:, 1] <= y1 + margin
+    if x2 < width:
+        cut |= xyxy[:, 2] >= x2 - margin
+    if y2 < height:
+        cut |= xyxy[:, 3] >= y2 - margin
+    return cut
+
+
+def merge_nms(xyxy, scores, class_ids, iou_threshold=0.5):
+    """Class-aware NMS from one IoU matrix, returns kept indices (highest score first)
+
+    A box is dropped when any higher-scoring box of its class overlaps it by
+    more than iou_threshold (Fast NMS: suppressed boxes still suppress), which
+    is what merging the same object seen by several tiles needs, without the
+    per-box loop of greedy NMS.
+    """
+    if len(xyxy) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    order = np.argsort(-scores, kind='stable')
+    boxes = xyxy[order].astype(np.float64)
+    x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+    y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+    x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+    y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    iou = intersection / np.maximum(areas[:, None] + areas[None, :] - intersection, 1e-9)
+
+    classes = class_ids[order]
+    # Row i suppresses column j only for a higher score (i < j) of the same class
+    suppress = np.triu(iou > iou_threshold, k=1) & (classes[:, None] == classes[None, :])
+    return order[~suppress.any(axis=0)]
+
+
+def merge_tiles(tile_detections, transforms, tiles, frame_shape, iou_threshold=0.5, full_frame=True):
+    """One frame's Detections from per-tile (and full-frame) detections
+
+    Boxes are mapped back to frame pixels, boxes a tile cut off at one of its
+    inner edges are dropped, and duplicates across tiles are merged with
+    merge_nms.
+    """
+    names = tile_detections[0].names if tile_detections else {}
+    xyxy, conf, class_ids = [], [], []
+    for i, (detections, (scale, pad, offset)) in enumerate(zip(tile_detections, transforms)):
+        boxes = unletterbox_boxes(detections.xyxy, scale, pad, offset)
+        keep = np.ones(len(boxes), dtype=bool)
+        if i >= int(full_frame):
+            keep = ~cut_by_tile(boxes, tiles[i - int(full_frame)], frame_shape)
+        xyxy.append(boxes[keep])
+        conf.append(detections.conf[keep])
+        class_ids.append(detections.cls[keep])
+
+    if not xyxy:
+        return Detections.empty(names)
+    xyxy, conf, class_ids = np.concatenate(xyxy), np.concatenate(conf), np.concatenate(class_ids)
+    keep = merge_nms(xyxy, conf, class_ids, iou_threshold)
+    return Detections(xyxy[keep], conf[keep], class_ids[keep], names)
@@ -0,0 +1,380 @@
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+# Occupied cell of a table that has a column in the segment but wasn't in the frame
+UNKNOWN = 255
+
+# A segment starts with room for at least this many tables (and twice its first frame's)
+MIN_SLOTS = 16
+
+
+def camera_dirname(camera):
+    """Filesystem-safe directory name for a camera id"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(camera)) or '_'
+
+
+class Segment:
+    """Fixed-capacity block of rows for one camera, stored as raw memory-mapped columns
+
+    <name>.time      int64 milliseconds, one per row, non-decreasing
+    <name>.occupied  uint8 (slots, rows): 0 vacant, 1 occupied, UNKNOWN not seen
+    <name>.people    uint16 (slots, rows)
+    <name>.count     int64 rows written, bumped after each row's data
+    <name>.json      capacity, slot count and the table id of every used slot
+
+    Columns are stored per table slot, so one table's time window is a
+    contiguous run. Table ids get slots on first sight, so new tables (e.g.
+    new track ids) don't need a new segment until the slots run out.
+    """
+
+    def __init__(self, prefix, capacity=None, slots=None):
+        self.prefix = prefix
+        self.name = os.path.basename(prefix)
+        create = capacity is not None
+        if create:
+            self.capacity, self.slots, self.table_ids = int(capacity), int(slots), []
+        else:
+            self.reload_meta()
+        mode = 'w+' if create else 'r+'
+        self.time = np.memmap(prefix + '.time', dtype=np.int64, mode=mode, shape=(self.capacity,))
+        self.occupied = np.memmap(prefix + '.occupied', dtype=np.uint8, mode=mode, shape=(self.slots, self.capacity))
+        self.people = np.memmap(prefix + '.people', dtype=np.uint16, mode=mode, shape=(self.slots, self.capacity))
+        self.counter = np.memmap(prefix + '.count', dtype=np.int64, mode=mode, shape=(1,))
+        if create:
+            # The .json marks the segment as complete for other processes, so it goes last
+            self._write_meta()
+
+    def reload_meta(self):
+        with open(self.prefix + '.json') as f:
+            meta = json.load(f)
+        self.capacity, self.slots, self.table_ids = meta["capacity"], meta["slots"], meta["tables"]
+        self.slot_of = {table_id: slot for slot, table_id in enumerate(self.table_ids)}
+
+    def _write_meta(self):
+        self.slot_of = {table_id: slot for slot, table_id in enumerate(self.table_ids)}
+        # Replace atomically so readers in other processes never see half a file
+        temp_path = self.prefix + '.json.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({"capacity": self.capacity, "slots": self.slots, "tables": self.table_ids}, f)
+        os.replace(temp_path, self.prefix + '.json')
+
+    @property
+    def count(self):
+        return int(self.counter[0])
+
+    def first_time(self):
+        return int(self.time[0]) if self.count else None
+
+    def last_time(self):
+        count = self.count
+        return int(self.time[count - 1]) if count else None
+
+    def has_room(self, table_ids):
+        new = sum(1 for table_id in table_ids if table_id not in self.slot_of)
+        return self.count < self.capacity and len(self.table_ids) + new <= self.slots
+
+    def append(self, times, table_ids, occupied, people):
+        """Write rows: times (n,), occupied/people (n, len(table_ids))"""
+        start = self.count
+        end = start + len(times)
+        new = [table_id for table_id in table_ids if table_id not in self.slot_of]
+        if new:
+            first_new = len(self.table_ids)
+            self.table_ids.extend(new)
+            self._write_meta()
+            # Earlier rows of a newly slotted table were never seen
+            self.occupied[first_new:len(self.table_ids), :start] = UNKNOWN
+        columns = [self.slot_of[table_id] for table_id in table_ids]
+
+        # Unused slots are never written, so their pages stay sparse on disk;
+        # people cells are only ever written for tables in the frame (0 otherwise)
+        self.time[start:end] = times
+        if len(columns) < len(self.table_ids):
+            missing = np.setdiff1d(np.arange(len(self.table_ids)), columns)
+            self.occupied[missing, start:end] = UNKNOWN
+        self.occupied[columns, start:end] = np.asarray(occupied).T
+        self.people[columns, start:end] = np.asarray(people).T
+        # Count last: a concurrent reader only sees fully written rows
+        self.counter[0] = end
+
+    def rows(self, start_ms, end_ms):
+        """Row range [first, last) with start_ms <= time <= end_ms"""
+        times = self.time[:self.count]
+        first = int(np.searchsorted(times, start_ms, side='left'))
+        last = int(np.searchsorted(times, end_ms, side='right'))
+        return first, last
+
+    def flush(self):
+        for column in (self.time, self.occupied, self.people, self.counter):
+            column.flush()
+
+
+class CameraSeries:
+    """All segments of one camera; appends go to this process's newest segment
+
+    Segment names carry the writing process id, so several server processes
+    can record the same camera without sharing a file. Their segments may
+    overlap in time and are merged by timestamp at query time.
+    """
+
+    def __init__(self, directory, segment_rows):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.segments = {}
+        self.writer = None
+        self.last_ms = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def refresh(self):
+        """Open segments created since the last call (including other processes')"""
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json') and filename[:-5] not in self.segments:
+                self.segments[filename[:-5]] = Segment(os.path.join(self.directory, filename[:-5]))
+
+    def ordered_segments(self):
+        # Names start with the zero-padded first timestamp
+        return [self.segments[name] for name in sorted(self.segments)]
+
+    def append(self, times, table_ids, occupied, people):
+        with self.lock:
+            # Keep this writer's timeline sorted so range lookups can bisect
+            times = np.maximum.accumulate(np.maximum(np.asarray(times, dtype=np.int64), self.last_ms))
+            written = 0
+            while written < len(times):
+                if self.writer is None or not self.writer.has_room(table_ids):
+                    self._start_segment(int(times[written]), len(table_ids))
+                take = min(len(times) - written, self.writer.capacity - self.writer.count)
+                self.writer.append(times[written:written + take], table_ids,
+                                   occupied[written:written + take], people[written:written + take])
+                written += take
+            self.last_ms = int(times[-1])
+
+    def _start_segment(self, start_ms, tables):
+        if self.writer is not None:
+            self.writer.flush()
+        name = f'{start_ms:016d}-{os.getpid()}'
+        slots = max(MIN_SLOTS, 2 * tables)
+        self.writer = self.segments[name] = Segment(os.path.join(self.directory, name), self.segment_rows, slots)
+
+    def visible_segments(self):
+        """Every segment in start order, with table slots as of now"""
+        with self.lock:
+            self.refresh()
+            segments = self.ordered_segments()
+        for segment in segments:
+            if segment is not self.writer:
+                segment.reload_meta()
+        return segments
+
+    @staticmethod
+    def overlapping(segments, start_ms, end_ms):
+        """(segment, first row, last row) of each segment with rows in [start_ms, end_ms]"""
+        for segment in segments:
+            count = segment.count
+            if not count or segment.time[0] > end_ms or segment.time[count - 1] < start_ms:
+                continue
+            first, last = segment.rows(start_ms, end_ms)
+            if first < last:
+                yield segment, first, last
+
+    def query(self, start_ms, end_ms, table_ids=None):
+        """(times, table_ids, occupied, people) for every row in [start_ms, end_ms]"""
+        segments = self.visible_segments()
+        if table_ids is None:
+            table_ids = list(dict.fromkeys(table_id for segment in segments for table_id in segment.table_ids))
+
+        times, occupied, people = [], [], []
+        for segment, first, last in self.overlapping(segments, start_ms, end_ms):
+            times.append(np.asarray(segment.time[first:last]))
+            occupied.append(self._columns(segment.occupied, segment, table_ids, first, last, UNKNOWN))
+            people.append(self._columns(segment.people, segment, table_ids, first, last, 0))
+
+        if not times:
+            width = len(table_ids)
+            return (np.empty(0, dtype=np.int64), table_ids,
+                    np.empty((0, width), dtype=np.uint8), np.empty((0, width), dtype=np.uint16))
+
+        times = np.concatenate(times)
+        occupied, people = np.concatenate(occupied, axis=1), np.concatenate(people, axis=1)
+        if len(segments) > 1 and (np.diff(times) < 0).any():
+            # Segments from several writer processes interleave in time
+            order = np.argsort(times, kind='stable')
+            times, occupied, people = times[order], occupied[:, order], people[:, order]
+        # (rows, tables) views over table-major arrays
+        return times, table_ids, occupied.T, people.T
+
+    def totals(self, start_ms, end_ms):
+        """(times, occupied tables, seen tables, people) per row, summed over all tables"""
+        segments = self.visible_segments()
+        times, occupied, seen, people = [], [], [], []
+        for segment, first, last in self.overlapping(segments, start_ms, end_ms):
+            # One segment at a time, so a long window never holds every table column at once
+            used = len(segment.table_ids)
+            states = segment.occupied[:used, first:last]
+            times.append(np.asarray(segment.time[first:last]))
+            occupied.append(np.count_nonzero(states == 1, axis=0))
+            seen.append(np.count_nonzero(states != UNKNOWN, axis=0))
+            people.append(segment.people[:used, first:last].sum(axis=0, dtype=np.int64))
+        if not times:
+            return tuple(np.empty(0, dtype=np.int64) for _ in range(4))
+
+        times, occupied, seen, people = (np.concatenate(column) for column in (times, occupied, seen, people))
+        if len(segments) > 1 and (np.diff(times) < 0).any():
+            order = np.argsort(times, kind='stable')
+            times, occupied, seen, people = times[order], occupied[order], seen[order], people[order]
+        return times, occupied, seen, people
+
+    @staticmethod
+    def _columns(column, segment, table_ids, first, last, missing):
+        """(tables, rows) block of one column file for the requested tables"""
+        slots = [segment.slot_of.get(table_id, -1) for table_id in table_ids]
+        if slots and min(slots) >= 0 and slots == list(range(slots[0], slots[0] + len(slots))):
+            # Tables in slot order: a plain slice, copied once by the concatenate
+            return column[slots[0]:slots[0] + len(slots), first:last]
+        # Tables without a slot in this segment read as missing
+        block = np.full((len(slots), last - first), missing, dtype=column.dtype)
+        for i, slot in enumerate(slots):
+            if slot >= 0:
+                block[i] = column[slot, first:last]
+        return block
+
+    def stats(self):
+        with self.lock:
+            self.refresh()
+            segments = self.ordered_segments()
+        firsts = [segment.first_time() for segment in segments if segment.count]
+        lasts = [segment.last_time() for segment in segments if segment.count]
+        return {
+            "segments": len(segments),
+            "rows": sum(segment.count for segment in segments),
+            "tables": len({table_id for segment in segments for table_id in segment.table_ids}),
+            "first": min(firsts) / 1000 if firsts else None,
+            "last": max(lasts) / 1000 if lasts else None
+        }
+
+    def flush(self):
+        with self.lock:
+            if self.writer is not None:
+                self.writer.flush()
+
+
+class TimeSeriesStore:
+    """Append-only per-table occupancy history, one directory of segments per camera
+
+    Every recorded frame is one row: a timestamp plus the occupied state and
+    people count of each table. Rows are written straight into memory-mapped
+    column files, and a time-window query is a binary search per segment
+    followed by array slicing, so reading a week of per-second rows does not
+    touch Python objects per row.
+    """
+
+    def __init__(self, root, segment_rows=1 << 18, flush_seconds=5.0):
+        self.root = root
+        self.segment_rows = int(segment_rows)
+        self.flush_seconds = flush_seconds
+        self.cameras = {}
+        self.lock = threading.Lock()
+        self.last_flush = time.time()
+        os.makedirs(root, exist_ok=True)
+
+    def series(self, camera, create=False):
+        with self.lock:
+            series = self.cameras.get(camera)
+            if series is None:
+                directory = os.path.join(self.root, camera_dirname(camera))
+                if not create and not os.path.isdir(directory):
+                    return None
+                series = self.cameras[camera] = CameraSeries(directory, self.segment_rows)
+            return series
+
+    def append(self, camera, timestamp, table_ids, occupied, people):
+        """Record one frame: timestamp in seconds, one occupied flag and people count per table"""
+        if not table_ids:
+            return
+        self.append_many(
+            camera, [timestamp], list(table_ids),
+            np.asarray(occupied, dtype=np.uint8).reshape(1, -1),
+            np.asarray(people, dtype=np.uint16).reshape(1, -1)
+        )
+
+    def append_many(self, camera, timestamps, table_ids, occupied, people):
+        """Record several frames at once: occupied/people are (frames, tables)"""
+        times = np.round(np.asarray(timestamps, dtype=np.float64) * 1000).astype(np.int64)
+        self.series(camera, create=True).append(times, list(table_ids), occupied, people)
+        if time.time() - self.last_flush > self.flush_seconds:
+            self.flush()
+
+    def query(self, camera, start=None, end=None, tables=None):
+        """Rows of one camera between start and end (seconds, inclusive)
+
+        Returns (timestamps in seconds, table ids, occupied (rows, tables) uint8,
+        people (rows, tables) uint16). tables limits and orders the columns.
+        """
+        start_ms = -1 if start is None else int(start * 1000)
+        end_ms = np.iinfo(np.int64).max if end is None else int(end * 1000)
+        series = self.series(camera)
+        if series is None:
+            width = len(tables or [])
+            return (np.empty(0), list(tables or []),
+                    np.empty((0, width), dtype=np.uint8), np.empty((0, width), dtype=np.uint16))
+        times, table_ids, occupied, people = series.query(start_ms, end_ms, tables)
+        return times / 1000.0, table_ids, occupied, people
+
+    def totals(self, camera, start=None, end=None):
+        """Per-frame (timestamps in seconds, occupied tables, seen tables, people) of one camera"""
+        series = self.series(camera)
+        if series is None:
+            return tuple(np.empty(0) for _ in range(4))
+        start_ms = -1 if start is None else int(start * 1000)
+        end_ms = np.iinfo(np.int64).max if end is None else int(end * 1000)
+        times, occupied, seen, people = series.totals(start_ms, end_ms)
+        return times / 1000.0, occupied, seen, people
+
+    def has_camera(self, camera):
+        """Whether anything was recorded for camera, without opening its series"""
+        with self.lock:
+            if camera in self.cameras:
+                return True
+        return os.path.isdir(os.path.join(self.root, camera_dirname(camera)))
+
+    def camera_ids(self):
+        """Recorded cameras (as directory names) plus ones opened by this process"""
+        names = {camera_dirname(camera): camera for camera in self.cameras}
+        for entry in os.listdir(self.root):
+            if os.path.isdir(os.path.join(self.root, entry)):
+                names.setdefault(entry, entry)
+        return sorted(names.values())
+
+    def stats(self):
+        return {camera: self.series(camera).stats() for camera in self.camera_ids()}
+
+    def flush(self):
+        """Push written pages to disk; the OS does this lazily otherwise"""
+        self.last_flush = time.time()
+        with self.lock:
+            series = list(self.cameras.values())
+        for camera_series in series:
+            camera_series.flush()
+
+
+def summarize(occupied, people):
+    """Per-table occupied fraction, mean and max people over a query's rows
+
+    Rows where a table was not seen are left out of its averages.
+    """
+    # Unseen cells always hold 0 people, so people need no mask
+    seen_rows = np.count_nonzero(occupied != UNKNOWN, axis=0)
+    occupied_rows = np.count_nonzero(occupied == 1, axis=0)
+    divisor = np.maximum(seen_rows, 1)
+    return {
+        "rows": seen_rows,
+        "occupied_fraction": occupied_rows / divisor,
+        "mean_people": people.sum(axis=0, dtype=np.int64) / divisor,
+        "max_people": people.max(axis=0, initial=0)
+    }
@@ -0,0 +1,252 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from detections import TABLE_CLASSES, PERSON_CLASSES
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Tracked class groups; detections only match tracks of the same group
+TRACKED_GROUPS = (TABLE_CLASSES, PERSON_CLASSES)
+
+# Constant-velocity model over [cx, cy, area, aspect, vx, vy, varea] (SORT)
+F = np.eye(7)
+F[0, 4] = F[1, 5] = F[2, 6] = 1.0
+H = np.eye(4, 7)
+Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+R = np.diag([1.0, 1.0, 10.0, 10.0])
+P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+
+
+def xyxy_to_z(xyxy):
+    w = xyxy[:, 2] - xyxy[:, 0]
+    h = xyxy[:, 3] - xyxy[:, 1]
+    return np.stack([xyxy[:, 0] + w / 2, xyxy[:, 1] + h / 2, w * h, w / np.maximum(h, 1e-6)], axis=1)
+
+
+def x_to_xyxy(x):
+    w = np.sqrt(np.clip(x[:, 2] * x[:, 3], 0, None))
+    h = x[:, 2] / np.maximum(w, 1e-6)
+    return np.stack([x[:, 0] - w / 2, x[:, 1] - h / 2, x[:, 0] + w / 2, x[:, 1] + h / 2], axis=1)
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return intersection / np.maximum(area_a[:, None] + area_b[None, :] - intersection, 1e-9)
+
+
+def assign(iou, threshold):
+    """Matched (track, detection) index pairs with IoU >= threshold"""
+    if iou.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(-iou)
+    else:
+        # Greedy: best remaining pair first
+        order = np.argsort(-iou, axis=None, kind='stable')
+        order = order[iou.reshape(-1)[order] >= threshold]
+        rows, cols = np.unravel_index(order, iou.shape)
+        used_rows, used_cols, keep = set(), set(), []
+        for i, (r, c) in enumerate(zip(rows.tolist(), cols.tolist())):
+            if r not in used_rows and c not in used_cols:
+                used_rows.add(r)
+                used_cols.add(c)
+                keep.append(i)
+        rows, cols = rows[keep], cols[keep]
+    good = iou[rows, cols] >= threshold
+    return rows[good], cols[good]
+
+
+class SortTracker:
+    """SORT-style tracker: batched Kalman prediction plus IoU association
+
+    All tracks live in arrays, so predicting and correcting N tracks is a few
+    matrix products rather than N filter objects. Every call to step() or
+    update() advances one frame; update() with fresh detections corrects the
+    matched tracks, starts tracks for unmatched detections and drops tracks
+    unseen for more than max_age frames.
+    """
+
+    def __init__(self, max_age=30, min_hits=2, iou_threshold=0.3):
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.iou_threshold = iou_threshold
+        self.next_id = 1
+        self.x = np.empty((0, 7))
+        self.P = np.empty((0, 7, 7))
+        self.ids = np.empty(0, dtype=np.int64)
+        self.group = np.empty(0, dtype=np.int64)
+        self.cls = np.empty(0, dtype=np.int64)
+        self.conf = np.empty(0, dtype=np.float32)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.time_since_update = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def step(self):
+        """Predict every track one frame ahead"""
+        if not len(self):
+            return
+        # Keep the predicted area positive
+        shrinking = self.x[:, 2] + self.x[:, 6] <= 0
+        self.x[shrinking, 6] = 0.0
+        self.x = self.x @ F.T
+        self.P = F @ self.P @ F.T + Q
+        self.time_since_update += 1
+
+    def update(self, xyxy, group, cls, conf):
+        """Advance one frame with detections; returns the track id of each detection"""
+        self.step()
+        xyxy = np.asarray(xyxy, dtype=np.float64).reshape(-1, 4)
+        track_ids = np.zeros(len(xyxy), dtype=np.int64)
+
+        iou = iou_matrix(x_to_xyxy(self.x), xyxy) if len(self) and len(xyxy) else np.zeros((len(self), len(xyxy)))
+        iou[self.group[:, None] != group[None, :]] = 0.0
+        rows, cols = assign(iou, self.iou_threshold)
+        if len(rows):
+            self._correct(rows, xyxy_to_z(xyxy[cols]))
+            self.cls[rows] = cls[cols]
+            self.conf[rows] = conf[cols]
+            track_ids[cols] = self.ids[rows]
+
+        unmatched = np.setdiff1d(np.arange(len(xyxy)), cols)
+        if len(unmatched):
+            track_ids[unmatched] = self._start(xyxy[unmatched], group[unmatched], cls[unmatched], conf[unmatched])
+
+        alive = self.time_since_update <= self.max_age
+        if not alive.all():
+            self._keep(alive)
+        return track_ids
+
+    def _correct(self, rows, z):
+        x, P = self.x[rows], self.P[rows]
+        innovation = z - x[:, :4]
+        S = H @ P @ H.T + R
+        K = P @ H.T @ np.linalg.inv(S)
+        self.x[rows] = x + np.einsum('nij,nj->ni', K, innovation)
+        self.P[rows] = (np.eye(7) - K @ H) @ P
+        self.hits[rows] += 1
+        self.time_since_update[rows] = 0
+
+    def _start(self, xyxy, group, cls, conf):
+        count = len(xyxy)
+        ids = np.arange(self.next_id, self.next_id + count)
+        self.next_id += count
+        x = np.zeros((count, 7))
+        x[:, :4] = xyxy_to_z(xyxy)
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, np.repeat(P0[None], count, axis=0)])
+        self.ids = np.concatenate([self.ids, ids])
+        self.group = np.concatenate([self.group, group])
+        self.cls = np.concatenate([self.cls, cls])
+        self.conf = np.concatenate([self.conf, conf.astype(np.float32)])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        self.time_since_update = np.concatenate([self.time_since_update, np.zeros(count, dtype=np.int64)])
+        return ids
+
+    def _keep(self, mask):
+        for name in ('x', 'P', 'ids', 'group', 'cls', 'conf', 'hits', 'time_since_update'):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def confirmed(self, max_staleness=0):
+        """(xyxy, cls, conf, ids) of established tracks at their predicted positions
+
+        Only tracks matched within the last max_staleness frames are returned.
+        """
+        mask = (self.hits >= self.min_hits) & (self.time_since_update <= max_staleness)
+        return x_to_xyxy(self.x[mask]).astype(np.float32), self.cls[mask], self.conf[mask], self.ids[mask]
+
+
+class StreamTracker:
+    """A SortTracker for one stream, running detection every detect_every frames"""
+
+    def __init__(self, detect_every=1, **tracker_options):
+        self.tracker = SortTracker(**tracker_options)
+        self.detect_every = max(1, int(detect_every))
+        self.frames_since_detection = 0
+        self.names = {}
+        self.lock = threading.Lock()
+
+    def needs_detection(self):
+        """True when this frame must run the model rather than track prediction"""
+        if self.frames_since_detection + 1 >= self.detect_every:
+            return True
+        # Nothing confirmed yet means nothing worth predicting
+        return not (self.tracker.hits >= self.tracker.min_hits).any()
+
+    def update(self, detections):
+        """Track ids for a frame's Detections (0 for untracked classes)"""
+        # Group by model class name; labels may already say occupied/vacant_table
+        class_names = detections.name_table[detections.cls] if len(detections) else np.empty(0, dtype=object)
+        group = np.full(len(detections), -1, dtype=np.int64)
+        for index, names in enumerate(TRACKED_GROUPS):
+            group[np.isin(class_names, names)] = index
+        tracked = group >= 0
+
+        track_ids = np.zeros(len(detections), dtype=np.int64)
+        track_ids[tracked] = self.tracker.update(
+            detections.xyxy[tracked], group[tracked], detections.cls[tracked], detections.conf[tracked]
+        )
+        self.frames_since_detection = 0
+        self.names = detections.names
+        return track_ids
+
+    def predict(self):
+        """Advance one frame without detections; (xyxy, cls, conf, ids) of confirmed tracks"""
+        self.tracker.step()
+        self.frames_since_detection += 1
+        # Tracks the last detection round saw, not ones already coasting
+        return self.tracker.confirmed(self.frames_since_detection)
+
+
+class StreamTrackers:
+    """StreamTracker per stream id, least recently used streams dropped first"""
+
+    def __init__(self, detect_every=1, max_streams=64, **tracker_options):
+        self.detect_every = detect_every
+        self.max_streams = max_streams
+        self.tracker_options = tracker_options
+        self.streams = OrderedDict()
+        self.lock = threading.Lock()
+        self.detected_frames = 0
+        self.predicted_frames = 0
+
+    def get(self, stream):
+        with self.lock:
+            tracker = self.streams.get(stream)
+            if tracker is None:
+                tracker = self.streams[stream] = StreamTracker(self.detect_every, **self.tracker_options)
+            self.streams.move_to_end(stream)
+            while len(self.streams) > self.max_streams:
+                self.streams.popitem(last=False)
+            return tracker
+
+    def count(self, detected):
+        with self.lock:
+            if detected:
+                self.detected_frames += 1
+            else:
+                self.predicted_frames += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "streams": len(self.streams),
+                "tracks": sum(len(tracker.tracker) for tracker in self.streams.values()),
+                "detect_every": self.detect_every,
+                "detected_frames": self.detected_frames,
+                "predicted_frames": self.predicted_frames
+            }
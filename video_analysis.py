@@ -0,0 +1,179 @@
+import time
+
+import cv2
+
+DEFAULT_FPS = 30.0
+
+
+def format_timestamp(seconds):
+    """Video position as MM:SS, matching formatTime() in the page"""
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class VideoFrameReader:
+    """Iterates (frame_index, timestamp, frame) over every stride-th frame of a video
+
+    Skipped frames are only grabbed, never retrieved/converted, and just one
+    frame is held in memory at a time.
+    """
+
+    def __init__(self, path, stride=1):
+        self.path = path
+        self.stride = max(1, int(stride))
+        self.decoded_frames = 0
+
+        capture = cv2.VideoCapture(path)
+        try:
+            if not capture.isOpened():
+                raise ValueError(f"Could not open video: {path}")
+            self.fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+            self.total_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            capture.release()
+
+    def info(self):
+        """Frame count, fps and duration from the container header"""
+        return {
+            "total_frames": self.total_frames,
+            "fps": round(self.fps, 3),
+            "duration": round(self.total_frames / self.fps, 3)
+        }
+
+    def __iter__(self):
+        capture = cv2.VideoCapture(self.path)
+        frame_index = 0
+        try:
+            while capture.grab():
+                self.decoded_frames += 1
+                if frame_index % self.stride == 0:
+                    ok, frame = capture.retrieve()
+                    if not ok:
+                        break
+                    yield frame_index, frame_index / self.fps, frame
+                frame_index += 1
+        finally:
+            capture.release()
+
+
+class OccupancyAccumulator:
+    """Running occupancy aggregates, updated one analyzed frame at a time
+
+    Memory is O(timeline buckets), independent of the number of frames.
+    """
+
+    def __init__(self, timeline_interval=30.0):
+        self.timeline_interval = float(timeline_interval)
+        self.frames = 0
+        self.occupancy_sum = 0.0
+        self.tables_sum = 0
+        self.peak_occupancy = 0.0
+        self.peak_timestamp = 0.0
+        self.arrivals = 0
+        self.last_occupied = None
+        # bucket index -> [occupancy sum, frame count]
+        self.buckets = {}
+
+    def update(self, timestamp, occupied, total):
+        """Fold one frame's occupied/total table counts into the aggregates"""
+        occupancy = occupied / total if total else 0.0
+        self.frames += 1
+        self.occupancy_sum += occupancy
+        self.tables_sum += total
+        if occupancy > self.peak_occupancy or self.frames == 1:
+            self.peak_occupancy = occupancy
+            self.peak_timestamp = timestamp
+
+        # Tables becoming occupied since the previous analyzed frame count as new parties
+        if self.last_occupied is not None and occupied > self.last_occupied:
+            self.arrivals += occupied - self.last_occupied
+        self.last_occupied = occupied
+
+        bucket = self.buckets.setdefault(int(timestamp // self.timeline_interval), [0.0, 0])
+        bucket[0] += occupancy
+        bucket[1] += 1
+        return occupancy
+
+    def summary(self):
+        """Analytics in the /api/analyze-video response format"""
+        frames = max(self.frames, 1)
+        average_tables = self.tables_sum / frames
+        return {
+            "processed_frames": self.frames,
+            "average_occupancy": round(self.occupancy_sum / frames, 4),
+            "peak_occupancy": round(self.peak_occupancy, 4),
+            "peak_time": format_timestamp(self.peak_timestamp),
+            # New parties seated per table over the analyzed span
+            "table_turnover_rate": round(self.arrivals / average_tables, 3) if average_tables else 0.0,
+            "occupancy_timeline": [
+                {
+                    "time": format_timestamp(index * self.timeline_interval),
+                    "occupancy": round(total / count, 4)
+                }
+                for index, (total, count) in sorted(self.buckets.items())
+            ]
+        }
+
+
+def stream_video_analysis(path, detect, stride=1, timeline_interval=30.0, progress_every=10):
+    """Streaming analysis generator over a video file
+
+    detect(frame) must return (occupied_tables, total_tables) for a BGR frame.
+    Yields {"type": "progress", ...} events every progress_every analyzed
+    frames and a final {"type": "result", "analytics": ...} event.
+    """
+    reader = VideoFrameReader(path, stride)
+    info = reader.info()
+    accumulator = OccupancyAccumulator(timeline_interval)
+    decode_time = 0.0
+    inference_time = 0.0
+    started = time.perf_counter()
+
+    frames = iter(reader)
+    while True:
+        decode_started = time.perf_counter()
+        try:
+            frame_index, timestamp, frame = next(frames)
+        except StopIteration:
+            decode_time += time.perf_counter() - decode_started
+            break
+        decode_time += time.perf_counter() - decode_started
+
+        infer_started = time.perf_counter()
+        occupied, total = detect(frame)
+        inference_time += time.perf_counter() - infer_started
+
+        occupancy = accumulator.update(timestamp, occupied, total)
+        if progress_every and accumulator.frames % progress_every == 0:
+            yield {
+                "type": "progress",
+                "frame": frame_index,
+                "time": format_timestamp(timestamp),
+                "progress": round(frame_index / info["total_frames"], 4) if info["total_frames"] else None,
+                "occupancy": round(occupancy, 4)
+            }
+
+    # Decoded frames include the grabbed-but-skipped ones between strides
+    decoded_frames = reader.decoded_frames
+    wall_time = time.perf_counter() - started
+    analytics = dict(info)
+    analytics.update(accumulator.summary())
+    analytics["stride"] = reader.stride
+    analytics["throughput"] = {
+        "decoded_frames": decoded_frames,
+        "inferred_frames": accumulator.frames,
+        "decode_fps": round(decoded_frames / decode_time, 2) if decode_time else 0.0,
+        "inference_fps": round(accumulator.frames / inference_time, 2) if inference_time else 0.0,
+        "wall_seconds": round(wall_time, 3),
+        "wall_fps": round(decoded_frames / wall_time, 2) if wall_time else 0.0
+    }
+    yield {"type": "result", "analytics": analytics}
+
+
+def run_video_analysis(path, detect, **kwargs):
+    """Consume stream_video_analysis() and return only the final analytics"""
+    analytics = None
+    for event in stream_video_analysis(path, detect, progress_every=0, **kwargs):
+        if event["type"] == "result":
+            analytics = event["analytics"]
+    return analytics
@@ -1,16 +1,18 @@
-import webview
 import threading
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string
 import cv2
 import numpy as np
 from PIL import Image
 import io
 import base64
+import json
 import time
 import os
 import tempfile
 from pathlib import Path
 
+from video_analysis import stream_video_analysis, run_video_analysis
+
 # HTML template as a string
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
@@ -139,6 +141,7 @@ HTML_TEMPLATE = '''
                     <div id="timelineProgress" class="timeline-progress"></div>
                     <div id="timelineMarker" class="timeline-marker"></div>
                 </div>
+                <div id="videoAnalytics" class="mt-4"></div>
                 <div class="flex gap-2 mt-4">
                     <button onclick="playVideo()" class="flex items-center gap-2 px-4 py-2 bg-green-600 text-white rounded-lg hover:bg-green-700">
                         <i data-lucide="play" class="w-4 h-4"></i> Play
@@ -280,6 +283,7 @@ HTML_TEMPLATE = '''
     <script>
         let currentImage = null;
         let currentVideo = null;
+        let currentVideoFile = null;
         let currentPredictions = [];
         let isProcessingVideo = false;
         let videoAnalysisInterval = null;
@@ -314,6 +318,7 @@ HTML_TEMPLATE = '''
                 
                 const url = URL.createObjectURL(file);
                 currentVideo = url;
+                currentVideoFile = file;
                 
                 const video = document.getElementById('videoPlayer');
                 video.src = url;
@@ -571,14 +576,48 @@ HTML_TEMPLATE = '''
             video.pause();
             
             try {
-                // This would typically send the entire video to the backend for processing
-                // For this demo, we'll simulate processing key frames
-                alert('Video analysis started! In a real implementation, this would process the entire video and generate occupancy analytics.');
+                // Upload the file once; the backend decodes it frame by frame and
+                // streams progress as newline-delimited JSON
+                const formData = new FormData();
+                formData.append('video', currentVideoFile);
+                formData.append('stride', 5);
                 
-                // Simulate processing
-                await new Promise(resolve => setTimeout(resolve, 3000));
+                const response = await fetch('/api/analyze-video?stream=1', {
+                    method: 'POST',
+                    body: formData,
+                });
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let analytics = null;
                 
-                alert('Video analysis complete! Occupancy patterns have been analyzed.');
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\\n');
+                    buffer = lines.pop();
+                    
+                    for (const line of lines) {
+                        if (!line) continue;
+                        const event = JSON.parse(line);
+                        if (event.type === 'progress') {
+                            if (event.progress !== null) {
+                                document.getElementById('timelineMarker').style.left = `${event.progress * 100}%`;
+                            }
+                            document.getElementById('currentFrame').textContent = event.frame;
+                            document.getElementById('currentTime').textContent = event.time;
+                        } else if (event.type === 'result') {
+                            analytics = event.analytics;
+                        } else if (event.type === 'error') {
+                            throw new Error(event.error);
+                        }
+                    }
+                }
+                
+                if (analytics) {
+                    showVideoAnalytics(analytics);
+                }
                 
             } catch (error) {
                 console.error('Error analyzing video:', error);
@@ -592,6 +631,22 @@ HTML_TEMPLATE = '''
             }
         }
 
+        function showVideoAnalytics(analytics) {
+            const throughput = analytics.throughput;
+            document.getElementById('totalFrames').textContent = analytics.total_frames;
+            document.getElementById('videoAnalytics').innerHTML = `
+                <div class="grid grid-cols-4 gap-4 text-sm text-purple-900">
+                    <div><strong>Average Occupancy:</strong> ${(analytics.average_occupancy * 100).toFixed(0)}%</div>
+                    <div><strong>Peak Occupancy:</strong> ${(analytics.peak_occupancy * 100).toFixed(0)}% at ${analytics.peak_time}</div>
+                    <div><strong>Turnover Rate:</strong> ${analytics.table_turnover_rate}</div>
+                    <div><strong>Frames Analyzed:</strong> ${analytics.processed_frames}</div>
+                    <div><strong>Decode:</strong> ${throughput.decode_fps} fps</div>
+                    <div><strong>Inference:</strong> ${throughput.inference_fps} fps</div>
+                    <div><strong>Wall Time:</strong> ${throughput.wall_seconds}s</div>
+                </div>
+            `;
+        }
+
         function stopVideoAnalysis() {
             isProcessingVideo = false;
             if (videoAnalysisInterval) {
@@ -613,33 +668,7 @@ class TableOccupancyDetector:
             # Simulate processing delay
             time.sleep(1)
             
-            # Mock predictions - in real implementation, these would vary based on actual image content
-            predictions = [
-                { 
-                    "id": 1, "x": 100, "y": 80, "width": 120, "height": 100, 
-                    "occupied": True, "confidence": 0.95, "tableNumber": "T1" 
-                },
-                { 
-                    "id": 2, "x": 280, "y": 80, "width": 120, "height": 100, 
-                    "occupied": False, "confidence": 0.92, "tableNumber": "T2" 
-                },
-                { 
-                    "id": 3, "x": 460, "y": 80, "width": 120, "height": 100, 
-                    "occupied": True, "confidence": 0.88, "tableNumber": "T3" 
-                },
-                { 
-                    "id": 4, "x": 100, "y": 240, "width": 120, "height": 100, 
-                    "occupied": False, "confidence": 0.91, "tableNumber": "T4" 
-                },
-                { 
-                    "id": 5, "x": 280, "y": 240, "width": 120, "height": 100, 
-                    "occupied": True, "confidence": 0.94, "tableNumber": "T5" 
-                },
-                { 
-                    "id": 6, "x": 460, "y": 240, "width": 120, "height": 100, 
-                    "occupied": False, "confidence": 0.89, "tableNumber": "T6" 
-                },
-            ]
+            predictions = self.mock_predictions()
             
             # Calculate statistics
             occupied = len([p for p in predictions if p['occupied']])
@@ -661,6 +690,42 @@ class TableOccupancyDetector:
                 "error": str(e)
             }
     
+    def mock_predictions(self):
+        """Fixed table layout standing in for model output"""
+        # Mock predictions - in real implementation, these would vary based on actual image content
+        return [
+            { 
+                "id": 1, "x": 100, "y": 80, "width": 120, "height": 100, 
+                "occupied": True, "confidence": 0.95, "tableNumber": "T1" 
+            },
+            { 
+                "id": 2, "x": 280, "y": 80, "width": 120, "height": 100, 
+                "occupied": False, "confidence": 0.92, "tableNumber": "T2" 
+            },
+            { 
+                "id": 3, "x": 460, "y": 80, "width": 120, "height": 100, 
+                "occupied": True, "confidence": 0.88, "tableNumber": "T3" 
+            },
+            { 
+                "id": 4, "x": 100, "y": 240, "width": 120, "height": 100, 
+                "occupied": False, "confidence": 0.91, "tableNumber": "T4" 
+            },
+            { 
+                "id": 5, "x": 280, "y": 240, "width": 120, "height": 100, 
+                "occupied": True, "confidence": 0.94, "tableNumber": "T5" 
+            },
+            { 
+                "id": 6, "x": 460, "y": 240, "width": 120, "height": 100, 
+                "occupied": False, "confidence": 0.89, "tableNumber": "T6" 
+            },
+        ]
+    
+    def count_occupancy(self, frame):
+        """Occupied and total table counts for one decoded video frame"""
+        predictions = self.mock_predictions()
+        occupied = len([p for p in predictions if p['occupied']])
+        return occupied, len(predictions)
+    
     def generate_demo_image(self):
         """Generate a demo restaurant floor plan image"""
         # Create a blank image
@@ -710,6 +775,22 @@ class TableOccupancyDetector:
 
 detector = TableOccupancyDetector()
 
+class InvalidParameter(ValueError):
+    pass
+
+def number_param(params, name, default, cast=float):
+    """Numeric request parameter; anything unparseable answers 400 instead of a 500"""
+    value = params.get(name, default)
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise InvalidParameter(f"Invalid {name}: {value!r}")
+
+@app.errorhandler(InvalidParameter)
+def handle_invalid_parameter(error):
+    """Malformed request parameter"""
+    return jsonify({"success": False, "error": str(error)}), 400
+
 @app.route('/')
 def index():
     """Serve the main application page"""
@@ -741,37 +822,53 @@ def get_demo_image():
 
 @app.route('/api/analyze-video', methods=['POST'])
 def analyze_video():
-    """API endpoint to analyze entire video"""
+    """API endpoint to analyze an uploaded video file frame by frame"""
+    upload = request.files.get('video')
+    if not upload:
+        return jsonify({"success": False, "error": "No video file provided"})
+    
+    stride = number_param(request.form, 'stride', 5, int)
+    timeline_interval = number_param(request.form, 'timeline_interval', 30)
+    stream = request.args.get('stream') == '1'
+    
+    # Decode from a temp file so the upload is never held in memory as frames
+    fd, video_path = tempfile.mkstemp(suffix=Path(upload.filename or '').suffix or '.mp4')
+    
+    def finish():
+        os.remove(video_path)
+    
     try:
-        # In a real implementation, this would process the video file
-        # and return analytics data
-        time.sleep(2)  # Simulate processing
-        
-        # Mock analytics data
-        analytics = {
-            "total_frames": 900,
-            "processed_frames": 900,
-            "average_occupancy": 0.45,
-            "peak_occupancy": 0.83,
-            "peak_time": "19:30",
-            "table_turnover_rate": 2.1,
-            "occupancy_timeline": [
-                {"time": "18:00", "occupancy": 0.2},
-                {"time": "18:30", "occupancy": 0.5},
-                {"time": "19:00", "occupancy": 0.7},
-                {"time": "19:30", "occupancy": 0.83},
-                {"time": "20:00", "occupancy": 0.6},
-                {"time": "20:30", "occupancy": 0.3},
-            ]
-        }
+        with os.fdopen(fd, 'wb') as f:
+            upload.save(f)
+    except Exception:
+        finish()
+        raise
+    
+    if stream:
+        # Newline-delimited JSON progress events followed by the final analytics
+        def generate():
+            try:
+                for event in stream_video_analysis(video_path, detector.count_occupancy, stride, timeline_interval):
+                    yield json.dumps(event) + '\n'
+            except Exception as e:
+                yield json.dumps({"type": "error", "error": str(e)}) + '\n'
         
+        response = Response(generate(), mimetype='application/x-ndjson')
+        # The server closes the response even when the client left before the body started
+        response.call_on_close(finish)
+        return response
+    
+    try:
+        analytics = run_video_analysis(video_path, detector.count_occupancy, stride=stride,
+                                       timeline_interval=timeline_interval)
         return jsonify({
             "success": True,
             "analytics": analytics
         })
-        
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
+    finally:
+        finish()
 
 def run_flask():
     """Run Flask server"""
@@ -786,6 +883,9 @@ if __name__ == '__main__':
     # Wait for server to start
     time.sleep(2)
     
+    # Desktop mode only; serve.py runs the same app headless
+    import webview
+    
     # Create webview window
     window = webview.create_window(
         'Table Occupancy Detection System - Video Analysis',
@@ -0,0 +1,213 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from detections import Detections
+from inference_backends import load_weights, detect_batch
+from occupancy import occupancy_stats, label_tables
+from preprocess import PAD_VALUE
+
+
+def load_yolo(path):
+    """Default worker model loader, ultralytics weights or an .onnx model"""
+    return load_weights(path)
+
+
+def worker_main(shm_name, slot_bytes, model_path, load_fn, tasks, results, warmup_shapes=(), warmup_runs=0,
+                barrier=None):
+    """Worker process: owns one model, reads frames from shared-memory slots
+
+    Pre/post-processing (box extraction, occupancy association) runs here
+    under this process's own GIL. Only compact arrays travel back. Before
+    reporting ready the model runs warmup_runs times on a blank frame of
+    every (height, width) in warmup_shapes. After a task marked hold the
+    worker waits at barrier until every worker has taken one (see warm()).
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        model = load_fn(model_path)
+        names = dict(model.names)
+        for shape in warmup_shapes:
+            frame = np.full(tuple(shape) + (3,), PAD_VALUE, dtype=np.uint8)
+            for _ in range(warmup_runs):
+                detect_batch(model, [frame], 0.5, 0.5)
+        results.put(('ready', os.getpid(), names))
+    except Exception as e:
+        results.put(('failed', os.getpid(), str(e)))
+        shm.close()
+        return
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, slot, shape, key, hold = task
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+        try:
+            confidence, iou = key
+            detections = detect_batch(model, [frame], confidence, iou)[0]
+            started = time.perf_counter()
+            stats, occupied = occupancy_stats(detections)
+            timings = dict(detections.timings, occupancy=time.perf_counter() - started)
+            payload = (detections.xyxy, detections.conf, detections.cls.astype(np.int16), occupied, stats, timings)
+            results.put((job_id, slot, payload, None))
+        except Exception as e:
+            results.put((job_id, slot, None, str(e)))
+        finally:
+            # Drop the view before the slot is handed to another frame
+            del frame
+        if hold:
+            try:
+                barrier.wait(timeout=60)
+            except threading.BrokenBarrierError:
+                pass
+
+    shm.close()
+
+
+class InferenceWorkerPool:
+    """Multi-process inference with shared-memory frame hand-off
+
+    Decoded frames are copied into one of `slots` fixed-size slots of a single
+    SharedMemory block; workers receive only (job, slot, shape, key) and map
+    the slot directly, so no ndarray is ever pickled. A slot is reused once
+    its worker has returned the result, which also bounds frames in flight.
+    """
+
+    def __init__(self, model_path, workers=2, slots=None, slot_mb=25.0, load_fn=load_yolo,
+                 start_timeout=300, warmup_shapes=(), warmup_runs=0):
+        self.workers = max(1, int(workers))
+        self.slots = int(slots or self.workers * 2)
+        self.slot_bytes = int(slot_mb * 2**20)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_bytes)
+        self.free_slots = queue.Queue()
+        for slot in range(self.slots):
+            self.free_slots.put(slot)
+
+        # spawn: workers must not inherit a parent that may already hold torch threads
+        context = multiprocessing.get_context('spawn')
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.warm_barrier = context.Barrier(self.workers)
+        self.processes = [
+            context.Process(
+                target=worker_main,
+                args=(self.shm.name, self.slot_bytes, model_path, load_fn, self.tasks, self.results,
+                      list(warmup_shapes), warmup_runs, self.warm_barrier),
+                daemon=True
+            )
+            for _ in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        self.names = None
+        for _ in range(self.workers):
+            kind, pid, info = self.results.get(timeout=start_timeout)
+            if kind == 'failed':
+                self.close()
+                raise RuntimeError(f"Inference worker {pid} failed to start: {info}")
+            self.names = info
+
+        self.pending = {}
+        self.job_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.closed = False
+        self.collector = threading.Thread(target=self._collect, name='worker-pool-results', daemon=True)
+        self.collector.start()
+        atexit.register(self.close)
+
+    def submit(self, frame, key, hold=False):
+        """Copy a BGR uint8 frame into a free slot and queue it for a worker"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds the {self.slot_bytes} byte worker slot")
+
+        slot = self.free_slots.get()
+        target = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        target[...] = frame
+        del target
+
+        future = Future()
+        job_id = next(self.job_ids)
+        with self.lock:
+            self.pending[job_id] = future
+        self.tasks.put((job_id, slot, frame.shape, key, hold))
+        return future
+
+    def infer(self, frame, key, timeout=60):
+        """(Detections, stats) for one frame, computed in a worker process"""
+        return self.submit(frame, key).result(timeout=timeout)
+
+    def warm(self, frame, key, timeout=60):
+        """Run frame once in every worker
+
+        Each of the copies holds its worker at a barrier until all workers
+        have taken one, so no worker can take two while another stays cold.
+        """
+        self.warm_barrier.reset()
+        futures = [self.submit(frame, key, hold=True) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=timeout)
+
+    def _collect(self):
+        while True:
+            try:
+                message = self.results.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            job_id, slot, payload, error = message
+            self.free_slots.put(slot)
+            with self.lock:
+                future = self.pending.pop(job_id, None)
+                self.completed += 1
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+                continue
+
+            xyxy, conf, class_ids, occupied, stats, timings = payload
+            detections = Detections(xyxy, conf, class_ids, self.names)
+            detections.timings = timings
+            label_tables(detections, occupied)
+            future.set_result((detections, stats))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "alive": sum(process.is_alive() for process in self.processes),
+                "slots": self.slots,
+                "slot_mb": round(self.slot_bytes / 2**20, 2),
+                "free_slots": self.free_slots.qsize(),
+                "in_flight": len(self.pending),
+                "completed": self.completed
+            }
+
+    def close(self):
+        """Stop workers and release the shared memory block"""
+        if getattr(self, 'closed', False):
+            return
+        self.closed = True
+        for _ in self.processes:
+            self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.results.put(None)
+        self.shm.close()
+        self.shm.unlink()
@@ -1,24 +1,157 @@
-import webview
+import time
+
+# Reference point for the startup timings in /api/model-status, taken before the imports below
+PROCESS_STARTED = time.time()
+
 import threading
-from flask import Flask, request, jsonify, render_template_string
+import multiprocessing
+import importlib.util
+# cv2, numpy and the local modules stay at module level: together they add ~80ms
+# to Flask's own import, and warm-up and the first request need them anyway
+from flask import Flask, Response, abort, g, request, jsonify, render_template_string
 import cv2
 import numpy as np
-from PIL import Image
-import io
 import base64
-import time
+import json
 import os
+import socket
 import tempfile
+from functools import partial
 from pathlib import Path
 
-# Try to import ultralytics, install if not available
-try:
-    from ultralytics import YOLO
-    YOLO_AVAILABLE = True
-except ImportError:
-    YOLO_AVAILABLE = False
+from detections import Detections, nms, TABLE_CLASSES, PERSON_CLASSES, CHAIR_CLASSES
+from occupancy import occupancy_stats, assigned_people_counts, nearest_table_counts
+from model_registry import ModelRegistry, parse_model_specs
+from video_analysis import stream_video_analysis, run_video_analysis
+from motion_gate import MotionGate
+from change_map import FloorPlanChanges
+from tiling import tile_grid, tile_batch, merge_tiles
+from result_cache import ResultCache
+from floor_plan import load_floor_plans
+from preprocess import letterbox, letterbox_shape, unletterbox_boxes, decode_for_model, LetterboxBuffers, PAD_VALUE
+from admission import AdmissionLimiter, Overloaded
+from worker_pool import InferenceWorkerPool
+from inference_backends import ORT_AVAILABLE, EXPORT_FORMATS, load_weights, export_fixed_shape, detect_batch
+from metrics import MetricsRegistry, StageTimer
+from live_sessions import LiveSessionManager
+from tracker import StreamTrackers
+from timeseries_store import TimeSeriesStore, UNKNOWN, summarize
+from rollups import OccupancyRollups, RESOLUTIONS
+from camera_ingest import CameraIngest, is_stream_url
+
+# ultralytics (and torch) take seconds to import, so only check it is installed;
+# it is imported by the background model load
+YOLO_AVAILABLE = importlib.util.find_spec('ultralytics') is not None
+if not YOLO_AVAILABLE:
     print("YOLO not available. Install with: pip install ultralytics")
 
+# Quantized .onnx models (see quantize.py) only need onnxruntime
+INFERENCE_AVAILABLE = YOLO_AVAILABLE or ORT_AVAILABLE
+
+# Micro-batching of concurrent detect requests into one model call
+BATCH_MAX_SIZE = int(os.environ.get('YOLO_BATCH_MAX_SIZE', 8))
+BATCH_MAX_WAIT_MS = float(os.environ.get('YOLO_BATCH_MAX_WAIT_MS', 5))
+
+# Model input size: frames are decoded at reduced scale (JPEG) and letterboxed
+# to it before inference instead of inside the model call
+INFERENCE_IMGSZ = int(os.environ.get('YOLO_IMGSZ', 640))
+REDUCED_DECODE = os.environ.get('YOLO_REDUCED_DECODE', '1') == '1'
+
+# Warm-up before the model reports ready: WARMUP_RUNS inferences at every input shape
+# the configuration produces (camera frames of WARMUP_SIZES at batch 1 and
+# BATCH_MAX_SIZE, their tiles when tiled by default, floor-plan crop stacks); 0 skips it
+WARMUP_RUNS = int(os.environ.get('YOLO_WARMUP_RUNS', 3))
+WARMUP_SIZES = [tuple(int(value) for value in size.lower().split('x'))
+                for size in os.environ.get('YOLO_WARMUP_SIZES', '1920x1080').split(',') if size.strip()]
+# Rerun the first warm-up shape after this many seconds without inference (0 disables)
+KEEP_WARM_SECONDS = float(os.environ.get('YOLO_KEEP_WARM_S', 60))
+# Fixed-shape compilation of .pt weights at YOLO_IMGSZ: onnx or torchscript export,
+# or compile (torch.compile, compiled on the second call, so keep WARMUP_RUNS >= 2);
+# empty runs the model as loaded
+COMPILE_MODE = os.environ.get('YOLO_COMPILE', '').lower()
+
+# Tiled mode for wide high-resolution cameras: overlapping TILE_SIZE px tiles plus
+# the whole frame go through the model as one batch (per request: `tiled=1`)
+TILED_DEFAULT = os.environ.get('YOLO_TILED', '0') == '1'
+TILE_SIZE = int(os.environ.get('YOLO_TILE_SIZE', 1280))
+TILE_OVERLAP = float(os.environ.get('YOLO_TILE_OVERLAP', 0.2))
+
+# Models selectable per request as name=weights; the first one is the default.
+# A model trained with train_yolo.py can be added as e.g. audit=runs/detect/train/weights/best.pt
+MODEL_SPECS = parse_model_specs(os.environ.get('YOLO_MODELS', 'yolov8n=yolov8n.pt'))
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get('YOLO_MODEL_MEMORY_MB', 1024))
+
+# Optional process pool for the default model: frames go to N worker
+# processes through shared memory (0 keeps inference in this process)
+PROCESS_WORKERS = int(os.environ.get('YOLO_PROCESS_WORKERS', 0))
+WORKER_SLOT_MB = float(os.environ.get('YOLO_WORKER_SLOT_MB', 25))
+
+# Motion gate for live streams: reuse the last result while frames are static
+MOTION_GATE_ENABLED = os.environ.get('YOLO_MOTION_GATE', '1') == '1'
+MOTION_MIN_CHANGED_FRACTION = float(os.environ.get('YOLO_MOTION_MIN_CHANGE', 0.005))
+MOTION_REFRESH_SECONDS = float(os.environ.get('YOLO_MOTION_REFRESH_S', 5))
+
+# Results of recently seen identical frames (demo image, paused videos, re-polled
+# stills), keyed on a hash of the uploaded bytes; 0 entries disables the cache
+RESULT_CACHE_ENTRIES = int(os.environ.get('YOLO_RESULT_CACHE_ENTRIES', 256))
+RESULT_CACHE_MB = float(os.environ.get('YOLO_RESULT_CACHE_MB', 16))
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get('YOLO_RESULT_CACHE_TTL_S', 30))
+
+# Track tables and people across frames of a stream (track_id on predictions);
+# with DETECT_EVERY > 1 the frames in between are answered from track prediction
+TRACKING_ENABLED = os.environ.get('YOLO_TRACKING', '1') == '1'
+TRACK_DETECT_EVERY = int(os.environ.get('YOLO_TRACK_DETECT_EVERY', 1))
+TRACK_MAX_AGE = int(os.environ.get('YOLO_TRACK_MAX_AGE', 30))
+TRACK_MIN_HITS = int(os.environ.get('YOLO_TRACK_MIN_HITS', 2))
+
+# Table regions per camera for floor-plan (per-table crop) mode
+FLOOR_PLAN_PATH = os.environ.get('YOLO_FLOOR_PLAN', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'floor_plans.json'))
+
+# Floor-plan cameras keep a background model (on frames scaled to CHANGE_MAP_WIDTH)
+# and only re-infer tables whose crop region changed, at least every CHANGE_REFRESH_SECONDS
+CHANGE_MAP_ENABLED = os.environ.get('YOLO_CHANGE_MAP', '1') == '1'
+CHANGE_MAP_WIDTH = int(os.environ.get('YOLO_CHANGE_MAP_WIDTH', 320))
+CHANGE_MIN_FRACTION = float(os.environ.get('YOLO_CHANGE_MIN_FRACTION', 0.02))
+CHANGE_REFRESH_SECONDS = float(os.environ.get('YOLO_CHANGE_REFRESH_S', 10))
+
+# Serving limits: concurrent inferences per process, requests allowed to queue
+# behind them (beyond that /api/detect answers 503) and max request body size.
+# A slot covers decode, preprocessing and postprocessing; requests waiting on the
+# batched model call give theirs back, so batches still fill up to BATCH_MAX_SIZE
+INFERENCE_CONCURRENCY = int(os.environ.get('YOLO_INFERENCE_CONCURRENCY', 2))
+MAX_PENDING_REQUESTS = int(os.environ.get('YOLO_MAX_PENDING', 16))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get('YOLO_QUEUE_TIMEOUT_S', 10))
+MAX_UPLOAD_MB = float(os.environ.get('YOLO_MAX_UPLOAD_MB', 256))
+# Video analyses running at once (more answer 503); each analyzed frame takes an
+# inference slot only while it runs, so videos share the limit above with /api/detect
+VIDEO_CONCURRENCY = int(os.environ.get('YOLO_VIDEO_CONCURRENCY', 1))
+
+# Include per-stage timings in every /api/detect response (per request: timings=1)
+RESPONSE_TIMINGS = os.environ.get('YOLO_RESPONSE_TIMINGS', '0') == '1'
+
+# Live sessions: frames posted to /api/live/<id>/frame, results pushed over SSE.
+# The keepalive must stay below the server's idle connection timeout
+LIVE_MAX_SESSIONS = int(os.environ.get('YOLO_LIVE_MAX_SESSIONS', 32))
+LIVE_IDLE_SECONDS = float(os.environ.get('YOLO_LIVE_IDLE_S', 30))
+LIVE_KEEPALIVE_SECONDS = float(os.environ.get('YOLO_LIVE_KEEPALIVE_S', 2))
+
+# Per-table occupancy history of frames sent with a camera id (/api/timeseries);
+# an empty YOLO_TIMESERIES_DIR turns recording off
+TIMESERIES_DIR = os.environ.get('YOLO_TIMESERIES_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'timeseries'))
+TIMESERIES_SEGMENT_ROWS = int(os.environ.get('YOLO_TIMESERIES_SEGMENT_ROWS', 262144))
+
+# Server-side cameras ('name=video file or rtsp:// URL,...') decoded and analyzed
+# without a browser; INGEST_WORKERS inferences are shared between them by weight
+# ('name=weight,...', default 1). Start them in one server process only
+INGEST_SOURCES = parse_model_specs(os.environ.get('YOLO_INGEST_SOURCES', ''))
+INGEST_WEIGHTS = parse_model_specs(os.environ.get('YOLO_INGEST_WEIGHTS', ''))
+# Ingest frames take slots of the same inference limit as HTTP requests; one
+# slot always stays free for /api/detect and live clients (unless the limit is 1)
+INGEST_WORKERS = min(int(os.environ.get('YOLO_INGEST_WORKERS', 2)), max(1, INFERENCE_CONCURRENCY - 1))
+# What POST /api/ingest may open: comma-separated URL prefixes ('rtsp://10.0.0.')
+# and directories; empty allows only the sources of YOLO_INGEST_SOURCES
+INGEST_ALLOWED = [item.strip() for item in os.environ.get('YOLO_INGEST_ALLOWED', '').split(',') if item.strip()]
+
 # HTML template as a string
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
@@ -201,6 +334,17 @@ HTML_TEMPLATE = '''
                         <i data-lucide="zap" class="w-5 h-5"></i>
                         Run YOLO Detection
                     </button>
+                    
+                    <button
+                        id="liveButton"
+                        onclick="toggleLive()"
+                        disabled
+                        class="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors disabled:bg-gray-400 disabled:cursor-not-allowed"
+                    >
+                        <i data-lucide="radio" class="w-5 h-5"></i>
+                        Start Live Detection
+                    </button>
+                    <span id="liveStatus" class="self-center text-sm text-gray-600"></span>
                 </div>
                 <input
                     id="imageInput"
@@ -300,10 +444,22 @@ HTML_TEMPLATE = '''
     <script>
         let currentImage = null;
         let currentVideo = null;
+        // Per loaded video, so the server keeps a separate motion gate and tracker for it
+        let videoStream = null;
         let currentPredictions = [];
         let isProcessingVideo = false;
         let confidenceThreshold = 0.5;
         let iouThreshold = 0.5;
+        
+        // Live mode: frames are posted without waiting and results arrive over SSE
+        const LIVE_MAX_IN_FLIGHT = 2;
+        let liveSession = null;
+        let liveEvents = null;
+        let liveSeq = 0;
+        let liveLastResultSeq = 0;
+        let liveSentAt = {};
+        let liveLastFrameTime = -1;
+        let liveResultTimes = [];
 
         // Initialize Lucide icons
         lucide.createIcons();
@@ -317,7 +473,11 @@ HTML_TEMPLATE = '''
                 const data = await response.json();
                 
                 const statusElement = document.getElementById('modelStatus');
-                if (data.ready) {
+                if (data.state === 'loading' || data.state === 'warming') {
+                    statusElement.className = 'model-status status-loading';
+                    statusElement.innerHTML = '<i data-lucide="cpu" class="w-4 h-4 inline mr-1"></i> ' + data.message;
+                    setTimeout(checkModelStatus, 500);
+                } else if (data.ready) {
                     statusElement.className = 'model-status status-ready';
                     statusElement.innerHTML = '<i data-lucide="check-circle" class="w-4 h-4 inline mr-1"></i> YOLO Model Ready';
                 } else {
@@ -367,6 +527,7 @@ HTML_TEMPLATE = '''
                 
                 const url = URL.createObjectURL(file);
                 currentVideo = url;
+                videoStream = 'video-' + ((window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Math.random()).slice(2));
                 
                 const video = document.getElementById('videoPlayer');
                 video.src = url;
@@ -374,6 +535,7 @@ HTML_TEMPLATE = '''
                 video.onloadedmetadata = function() {
                     showVideo();
                     document.getElementById('detectButton').disabled = false;
+                    document.getElementById('liveButton').disabled = false;
                     document.getElementById('instructions').classList.add('hidden');
                     updateVideoInfo();
                 };
@@ -391,7 +553,8 @@ HTML_TEMPLATE = '''
                 URL.revokeObjectURL(currentVideo);
                 currentVideo = null;
             }
-            stopVideoAnalysis();
+            stopLive();
+            document.getElementById('liveButton').disabled = true;
             document.getElementById('videoContainer').classList.add('hidden');
             document.getElementById('videoDashboard').classList.add('hidden');
             document.getElementById('resultsContainer').classList.add('hidden');
@@ -431,34 +594,40 @@ HTML_TEMPLATE = '''
                 canvas.height = video.videoHeight;
                 ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
                 
-                const imageData = canvas.toDataURL('image/jpeg');
-                await processImageData(imageData);
+                // Encode the frame once as binary JPEG instead of a base64 data URL
+                const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.9));
+                await processImageData(blob, videoStream);
                 
                 // Draw predictions on video overlay
                 drawVideoPredictions();
             } else if (currentImage) {
                 // Process current image
-                await processImageData(currentImage);
+                const blob = await (await fetch(currentImage)).blob();
+                await processImageData(blob);
                 drawPredictions();
             }
         }
 
-        async function processImageData(imageData) {
+        async function processImageData(imageBlob, stream) {
             const button = document.getElementById('detectButton');
             button.disabled = true;
             button.innerHTML = '<div class="loading-spinner"></div> Processing...';
             
             try {
-                const response = await fetch('/api/detect', {
+                const params = new URLSearchParams({
+                    confidence: confidenceThreshold,
+                    iou: iouThreshold
+                });
+                if (stream) {
+                    // Lets the backend reuse results while the video frame is static
+                    params.set('stream', stream);
+                }
+                const response = await fetch('/api/detect?' + params.toString(), {
                     method: 'POST',
                     headers: {
-                        'Content-Type': 'application/json',
+                        'Content-Type': imageBlob.type || 'application/octet-stream',
                     },
-                    body: JSON.stringify({ 
-                        image: imageData,
-                        confidence: confidenceThreshold,
-                        iou: iouThreshold
-                    }),
+                    body: imageBlob,
                 });
                 
                 const data = await response.json();
@@ -482,6 +651,105 @@ HTML_TEMPLATE = '''
             }
         }
 
+        function toggleLive() {
+            if (liveSession) {
+                stopLive();
+            } else {
+                startLive();
+            }
+        }
+
+        function startLive() {
+            liveSession = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Math.random()).slice(2);
+            liveSeq = 0;
+            liveLastResultSeq = 0;
+            liveSentAt = {};
+            liveLastFrameTime = -1;
+            liveResultTimes = [];
+            
+            liveEvents = new EventSource(`/api/live/${liveSession}/events`);
+            liveEvents.onmessage = event => handleLiveResult(JSON.parse(event.data));
+            liveEvents.onopen = () => requestAnimationFrame(pumpLiveFrames);
+            
+            const button = document.getElementById('liveButton');
+            button.innerHTML = '<i data-lucide="square" class="w-5 h-5"></i> Stop Live Detection';
+            lucide.createIcons();
+            document.getElementById('videoPlayer').play();
+        }
+
+        function stopLive() {
+            if (!liveSession) return;
+            liveEvents.close();
+            fetch(`/api/live/${liveSession}`, { method: 'DELETE' }).catch(() => {});
+            liveSession = null;
+            liveEvents = null;
+            
+            const button = document.getElementById('liveButton');
+            button.innerHTML = '<i data-lucide="radio" class="w-5 h-5"></i> Start Live Detection';
+            document.getElementById('liveStatus').textContent = '';
+            lucide.createIcons();
+        }
+
+        async function pumpLiveFrames() {
+            if (!liveSession) return;
+            const video = document.getElementById('videoPlayer');
+            
+            // A result for frame N also settles every older frame the server dropped
+            const inFlight = liveSeq - liveLastResultSeq;
+            const oldest = liveSentAt[liveLastResultSeq + 1];
+            const stalled = oldest && performance.now() - oldest > 3000;
+            
+            if ((inFlight < LIVE_MAX_IN_FLIGHT || stalled) && video.readyState >= 2 && video.currentTime !== liveLastFrameTime) {
+                // Capture the newest frame only when there is room, never queue old ones
+                liveLastFrameTime = video.currentTime;
+                const canvas = document.createElement('canvas');
+                canvas.width = video.videoWidth;
+                canvas.height = video.videoHeight;
+                canvas.getContext('2d').drawImage(video, 0, 0, canvas.width, canvas.height);
+                const blob = await new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+                
+                if (liveSession) {
+                    const seq = ++liveSeq;
+                    liveSentAt[seq] = performance.now();
+                    const params = new URLSearchParams({ seq: seq, confidence: confidenceThreshold, iou: iouThreshold });
+                    fetch(`/api/live/${liveSession}/frame?` + params.toString(), {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'image/jpeg' },
+                        body: blob,
+                    }).then(response => {
+                        // Session unknown (e.g. server restarted): open a fresh one
+                        if (response.status === 404 && liveSession) {
+                            stopLive();
+                            startLive();
+                        }
+                    }).catch(() => {});
+                }
+            }
+            requestAnimationFrame(pumpLiveFrames);
+        }
+
+        function handleLiveResult(data) {
+            // Results can overtake each other or arrive for frames already superseded
+            if (!liveSession || data.seq <= liveLastResultSeq) return;
+            const sentAt = liveSentAt[data.seq];
+            for (const seq of Object.keys(liveSentAt)) {
+                if (Number(seq) <= data.seq) delete liveSentAt[seq];
+            }
+            liveLastResultSeq = data.seq;
+            if (!data.success) return;
+            
+            currentPredictions = data.predictions;
+            drawVideoPredictions();
+            updateStats(data.stats);
+            
+            const now = performance.now();
+            liveResultTimes.push(now);
+            while (liveResultTimes.length && now - liveResultTimes[0] > 2000) liveResultTimes.shift();
+            const fps = liveResultTimes.length / 2;
+            const latency = sentAt ? Math.round(now - sentAt) : '-';
+            document.getElementById('liveStatus').textContent = `Live: ${fps.toFixed(1)} fps, ${latency} ms`;
+        }
+
         function updateDetectionDetails(detectionInfo) {
             const detailsElement = document.getElementById('detectionDetails');
             let html = `
@@ -555,7 +823,7 @@ HTML_TEMPLATE = '''
                     ctx.strokeRect(pred.x, pred.y, pred.width, pred.height);
                     
                     // Draw label background
-                    const label = `${pred.class} ${(pred.confidence * 100).toFixed(0)}%`;
+                    const label = `${pred.class}${pred.track_id ? ' #' + pred.track_id : ''} ${(pred.confidence * 100).toFixed(0)}%`;
                     ctx.font = 'bold 14px Arial';
                     const textWidth = ctx.measureText(label).width;
                     
@@ -586,7 +854,7 @@ HTML_TEMPLATE = '''
                 ctx.strokeRect(pred.x, pred.y, pred.width, pred.height);
                 
                 // Draw label background
-                const label = `${pred.class} ${(pred.confidence * 100).toFixed(0)}%`;
+                const label = `${pred.class}${pred.track_id ? ' #' + pred.track_id : ''} ${(pred.confidence * 100).toFixed(0)}%`;
                 ctx.font = 'bold 14px Arial';
                 const textWidth = ctx.measureText(label).width;
                 
@@ -622,148 +890,644 @@ HTML_TEMPLATE = '''
 '''
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_UPLOAD_MB * 2**20)
+
+admission = AdmissionLimiter(INFERENCE_CONCURRENCY, MAX_PENDING_REQUESTS, QUEUE_TIMEOUT_SECONDS)
+video_jobs = AdmissionLimiter(VIDEO_CONCURRENCY, 0, QUEUE_TIMEOUT_SECONDS)
+
+# Prometheus metrics served at /api/metrics
+metrics = MetricsRegistry()
+stage_seconds = metrics.histogram('yolo_stage_seconds', 'Time per detection stage', ('stage',))
+request_seconds = metrics.histogram('yolo_request_seconds', 'API request latency', ('endpoint',))
+requests_total = metrics.counter('yolo_requests_total', 'API requests by endpoint and status code', ('endpoint', 'status'))
+detection_errors = metrics.counter('yolo_detection_errors_total', 'Frames that failed in process_image')
 
 class YOLOTableDetector:
     def __init__(self):
-        self.model = None
+        self.models = None
+        self.worker_pool = None
         self.model_loaded = False
-        self.load_model()
+        self.floor_plans = load_floor_plans(FLOOR_PLAN_PATH) if os.path.exists(FLOOR_PLAN_PATH) else {}
+        self.motion_gate = None
+        if MOTION_GATE_ENABLED:
+            self.motion_gate = MotionGate(MOTION_MIN_CHANGED_FRACTION, refresh_seconds=MOTION_REFRESH_SECONDS)
+        self.change_maps = None
+        if CHANGE_MAP_ENABLED:
+            self.change_maps = FloorPlanChanges(CHANGE_MAP_WIDTH, CHANGE_MIN_FRACTION, CHANGE_REFRESH_SECONDS)
+        self.result_cache = None
+        if RESULT_CACHE_ENTRIES > 0:
+            self.result_cache = ResultCache(RESULT_CACHE_ENTRIES, int(RESULT_CACHE_MB * 1024 * 1024),
+                                            RESULT_CACHE_TTL_SECONDS)
+        self.trackers = None
+        if TRACKING_ENABLED:
+            self.trackers = StreamTrackers(TRACK_DETECT_EVERY, max_age=TRACK_MAX_AGE, min_hits=TRACK_MIN_HITS)
+        self.timeseries = TimeSeriesStore(TIMESERIES_DIR, TIMESERIES_SEGMENT_ROWS) if TIMESERIES_DIR else None
+        self.rollups = OccupancyRollups(
+            self.rollup_history, has_history=self.timeseries.has_camera if self.timeseries else None
+        )
+        self.letterbox_buffers = LetterboxBuffers()
+        
+        # loading -> warming -> ready in the background, so the server can listen
+        # right away; mock (no inference backend) and failed serve mock results
+        self.state = "loading" if INFERENCE_AVAILABLE else "mock"
+        self.startup = {"load_ms": None, "warmup_ms": None, "ready_after_s": None, "error": None,
+                        "compile": COMPILE_MODE or None, "warmup": []}
+        self.last_inference = time.time()
+        self.keep_warm_runs = 0
+        self.ready_event = threading.Event()
+        if INFERENCE_AVAILABLE:
+            threading.Thread(target=self.load_model, name='model-loader', daemon=True).start()
+        else:
+            print("YOLO not available. Using mock mode.")
+            self.ready_event.set()
+    
+    @property
+    def loading(self):
+        return self.state in ("loading", "warming")
+    
+    def wait_ready(self, timeout=None):
+        """Block until the background load has finished (ready, mock or failed)"""
+        return self.ready_event.wait(timeout)
     
     def load_model(self):
-        """Load YOLO model - will use pretrained model for demo"""
+        """Register the configured YOLO models, load the default one and warm it up"""
         try:
-            if YOLO_AVAILABLE:
-                # Load a pretrained YOLOv8 model
-                # You can replace this with your custom trained model
-                self.model = YOLO('yolov8n.pt')  # Using nano version for speed
-                self.model_loaded = True
-                print("YOLO model loaded successfully!")
+            started = time.perf_counter()
+            load_fn = partial(load_weights, compile_mode=COMPILE_MODE, imgsz=INFERENCE_IMGSZ)
+            # Other models (e.g. a custom model from train_yolo.py) load on first request
+            self.models = ModelRegistry(
+                MODEL_SPECS, load_fn, self.infer_batch, MODEL_MEMORY_BUDGET_MB,
+                BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+            )
+            if PROCESS_WORKERS > 0:
+                # Worker processes own the default model; spawned children
+                # re-import this module and must not start a pool of their own
+                if multiprocessing.parent_process() is None:
+                    path = MODEL_SPECS[self.models.default_name]
+                    if COMPILE_MODE in EXPORT_FORMATS and not path.endswith('.onnx'):
+                        # Export once here rather than racing in every worker
+                        export_fixed_shape(path, COMPILE_MODE, INFERENCE_IMGSZ)
+                    # Workers warm up the full-frame shapes (batch 1) before reporting ready
+                    self.state = "warming"
+                    self.worker_pool = InferenceWorkerPool(
+                        path, PROCESS_WORKERS, slot_mb=WORKER_SLOT_MB, load_fn=load_fn,
+                        warmup_shapes=[frame.shape[:2] for _, frame, key, copies in self.warmup_plan()
+                                       if key[2] is None and copies == 1],
+                        warmup_runs=WARMUP_RUNS
+                    )
             else:
-                print("YOLO not available. Using mock mode.")
-                self.model_loaded = False
+                self.models.get()
+            self.startup["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            self.state = "warming"
+            started = time.perf_counter()
+            self.startup["warmup"] = self.warm_up(WARMUP_RUNS)
+            self.startup["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            
+            self.model_loaded = True
+            self.state = "ready"
+            print("YOLO model loaded successfully!")
+            self.last_inference = time.time()
+            if KEEP_WARM_SECONDS > 0 and (self.worker_pool or PROCESS_WORKERS == 0):
+                threading.Thread(target=self.keep_warm, name='keep-warm', daemon=True).start()
         except Exception as e:
             print(f"Error loading YOLO model: {e}")
             self.model_loaded = False
+            self.state = "failed"
+            self.startup["error"] = str(e)
+        finally:
+            self.startup["ready_after_s"] = round(time.time() - PROCESS_STARTED, 3)
+            self.ready_event.set()
+    
+    def warmup_plan(self):
+        """(label, frame or crop stack, inference key, submissions) for every input shape the configuration produces"""
+        plan = []
+        for width, height in WARMUP_SIZES:
+            shape = letterbox_shape(height, width, INFERENCE_IMGSZ, stride=32)
+            frame = np.full(shape + (3,), PAD_VALUE, dtype=np.uint8)
+            for copies in sorted({1, max(1, BATCH_MAX_SIZE)}):
+                plan.append((f"{shape[1]}x{shape[0]}", frame, (0.5, 0.5, None), copies))
+            if TILED_DEFAULT:
+                tiles = len(tile_grid(height, width, TILE_SIZE, TILE_OVERLAP)) + 1
+                stack = np.full((tiles, INFERENCE_IMGSZ, INFERENCE_IMGSZ, 3), PAD_VALUE, dtype=np.uint8)
+                plan.append((f"{width}x{height} tiles", stack, (0.5, 0.5, INFERENCE_IMGSZ), 1))
+        for camera, floor_plan in self.floor_plans.items():
+            size = floor_plan.crop_size
+            stack = np.full((len(floor_plan), size, size, 3), PAD_VALUE, dtype=np.uint8)
+            plan.append((f"floor plan {camera}", stack, (0.5, 0.5, size), 1))
+        return plan
+    
+    def warm_up(self, runs):
+        """Run the warm-up plan runs times through the default model's scheduler
+        
+        Returns the first (cold) and last run's time per shape and batch size.
+        """
+        if PROCESS_WORKERS > 0 or runs <= 0:
+            # Pool workers warm up their full-frame shapes before reporting ready
+            return []
+        scheduler = self.models.get().scheduler
+        report = []
+        for label, frame, key, copies in self.warmup_plan():
+            elapsed = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                # Submitted together, the copies go through the model as one batch
+                futures = [scheduler.submit(frame, key) for _ in range(copies)]
+                for future in futures:
+                    future.result()
+                elapsed.append(round((time.perf_counter() - started) * 1000, 1))
+            report.append({
+                "shape": label,
+                "batch": copies if key[2] is None else len(frame),
+                "first_ms": elapsed[0],
+                "warm_ms": elapsed[-1]
+            })
+        return report
+    
+    def keep_warm(self):
+        """Rerun the first warm-up shape whenever inference has been idle for KEEP_WARM_SECONDS"""
+        plan = self.warmup_plan()
+        if not plan:
+            return
+        _, frame, key, _ = plan[0]
+        while True:
+            idle = time.time() - self.last_inference
+            if idle < KEEP_WARM_SECONDS:
+                time.sleep(KEEP_WARM_SECONDS - idle)
+                continue
+            try:
+                if self.worker_pool:
+                    self.worker_pool.warm(frame, key[:2])
+                else:
+                    self.models.infer(self.models.default_name, frame, key)
+                self.keep_warm_runs += 1
+            except Exception as e:
+                print(f"Keep-warm inference failed: {e}")
+            self.last_inference = time.time()
+    
+    def image_bytes(self, image_data):
+        """Raw encoded bytes from a binary upload or a base64 data URL"""
+        if isinstance(image_data, str):
+            if 'base64,' in image_data:
+                image_data = image_data.split('base64,')[1]
+            image_data = base64.b64decode(image_data)
+        return image_data
+    
+    def decode_image(self, image_data):
+        """Decode raw image bytes or a base64 data URL straight into a BGR ndarray"""
+        image_data = self.image_bytes(image_data)
+        
+        # Single decode from the encoded buffer, no intermediate PIL image
+        image_np = cv2.imdecode(np.frombuffer(image_data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image_np is None:
+            raise ValueError("Could not decode image data")
+        return image_np
+    
+    def infer_batch(self, model, frames, key):
+        """Run one batched model call for frames sharing (confidence, iou, imgsz)"""
+        confidence, iou, imgsz = key
+        if imgsz is None:
+            return detect_batch(model, frames, confidence, iou)
+        
+        # Floor-plan crop stacks: every crop of every queued request in one call
+        crops = [crop for stack in frames for crop in stack]
+        detections = detect_batch(model, crops, confidence, iou, imgsz)
+        
+        batches = []
+        start = 0
+        for stack in frames:
+            batches.append(detections[start:start + len(stack)])
+            start += len(stack)
+        return batches
     
-    def process_image(self, image_data, confidence=0.5, iou=0.5):
+    def process_image(self, image_data, confidence=0.5, iou=0.5, stream=None, camera=None, model=None,
+                      timings=False, tiled=False):
         """Process image with YOLO model"""
+        timer = StageTimer()
         try:
             start_time = time.time()
             
-            # Convert base64 to image
-            if 'base64,' in image_data:
-                image_data = image_data.split('base64,')[1]
+            # Identical bytes seen recently: no decode, no inference. Stream frames are
+            # left to the motion gate and tracker, whose state follows frame order
+            cache_key = None
+            if self.result_cache and not stream:
+                with timer.stage('result_cache'):
+                    cache_key = self.result_cache.key(image_data, self.cache_params(confidence, iou, camera, model, tiled))
+                    cached = self.result_cache.lookup(cache_key)
+                if cached:
+                    return self.finish(cached, camera, start_time, timer, timings)
             
-            image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
-            image_np = np.array(image)
+            # Accepts raw encoded bytes (binary upload) or a base64 string (JSON upload)
+            with timer.stage('decode'):
+                image_data = self.image_bytes(image_data)
             
-            if self.model_loaded and YOLO_AVAILABLE:
-                # Run YOLO inference
-                results = self.model(image_np, conf=confidence, iou=iou, verbose=False)
-                
-                # Process results
-                predictions = []
-                class_distribution = {}
-                
-                for result in results:
-                    boxes = result.boxes
-                    if boxes is not None:
-                        for box in boxes:
-                            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                            conf = box.conf[0].cpu().numpy()
-                            cls = int(box.cls[0].cpu().numpy())
-                            class_name = self.model.names[cls]
-                            
-                            # Update class distribution
-                            class_distribution[class_name] = class_distribution.get(class_name, 0) + 1
-                            
-                            prediction = {
-                                "x": int(x1),
-                                "y": int(y1),
-                                "width": int(x2 - x1),
-                                "height": int(y2 - y1),
-                                "confidence": float(conf),
-                                "class": class_name,
-                                "class_id": cls
-                            }
-                            predictions.append(prediction)
-                
-                # Calculate table occupancy based on detected objects
-                stats = self.calculate_occupancy_stats(predictions)
-                
-                inference_time = int((time.time() - start_time) * 1000)
-                
-                return {
-                    "success": True,
-                    "predictions": predictions,
-                    "stats": stats,
-                    "detection_info": {
-                        "inference_time": inference_time,
-                        "total_detections": len(predictions),
-                        "class_distribution": class_distribution,
-                        "model_name": "YOLOv8n" if self.model_loaded else "Mock Model",
-                        "advanced_metrics": {
-                            "confidence_threshold": confidence,
-                            "iou_threshold": iou
-                        }
-                    }
-                }
-            else:
-                # Fallback to mock mode
-                return self.mock_detection(image_np, confidence)
+            # Live streams skip inference while the scene is static
+            thumb = None
+            if stream and self.motion_gate:
+                with timer.stage('motion_gate'):
+                    thumb = self.motion_gate.thumbnail(image_data)
+                    cached = self.motion_gate.lookup(stream, thumb, (confidence, iou, camera, model, tiled))
+                if cached:
+                    return self.finish(cached, camera, start_time, timer, timings)
+            
+            tracker = self.stream_tracker(stream, camera, confidence, iou, model)
+            if tracker:
+                result = self.predicted_result(tracker, start_time, model, timer)
+                if result:
+                    return self.finish(result, camera, start_time, timer, timings)
+            
+            with timer.stage('decode'):
+                if (REDUCED_DECODE and self.model_loaded and INFERENCE_AVAILABLE and not tiled
+                        and camera not in self.floor_plans):
+                    # Full frames only need as many pixels as the model input (tiles need them all)
+                    image_np, source_scale = decode_for_model(image_data, INFERENCE_IMGSZ)
+                else:
+                    image_np, source_scale = self.decode_image(image_data), (1.0, 1.0)
+            result = self.analyze(image_np, confidence, iou, camera, model, start_time, timer, tracker,
+                                  source_scale, tiled)
+            
+            if thumb is not None:
+                result["reused"] = False
+                self.motion_gate.update(stream, thumb, (confidence, iou, camera, model, tiled), result)
+            if cache_key is not None and result.get("success"):
+                result["cached"] = False
+                self.result_cache.store(cache_key, result)
+            return self.finish(result, camera, start_time, timer, timings)
                 
         except Exception as e:
+            detection_errors.inc()
             return {
                 "success": False,
                 "error": str(e)
             }
+        finally:
+            timer.observe(stage_seconds)
     
-    def calculate_occupancy_stats(self, predictions):
-        """Calculate table occupancy statistics from YOLO detections"""
-        tables = [p for p in predictions if p['class'] in ['dining table', 'table']]
-        people = [p for p in predictions if p['class'] in ['person']]
-        chairs = [p for p in predictions if p['class'] in ['chair']]
-        
-        # Simple occupancy logic: table is occupied if people are detected near it
-        occupied_tables = 0
-        vacant_tables = 0
-        
-        for table in tables:
-            table_center_x = table['x'] + table['width'] / 2
-            table_center_y = table['y'] + table['height'] / 2
-            
-            # Check if any person is near this table
-            is_occupied = False
-            for person in people:
-                person_center_x = person['x'] + person['width'] / 2
-                person_center_y = person['y'] + person['height'] / 2
-                
-                # Calculate distance between table and person
-                distance = ((table_center_x - person_center_x) ** 2 + 
-                           (table_center_y - person_center_y) ** 2) ** 0.5
-                
-                # If person is close to table, consider it occupied
-                if distance < max(table['width'], table['height']) * 1.5:
-                    is_occupied = True
-                    break
-            
-            if is_occupied:
-                occupied_tables += 1
-                # Update class to indicate occupancy
-                table['class'] = 'occupied_table'
+    def process_decoded(self, image_np, confidence=0.5, iou=0.5, stream=None, camera=None, model=None,
+                        timings=False, tiled=False):
+        """process_image for a frame that is already a BGR array (server-side camera ingest)"""
+        timer = StageTimer()
+        try:
+            start_time = time.time()
+            tracker = self.stream_tracker(stream, camera, confidence, iou, model)
+            result = self.predicted_result(tracker, start_time, model, timer) if tracker else None
+            if result is None:
+                result = self.analyze(image_np, confidence, iou, camera, model, start_time, timer, tracker,
+                                      tiled=tiled)
+            return self.finish(result, camera, start_time, timer, timings)
+        except Exception as e:
+            detection_errors.inc()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            timer.observe(stage_seconds)
+    
+    def cache_params(self, confidence, iou, camera, model, tiled):
+        """Everything besides the frame bytes that a cached result depends on"""
+        if self.model_loaded and self.models:
+            model = model or self.models.default_name
+        # Mock results from before the model loaded must not outlive it
+        return confidence, iou, camera, model, tiled, self.model_loaded
+    
+    def stream_tracker(self, stream, camera, confidence, iou, model):
+        """The stream's tracker, or None when frames aren't tracked"""
+        # Floor-plan cameras already have fixed table ids, so only full frames are tracked
+        if stream and self.trackers and self.model_loaded and camera not in self.floor_plans:
+            return self.trackers.get((stream, confidence, iou, model))
+        return None
+    
+    def predicted_result(self, tracker, start_time, model, timer):
+        """Result from track prediction when this frame may skip detection, else None"""
+        with tracker.lock:
+            if tracker.needs_detection():
+                return None
+            with timer.stage('tracking'):
+                return self.predict_tracks(tracker, start_time, model)
+    
+    def analyze(self, image_np, confidence, iou, camera, model, start_time, timer, tracker,
+                source_scale=(1.0, 1.0), tiled=False):
+        """Detection and occupancy of a decoded frame, per table region for floor-plan cameras"""
+        if camera in self.floor_plans:
+            return self.process_floor_plan(image_np, self.floor_plans[camera], confidence, iou,
+                                           start_time, model, timer)
+        return self.process_frame(image_np, confidence, iou, start_time, model, timer, tracker, source_scale, tiled)
+    
+    def finish(self, result, camera, start_time, timer, timings):
+        """Fold the frame into its camera's rollups and history, then attach timings"""
+        if camera and "stats" in result:
+            # Before the history append: a camera's first frame seeds its rollups from it
+            with timer.stage('rollups'):
+                self.rollups.update(camera, start_time, result["stats"])
+        if self.timeseries and camera and result.get("tables"):
+            with timer.stage('timeseries'):
+                try:
+                    tables = result["tables"]
+                    self.timeseries.append(
+                        camera, start_time, [table["id"] for table in tables],
+                        [table["occupied"] for table in tables], [table["people"] for table in tables]
+                    )
+                except Exception as e:
+                    # History is best effort; never fail the detection over it
+                    print(f"Time-series append failed for {camera}: {e}")
+        return self.attach_timings(result, timer, timings)
+    
+    def rollup_history(self, camera, since):
+        """Recorded per-frame table counts of a camera, to seed its rollups after a restart"""
+        if not self.timeseries:
+            return None
+        timestamps, occupied, tables, people = self.timeseries.totals(camera, since)
+        return (timestamps, occupied, tables, people) if len(timestamps) else None
+    
+    def attach_timings(self, result, timer, timings):
+        """Per-stage milliseconds on the response when requested"""
+        # Top-level key: a cached result's nested dicts are shared with the motion gate
+        if timings:
+            result["timings_ms"] = timer.as_ms()
+        else:
+            result.pop("timings_ms", None)
+        return result
+    
+    def record_inference(self, timer, detections, elapsed):
+        """Split a model call's wall time into its batch stages and time spent queued"""
+        self.last_inference = time.time()
+        timer.update(detections.timings)
+        timer.add('queue', max(0.0, elapsed - sum(detections.timings.values())))
+    
+    def process_frame(self, image_np, confidence=0.5, iou=0.5, start_time=None, model=None, timer=None,
+                      tracker=None, source_scale=(1.0, 1.0), tiled=False):
+        """Run detection and occupancy on an already decoded BGR frame
+
+        source_scale maps image_np's coordinates to the full-resolution frame
+        when it was decoded at reduced scale; predictions are in full-frame pixels.
+        tiled runs overlapping tiles and the whole frame as one batch instead.
+        """
+        start_time = start_time or time.time()
+        timer = timer or StageTimer()
+        
+        if self.model_loaded and INFERENCE_AVAILABLE:
+            model = model or self.models.default_name
+            
+            if tiled:
+                detections = self.detect_tiled(image_np, confidence, iou, model, timer)
+                with timer.stage('occupancy'):
+                    stats = self.calculate_occupancy_stats(detections)
             else:
-                vacant_tables += 1
-                table['class'] = 'vacant_table'
+                detections, stats = self.detect_frame(image_np, confidence, iou, model, timer, source_scale)
+            track_ids = None
+            if tracker:
+                with timer.stage('tracking'), tracker.lock:
+                    track_ids = tracker.update(detections)
+                self.trackers.count(detected=True)
+            with timer.stage('box_extraction'):
+                class_distribution = detections.class_distribution()
+                predictions = detections.to_predictions(track_ids=track_ids)
+            
+            inference_time = int((time.time() - start_time) * 1000)
+            
+            result = {
+                "success": True,
+                "predictions": predictions,
+                "stats": stats,
+                "detection_info": {
+                    "inference_time": inference_time,
+                    "total_detections": len(predictions),
+                    "class_distribution": class_distribution,
+                    "model_name": model,
+                    "advanced_metrics": {
+                        "confidence_threshold": confidence,
+                        "iou_threshold": iou
+                    }
+                }
+            }
+            if tiled:
+                result["detection_info"]["advanced_metrics"].update(
+                    {"mode": "tiled", "tile_size": TILE_SIZE, "tile_overlap": TILE_OVERLAP}
+                )
+            if tracker:
+                result["tables"] = self.tracked_tables(detections, track_ids)
+            return result
+        else:
+            # Fallback to mock mode
+            return self.mock_detection(image_np, confidence)
+    
+    def detect_frame(self, image_np, confidence, iou, model, timer, source_scale):
+        """Detections and occupancy stats of the whole frame at model input size"""
+        # Letterbox into this thread's reusable buffer so the model gets input-sized frames
+        with timer.stage('preprocess'):
+            shape = letterbox_shape(image_np.shape[0], image_np.shape[1], INFERENCE_IMGSZ, stride=32)
+            frame, scale, pad = letterbox(image_np, INFERENCE_IMGSZ, self.letterbox_buffers.get(shape))
+        
+        started = time.perf_counter()
+        if self.worker_pool and model == self.models.default_name:
+            # Inference and occupancy run in a worker process, off this GIL
+            with admission.suspend():
+                detections, stats = self.worker_pool.infer(frame, (confidence, iou))
+            self.record_inference(timer, detections, time.perf_counter() - started)
+            self.to_source_frame(detections, scale, pad, source_scale)
+        else:
+            # Run YOLO inference, batched with any concurrent requests for the same model;
+            # the admission slot is free for another request's decode while this one waits
+            with admission.suspend():
+                detections = self.models.infer(model, frame, (confidence, iou, None))
+            self.record_inference(timer, detections, time.perf_counter() - started)
+            self.to_source_frame(detections, scale, pad, source_scale)
+            
+            # Calculate table occupancy based on detected objects
+            with timer.stage('occupancy'):
+                stats = self.calculate_occupancy_stats(detections)
+        return detections, stats
+    
+    def detect_tiled(self, image_np, confidence, iou, model, timer):
+        """Detections of overlapping tiles and the whole frame, merged across tiles"""
+        with timer.stage('preprocess'):
+            tiles = tile_grid(image_np.shape[0], image_np.shape[1], TILE_SIZE, TILE_OVERLAP)
+            batch, transforms = tile_batch(image_np, tiles, INFERENCE_IMGSZ)
+        
+        # One stack per request, batched with other tiled or floor-plan requests
+        started = time.perf_counter()
+        with admission.suspend():
+            tile_detections = self.models.infer(model, batch, (confidence, iou, INFERENCE_IMGSZ))
+        self.record_inference(timer, tile_detections[0], time.perf_counter() - started)
+        
+        with timer.stage('tile_merge'):
+            return merge_tiles(tile_detections, transforms, tiles, image_np.shape, iou)
+    
+    @staticmethod
+    def to_source_frame(detections, scale, pad, source_scale):
+        """Map boxes from the letterboxed model input back to full-resolution frame pixels"""
+        source = np.array([source_scale[0], source_scale[1], source_scale[0], source_scale[1]], dtype=np.float32)
+        detections.xyxy = unletterbox_boxes(detections.xyxy, scale, pad) * source
+    
+    def predict_tracks(self, tracker, start_time, model=None):
+        """Answer a skipped frame from the stream's track predictions"""
+        xyxy, class_ids, conf, track_ids = tracker.predict()
+        detections = Detections(xyxy, conf, class_ids, tracker.names)
+        stats = self.calculate_occupancy_stats(detections)
+        self.trackers.count(detected=False)
         
         return {
-            "total_tables": len(tables),
-            "occupied_tables": occupied_tables,
-            "vacant_tables": vacant_tables,
-            "total_people": len(people),
-            "total_chairs": len(chairs)
+            "success": True,
+            "predictions": detections.to_predictions(track_ids=track_ids),
+            "stats": stats,
+            "tables": self.tracked_tables(detections, track_ids),
+            "detection_info": {
+                "inference_time": int((time.time() - start_time) * 1000),
+                "total_detections": len(detections),
+                "class_distribution": detections.class_distribution(),
+                "model_name": model or self.models.default_name,
+                "advanced_metrics": {
+                    "tracking": "predicted",
+                    "frames_since_detection": tracker.frames_since_detection
+                }
+            }
+        }
+    
+    def tracked_tables(self, detections, track_ids):
+        """Per-table state of a tracked frame, keyed by track id like floor-plan tables"""
+        is_table = np.isin(detections.name_table[detections.cls], TABLE_CLASSES) & (track_ids > 0)
+        boxes = detections.boxes_int()
+        people = nearest_table_counts(boxes[is_table], boxes[detections.mask(PERSON_CLASSES)])
+        occupied = detections.labels[is_table] == 'occupied_table'
+        return [
+            {"id": f"track-{track_id}", "occupied": is_occupied, "people": count}
+            for track_id, is_occupied, count in zip(track_ids[is_table].tolist(), occupied.tolist(), people.tolist())
+        ]
+    
+    def process_floor_plan(self, image_np, plan, confidence=0.5, iou=0.5, start_time=None, model=None,
+                           timer=None):
+        """Per-table occupancy from batched crops around known table regions"""
+        start_time = start_time or time.time()
+        timer = timer or StageTimer()
+        size = plan.crop_size
+        regions = plan.crop_regions(image_np.shape)
+        model_ready = self.model_loaded and INFERENCE_AVAILABLE
+        model_name = (model or self.models.default_name) if model_ready else "Mock Model (YOLO not available)"
+        
+        # Tables whose region hasn't changed keep the objects of their last inference
+        change_key = (confidence, iou, model_name)
+        if self.change_maps and model_ready:
+            with timer.stage('change_map'):
+                infer = self.change_maps.tables_to_infer(plan.camera, image_np, regions, change_key)
+        else:
+            infer = np.ones(len(plan), dtype=bool)
+        indices = np.flatnonzero(infer)
+        
+        # Letterbox every padded table crop to infer into one preallocated batch
+        with timer.stage('preprocess'):
+            batch = np.full((len(indices), size, size, 3), PAD_VALUE, dtype=np.uint8)
+            transforms = []
+            for j, (x1, y1, x2, y2) in enumerate(regions[indices]):
+                if x2 > x1 and y2 > y1:
+                    _, scale, pad = letterbox(image_np[y1:y2, x1:x2], size, out=batch[j])
+                else:
+                    scale, pad = 1.0, (0, 0)
+                transforms.append((scale, pad, (x1, y1)))
+        
+        names = None
+        if model_ready and len(indices):
+            started = time.perf_counter()
+            with admission.suspend():
+                crop_detections = self.models.infer(model_name, batch, (confidence, iou, size))
+            self.record_inference(timer, crop_detections[0], time.perf_counter() - started)
+            names = crop_detections[0].names
+        else:
+            crop_detections = [Detections.empty({0: 'person'}) for _ in range(len(indices))]
+        
+        # Map crop detections back to frame coordinates, one (xyxy, conf, class_ids) per table
+        occupancy_started = time.perf_counter()
+        table_objects = [None] * len(plan)
+        for i, detections, (scale, pad, offset) in zip(indices.tolist(), crop_detections, transforms):
+            keep = ~detections.mask(TABLE_CLASSES)
+            table_objects[i] = (unletterbox_boxes(detections.xyxy[keep], scale, pad, offset),
+                                detections.conf[keep], detections.cls[keep])
+        if self.change_maps and model_ready:
+            table_objects, names = self.change_maps.merge(plan.camera, change_key, infer, table_objects, names)
+        names = names or {0: 'person'}
+        
+        xyxy, conf, class_ids, table_index = [], [], [], []
+        for i, objects in enumerate(table_objects):
+            if objects is None:
+                continue
+            xyxy.append(objects[0])
+            conf.append(objects[1])
+            class_ids.append(objects[2])
+            table_index.append(np.full(len(objects[1]), i, dtype=np.int64))
+        if xyxy:
+            objects = Detections(np.concatenate(xyxy), np.concatenate(conf), np.concatenate(class_ids), names)
+            table_index = np.concatenate(table_index)
+        else:
+            objects, table_index = Detections.empty(names), np.zeros(0, dtype=np.int64)
+        
+        # Occupancy comes straight from each table's own crop
+        person_mask = objects.mask(PERSON_CLASSES)
+        people_counts = assigned_people_counts(plan.boxes, objects.boxes_int()[person_mask], table_index[person_mask])
+        if model_ready:
+            occupied = people_counts > 0
+        else:
+            occupied = np.arange(len(plan)) % 2 == 0
+        
+        # Neighbouring crops overlap, so drop duplicates before reporting objects
+        keep = nms(objects.xyxy, objects.conf, objects.cls, 0.5)
+        unique = Detections(objects.xyxy[keep], objects.conf[keep], objects.cls[keep], names)
+        timer.add('occupancy', time.perf_counter() - occupancy_started)
+        
+        table_predictions = [
+            {
+                "x": int(box[0]),
+                "y": int(box[1]),
+                "width": int(box[2]),
+                "height": int(box[3]),
+                "confidence": 1.0,
+                "class": "occupied_table" if is_occupied else "vacant_table",
+                "class_id": -1,
+                "tableNumber": table_id
+            }
+            for table_id, box, is_occupied in zip(plan.table_ids, plan.boxes, occupied.tolist())
+        ]
+        predictions = table_predictions + unique.to_predictions()
+        occupied_tables = int(occupied.sum())
+        class_distribution = unique.class_distribution()
+        
+        inference_time = int((time.time() - start_time) * 1000)
+        
+        return {
+            "success": True,
+            "predictions": predictions,
+            "stats": {
+                "total_tables": len(plan),
+                "occupied_tables": occupied_tables,
+                "vacant_tables": len(plan) - occupied_tables,
+                "total_people": int(unique.mask(PERSON_CLASSES).sum()),
+                "total_chairs": int(unique.mask(CHAIR_CLASSES).sum())
+            },
+            "tables": [
+                {"id": table_id, "occupied": is_occupied, "people": count}
+                for table_id, is_occupied, count in zip(plan.table_ids, occupied.tolist(), people_counts.tolist())
+            ],
+            "detection_info": {
+                "inference_time": inference_time,
+                "total_detections": len(predictions),
+                "class_distribution": class_distribution,
+                "model_name": model_name,
+                "advanced_metrics": {
+                    "mode": "floor_plan",
+                    "camera": plan.camera,
+                    "crops": len(plan),
+                    "inferred_crops": len(indices),
+                    "crop_size": size,
+                    "confidence_threshold": confidence,
+                    "iou_threshold": iou
+                }
+            }
         }
     
+    def calculate_occupancy_stats(self, detections):
+        """Calculate table occupancy statistics from YOLO detections"""
+        stats, _ = occupancy_stats(detections)
+        return stats
+    
     def mock_detection(self, image_np, confidence):
         """Mock detection for when YOLO is not available"""
         height, width = image_np.shape[:2]
@@ -831,9 +1595,30 @@ class YOLOTableDetector:
             }
         }
     
-    def generate_demo_image(self):
+    def demo_layout(self, num_tables=6):
+        """Table centers and occupancy for a demo scene of num_tables tables
+        
+        The default six tables keep the original layout; larger scenes are a
+        grid with 200px spacing and every other table occupied by two people.
+        """
+        if num_tables == 6:
+            tables = [
+                (200, 150, True), (400, 150, False), (600, 150, True),
+                (200, 350, False), (400, 350, True), (600, 350, False),
+            ]
+            return 800, 600, tables
+        
+        columns = max(1, int(np.ceil(np.sqrt(num_tables * 4 / 3))))
+        rows = int(np.ceil(num_tables / columns))
+        tables = [
+            (200 + 200 * (i % columns), 150 + 200 * (i // columns), i % 2 == 0)
+            for i in range(num_tables)
+        ]
+        return 200 * columns + 200, 200 * rows + 100, tables
+    
+    def generate_demo_image(self, num_tables=6, encoding='.png'):
         """Generate a demo restaurant image with tables and people"""
-        width, height = 800, 600
+        width, height, tables = self.demo_layout(num_tables)
         image = np.ones((height, width, 3), dtype=np.uint8) * 240  # Light gray background
         
         # Draw floor pattern
@@ -843,11 +1628,6 @@ class YOLOTableDetector:
             cv2.line(image, (0, i), (width, i), (220, 220, 220), 1)
         
         # Draw tables
-        tables = [
-            (200, 150, True), (400, 150, False), (600, 150, True),
-            (200, 350, False), (400, 350, True), (600, 350, False),
-        ]
-        
         for i, (x, y, occupied) in enumerate(tables):
             # Table
             cv2.rectangle(image, (x-75, y-50), (x+75, y+50), (139, 69, 19), -1)
@@ -866,7 +1646,7 @@ class YOLOTableDetector:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         # Convert to base64
-        _, buffer = cv2.imencode('.png', image)
+        _, buffer = cv2.imencode(encoding, image)
         image_base64 = base64.b64encode(buffer).decode('utf-8')
         
         return image_base64
@@ -874,24 +1654,194 @@ class YOLOTableDetector:
 # Initialize detector
 detector = YOLOTableDetector()
 
+def model_samples(field):
+    """(model, value) pairs from the registry for a scrape-time gauge"""
+    if not detector.models:
+        return []
+    return [((name,), field(entry)) for name, entry in detector.models.entries.items()]
+
+metrics.gauge('yolo_model_load_seconds', 'Duration of the last load of each model', ('model',),
+              lambda: model_samples(lambda entry: entry.load_ms / 1000 if entry.load_ms is not None else None))
+metrics.gauge('yolo_scheduler_queue_depth', 'Frames waiting for a batch per model', ('model',),
+              lambda: model_samples(lambda entry: len(entry.scheduler.queue) if entry.scheduler else None))
+metrics.gauge('yolo_model_ready', '1 once the default model has loaded and warmed up', (),
+              lambda: [((), 1 if detector.model_loaded else 0)])
+metrics.gauge('yolo_admission_active', 'Requests currently holding an inference slot', (),
+              lambda: [((), admission.stats()["active"])])
+metrics.gauge('yolo_admission_suspended', 'Admitted requests waiting on the batched model call', (),
+              lambda: [((), admission.stats()["suspended"])])
+metrics.gauge('yolo_admission_waiting', 'Requests queued for an inference slot', (),
+              lambda: [((), admission.stats()["waiting"])])
+metrics.gauge('yolo_admission_rejected_total', 'Requests answered 503 because the queue was full', (),
+              lambda: [((), admission.stats()["rejected"])], kind='counter')
+metrics.gauge('yolo_worker_pool_in_flight', 'Frames inside inference worker processes', (),
+              lambda: [((), detector.worker_pool.stats()["in_flight"])] if detector.worker_pool else [])
+metrics.gauge('yolo_motion_gate_reused_frames_total', 'Stream frames answered from the motion gate cache', (),
+              lambda: [((), detector.motion_gate.stats()["reused_frames"])] if detector.motion_gate else [],
+              kind='counter')
+metrics.gauge('yolo_result_cache_hits_total', 'Frames answered from the content-hash result cache', (),
+              lambda: [((), detector.result_cache.stats()["hits"])] if detector.result_cache else [],
+              kind='counter')
+
+metrics.gauge('yolo_ingest_fps', 'Frames per second analyzed per server-side camera', ('camera',),
+              lambda: [((camera,), stats["fps"]) for camera, stats in ingest.stats()["cameras"].items()])
+metrics.gauge('yolo_ingest_lag_seconds', 'Median capture-to-result lag per server-side camera', ('camera',),
+              lambda: [((camera,), stats["lag_ms"] / 1000 if stats["lag_ms"] is not None else None)
+                       for camera, stats in ingest.stats()["cameras"].items()])
+
+def process_live_frame(image_data, options):
+    with admission:
+        return detector.process_image(image_data, **options)
+
+live_sessions = LiveSessionManager(process_live_frame, LIVE_MAX_SESSIONS, LIVE_IDLE_SECONDS)
+
+def process_ingest_frame(camera, frame, options):
+    # Cameras start with the process; their first frames wait for the model instead of failing
+    detector.wait_ready()
+    # Ingested cameras count against the same inference limit as HTTP requests, at most
+    # INGEST_WORKERS slots of it; the camera id doubles as the stream id so full frames are tracked
+    with admission:
+        return detector.process_decoded(frame, stream=camera, camera=camera, **options)
+
+ingest = CameraIngest(process_ingest_frame, INGEST_WORKERS)
+# Spawned worker-pool children re-import this module and must not open the cameras again
+if multiprocessing.parent_process() is None:
+    for camera_id, source in INGEST_SOURCES.items():
+        ingest.add(camera_id, source, float(INGEST_WEIGHTS.get(camera_id, 1)))
+
+# Endpoints that run inference; they answer 503 while the model loads and warms up
+INFERENCE_ENDPOINTS = {'detect_tables', 'live_frame', 'analyze_video'}
+
+class ModelLoading(Exception):
+    pass
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def require_loaded_model():
+    if request.endpoint in INFERENCE_ENDPOINTS and detector.loading:
+        raise ModelLoading(f"Model is {detector.state}, retry shortly")
+
+@app.after_request
+def record_request(response):
+    """Request rate, status codes and latency per API endpoint"""
+    # Streamed responses (video NDJSON) are timed up to their headers
+    if request.path.startswith('/api/') and request.endpoint != 'prometheus_metrics':
+        endpoint = request.endpoint or 'unknown'
+        requests_total.inc(endpoint, str(response.status_code))
+        request_seconds.observe(time.perf_counter() - g.request_started, endpoint)
+    return response
+
 @app.route('/')
 def index():
     """Serve the main application page"""
     return render_template_string(HTML_TEMPLATE)
 
+class InvalidParameter(ValueError):
+    pass
+
+def number_param(params, name, default, cast=float):
+    """Numeric request parameter; anything unparseable answers 400 instead of a 500"""
+    value = params.get(name, default)
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise InvalidParameter(f"Invalid {name}: {value!r}")
+
+def read_detect_request():
+    """Extract image payload and thresholds from a JSON, multipart or raw binary request"""
+    # Raw bodies are read with get_data(), which doesn't enforce the limit itself
+    if request.content_length and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+    
+    if request.mimetype.startswith('image/') or request.mimetype == 'application/octet-stream':
+        # Raw encoded frame in the body, thresholds in the query string
+        params = request.args
+        image_data = request.get_data()
+    elif request.mimetype == 'multipart/form-data':
+        params = request.form
+        upload = request.files.get('image')
+        image_data = upload.read() if upload else None
+    else:
+        params = request.get_json(silent=True)
+        if params is None:
+            params = {}
+        if not isinstance(params, dict):
+            raise InvalidParameter("Request body must be a JSON object")
+        image_data = params.get('image')
+    
+    options = {
+        "confidence": number_param(params, 'confidence', 0.5),
+        "iou": number_param(params, 'iou', 0.5),
+        # Frames from a continuous source carry a stream id so they can be motion gated
+        "stream": params.get('stream'),
+        # Cameras with a floor plan are analyzed per table region
+        "camera": params.get('camera'),
+        # Registered model name, defaults to the first in YOLO_MODELS
+        "model": params.get('model'),
+        # Per-stage timings in the response
+        "timings": str(params.get('timings', RESPONSE_TIMINGS)).lower() in ('1', 'true'),
+        # Overlapping tiles for small people in wide high-resolution frames
+        "tiled": str(params.get('tiled', TILED_DEFAULT)).lower() in ('1', 'true')
+    }
+    return image_data, options
+
 @app.route('/api/detect', methods=['POST'])
 def detect_tables():
     """API endpoint for table occupancy detection with YOLO"""
-    data = request.json
-    image_data = data.get('image')
-    confidence = data.get('confidence', 0.5)
-    iou = data.get('iou', 0.5)
+    image_data, options = read_detect_request()
     
     if not image_data:
         return jsonify({"success": False, "error": "No image data provided"})
     
-    result = detector.process_image(image_data, confidence, iou)
-    return jsonify(result)
+    with admission:
+        result = detector.process_image(image_data, **options)
+    
+    started = time.perf_counter()
+    response = jsonify(result)
+    stage_seconds.observe(time.perf_counter() - started, 'serialization')
+    return response
+
+@app.route('/api/live/<session_id>/events', methods=['GET'])
+def live_events(session_id):
+    """Server-Sent Events stream of results for frames posted to this live session"""
+    session = live_sessions.open(session_id)
+    
+    def generate():
+        try:
+            yield 'retry: 1000\n\n'
+            while not session.closed:
+                event = session.next_event(LIVE_KEEPALIVE_SECONDS)
+                # Comment lines keep proxies and idle-connection timeouts from closing the stream
+                yield ': keepalive\n\n' if event is None else f'data: {json.dumps(event)}\n\n'
+        finally:
+            live_sessions.release(session)
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/live/<session_id>/frame', methods=['POST'])
+def live_frame(session_id):
+    """Hand a frame to a live session; its result is pushed on the event stream"""
+    session = live_sessions.get(session_id)
+    if session is None:
+        return jsonify({"success": False, "error": "Unknown live session"}), 404
+    
+    image_data, options = read_detect_request()
+    if not image_data:
+        return jsonify({"success": False, "error": "No image data provided"}), 400
+    
+    # Consecutive live frames are motion gated unless the client names its own stream
+    options["stream"] = options["stream"] or f"live-{session_id}"
+    session.submit(int(request.args.get('seq', 0)), image_data, options)
+    return jsonify({"success": True}), 202
+
+@app.route('/api/live/<session_id>', methods=['DELETE'])
+def close_live_session(session_id):
+    """Stop a live session's worker"""
+    return jsonify({"success": live_sessions.close(session_id)})
 
 @app.route('/api/demo-image', methods=['GET'])
 def get_demo_image():
@@ -905,14 +1855,274 @@ def get_demo_image():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.errorhandler(Overloaded)
+def handle_overloaded(error):
+    """Bounded request queue is full: tell clients to back off"""
+    response = jsonify({"success": False, "error": str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.errorhandler(InvalidParameter)
+def handle_invalid_parameter(error):
+    """Malformed request parameter"""
+    return jsonify({"success": False, "error": str(error)}), 400
+
+@app.errorhandler(ModelLoading)
+def handle_model_loading(error):
+    """Model still loading in the background: tell clients when to retry"""
+    response = jsonify({"success": False, "error": str(error), "state": detector.state})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.errorhandler(413)
+def handle_too_large(error):
+    """Request body exceeds YOLO_MAX_UPLOAD_MB"""
+    response = jsonify({"success": False, "error": f"Request body exceeds {MAX_UPLOAD_MB:g} MB"})
+    response.status_code = 413
+    return response
+
 @app.route('/api/model-status', methods=['GET'])
 def model_status():
     """API endpoint to check YOLO model status"""
+    messages = {
+        "loading": "Loading YOLO model...",
+        "warming": "Warming up YOLO model...",
+        "ready": "YOLO model loaded successfully",
+        "mock": "YOLO not available. Using mock mode.",
+        "failed": f"YOLO model failed to load ({detector.startup['error']}). Using mock mode."
+    }
     return jsonify({
         "ready": detector.model_loaded,
-        "message": "YOLO model loaded successfully" if detector.model_loaded else "YOLO not available. Using mock mode."
+        "state": detector.state,
+        "message": messages[detector.state],
+        # Load and warm-up durations (cold and warm time per warm-up shape), and
+        # seconds from process start until the model was usable
+        "startup": detector.startup,
+        "keep_warm": {"idle_seconds": KEEP_WARM_SECONDS, "runs": detector.keep_warm_runs},
+        "models": detector.models.status() if detector.models else None,
+        "motion_gate": detector.motion_gate.stats() if detector.motion_gate else None,
+        "result_cache": detector.result_cache.stats() if detector.result_cache else None,
+        "change_map": detector.change_maps.stats() if detector.change_maps else None,
+        "floor_plans": {camera: len(plan) for camera, plan in detector.floor_plans.items()},
+        "admission": admission.stats(),
+        "video_jobs": video_jobs.stats(),
+        "worker_pool": detector.worker_pool.stats() if detector.worker_pool else None,
+        "live": live_sessions.stats(),
+        "tracking": detector.trackers.stats() if detector.trackers else None
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Per-stage latency histograms, request counts and queue depths for Prometheus"""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/timeseries', methods=['GET'])
+def timeseries_cameras():
+    """Cameras with recorded table history, their row counts and time span"""
+    if not detector.timeseries:
+        return jsonify({"success": False, "error": "Time-series recording is disabled"})
+    return jsonify({"success": True, "cameras": detector.timeseries.stats()})
+
+@app.route('/api/timeseries/<camera>', methods=['GET'])
+def timeseries_query(camera):
+    """Per-table occupancy history of one camera between start and end (unix seconds)"""
+    if not detector.timeseries:
+        return jsonify({"success": False, "error": "Time-series recording is disabled"})
+    try:
+        end = float(request.args.get('end', time.time()))
+        start = float(request.args.get('start', end - 3600))
+        tables = request.args.get('tables')
+        max_points = int(request.args.get('max_points', 2000))
+        timestamps, table_ids, occupied, people = detector.timeseries.query(
+            camera, start, end, tables.split(',') if tables else None
+        )
+        summary = summarize(occupied, people)
+        
+        # Rows are thinned evenly for plotting; the summary covers all of them
+        step = max(1, -(-len(timestamps) // max_points)) if max_points > 0 else 1
+        occupied_points = occupied[::step].astype(np.int16)
+        occupied_points[occupied_points == UNKNOWN] = -1
+        people_points = people[::step]
+        return jsonify({
+            "success": True,
+            "camera": camera,
+            "start": start,
+            "end": end,
+            "rows": len(timestamps),
+            "step": step,
+            "timestamps": timestamps[::step].tolist(),
+            "tables": table_ids,
+            # occupied is -1 where the table wasn't seen in that frame
+            "series": {
+                table_id: {"occupied": occupied_points[:, i].tolist(), "people": people_points[:, i].tolist()}
+                for i, table_id in enumerate(table_ids)
+            },
+            "summary": {
+                table_id: {
+                    "frames": int(summary["rows"][i]),
+                    "occupied_fraction": round(float(summary["occupied_fraction"][i]), 4),
+                    "mean_people": round(float(summary["mean_people"][i]), 3),
+                    "max_people": int(summary["max_people"][i])
+                }
+                for i, table_id in enumerate(table_ids)
+            }
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/analytics', methods=['GET'])
+def analytics_cameras():
+    """Cameras with occupancy rollups in this process, and ones with recorded history"""
+    return jsonify({
+        "success": True,
+        "resolutions": list(RESOLUTIONS),
+        "cameras": detector.rollups.stats(),
+        "recorded": detector.timeseries.camera_ids() if detector.timeseries else []
+    })
+
+@app.route('/api/analytics/<camera>', methods=['GET'])
+def camera_analytics(camera):
+    """Average/peak occupancy, turnover and a timeline for a camera, read from its rollups"""
+    try:
+        end = request.args.get('end')
+        start = request.args.get('start')
+        analytics = detector.rollups.query(
+            camera,
+            request.args.get('resolution', 'hour'),
+            float(start) if start else None,
+            float(end) if end else None
+        )
+        return jsonify({"success": True, "analytics": analytics})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/ingest', methods=['GET'])
+def ingest_status():
+    """Server-side cameras with achieved FPS, lag and share of inference"""
+    return jsonify({"success": True, **ingest.stats()})
+
+def ingest_source_allowed(source):
+    """Whether a client may have the server open this file or stream URL"""
+    if source in INGEST_SOURCES.values():
+        return True
+    if is_stream_url(source):
+        return any(source.startswith(prefix) for prefix in INGEST_ALLOWED if is_stream_url(prefix))
+    # Resolved, so '..' and symlinks can't leave an allowed directory
+    path = os.path.realpath(source)
+    return any(os.path.commonpath([path, os.path.realpath(prefix)]) == os.path.realpath(prefix)
+               for prefix in INGEST_ALLOWED if not is_stream_url(prefix))
+
+@app.route('/api/ingest', methods=['POST'])
+def add_ingest_camera():
+    """Start analyzing a video file or stream URL server-side"""
+    params = request.get_json(silent=True) or {}
+    try:
+        camera = params.get('camera')
+        source = params.get('source')
+        if not camera or not source:
+            return jsonify({"success": False, "error": "camera and source are required"}), 400
+        if not isinstance(source, str) or not ingest_source_allowed(source):
+            return jsonify({"success": False, "error": "Source not allowed; see YOLO_INGEST_ALLOWED"}), 403
+        options = {key: float(params[key]) for key in ('confidence', 'iou') if key in params}
+        if params.get('model'):
+            options["model"] = params['model']
+        if 'tiled' in params:
+            options["tiled"] = bool(params['tiled'])
+        ingest.add(camera, source, float(params.get('weight', 1)), bool(params.get('loop', False)), **options)
+        return jsonify({"success": True, "camera": camera})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+@app.route('/api/ingest/<camera>', methods=['GET'])
+def ingest_latest(camera):
+    """Latest result of a server-side camera"""
+    if camera not in ingest.cameras:
+        return jsonify({"success": False, "error": "Unknown camera"}), 404
+    return jsonify({"success": True, "camera": camera, "result": ingest.latest(camera)})
+
+@app.route('/api/ingest/<camera>', methods=['DELETE'])
+def remove_ingest_camera(camera):
+    """Stop a server-side camera"""
+    return jsonify({"success": ingest.remove(camera)})
+
+@app.route('/api/analyze-video', methods=['POST'])
+def analyze_video():
+    """API endpoint to analyze an uploaded video file frame by frame"""
+    upload = request.files.get('video')
+    if not upload:
+        return jsonify({"success": False, "error": "No video file provided"})
+    
+    stride = number_param(request.form, 'stride', 5, int)
+    timeline_interval = number_param(request.form, 'timeline_interval', 30)
+    stream = request.args.get('stream') == '1'
+    confidence = number_param(request.form, 'confidence', 0.5)
+    iou = number_param(request.form, 'iou', 0.5)
+    model = request.form.get('model')
+    
+    def count_occupancy(frame):
+        # One inference slot per analyzed frame, not for the whole video
+        with admission:
+            stats = detector.process_frame(frame, confidence, iou, model=model)["stats"]
+        return stats["occupied_tables"], stats["total_tables"]
+    
+    # Raises Overloaded (503) before anything is streamed when enough videos are running
+    video_jobs.acquire()
+    
+    # Decode from a temp file so the upload is never held in memory as frames
+    fd, video_path = tempfile.mkstemp(suffix=Path(upload.filename or '').suffix or '.mp4')
+    
+    def finish():
+        os.remove(video_path)
+        video_jobs.release()
+    
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            upload.save(f)
+    except Exception:
+        finish()
+        raise
+    
+    if stream:
+        # Newline-delimited JSON progress events followed by the final analytics
+        def generate():
+            try:
+                for event in stream_video_analysis(video_path, count_occupancy, stride, timeline_interval):
+                    yield json.dumps(event) + '\n'
+            except Exception as e:
+                yield json.dumps({"type": "error", "error": str(e)}) + '\n'
+        
+        response = Response(generate(), mimetype='application/x-ndjson')
+        # The server closes the response even when the client left before the body started
+        response.call_on_close(finish)
+        return response
+    
+    try:
+        analytics = run_video_analysis(video_path, count_occupancy, stride=stride,
+                                       timeline_interval=timeline_interval)
+        return jsonify({
+            "success": True,
+            "analytics": analytics
+        })
+    except Overloaded:
+        raise
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+    finally:
+        finish()
+
+def wait_for_server(host, port, timeout=30):
+    """Poll until something accepts connections on host:port"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
 def run_flask():
     """Run Flask server"""
     app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
@@ -923,8 +2133,12 @@ if __name__ == '__main__':
     flask_thread.daemon = True
     flask_thread.start()
     
-    # Wait for server to start
-    time.sleep(2)
+    # Open the window as soon as the server accepts connections; the page
+    # shows the model loading until it is ready
+    wait_for_server('127.0.0.1', 5000)
+    
+    # Desktop mode only; serve.py runs the same app headless
+    import webview
     
     # Create webview window
     window = webview.create_window(